@@ -0,0 +1,610 @@
+"""
+Reproducible benchmark suite for the PDF rate RAG system (vec2.py)
+
+Generates synthetic SSR-style PDFs (section headers, ruled rate tables and
+free-text rate lines), then measures:
+  - process_pdf throughput (pages/s, items/s)
+  - search index build time (IntelligentSearchEngine construction)
+  - memory (RSS per phase, optional tracemalloc peaks)
+  - get_suggestions latency per query class
+  - concurrent query throughput (queries/s per client count)
+
+Results are written as JSON so runs can be compared across commits.
+The semantic model is replaced by a deterministic stub encoder by default so
+the suite runs fully offline.
+
+Usage:
+python benchmark.py --pages 50 --rows-per-page 25 --output bench.json
+python benchmark.py --encoder sentence-transformers   # real model (needs download)
+python benchmark.py --encoder onnx --model-path ./minilm-onnx
+python benchmark.py --encoder none                    # lexical-only
+python benchmark.py --concurrency 1,4,16 --batch-window-ms 0
+"""
+
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import platform
+import random
+import re
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+SCHEMA_VERSION = 1
+
+# Page geometry (A4 portrait, points)
+PAGE_WIDTH = 595
+PAGE_HEIGHT = 842
+FONT_SIZE = 8
+ROW_HEIGHT = 18
+TEXT_LINE_HEIGHT = 14
+COLUMN_X = [40, 90, 360, 410, 480, 555]
+TABLE_HEADERS = ["Sr. No", "Description of Item", "Unit", "Rate 2023-24", "Rate 2024-25"]
+
+# Synthetic vocabulary per section: (header line, nouns, qualifiers, free-text paraphrases)
+SECTION_VOCABULARY = {
+    "MATERIALS": (
+        "SECTION A - MATERIALS",
+        ["cement", "steel", "sand", "aggregate", "brick", "paint", "acetylene", "wire"],
+        ["Supplying", "Providing", "Procurement of", "Delivery of"],
+        ["binding material for masonry", "reinforcement bars for slab", "welding gas cylinder"],
+    ),
+    "LABOUR": (
+        "SECTION B - LABOUR",
+        ["carpenter", "mason", "fitter", "helper", "welder", "plumber", "labour"],
+        ["Skilled", "Semi skilled", "Unskilled", "Daily wages of"],
+        ["worker for wood work", "manpower for brick laying", "daily wage workforce"],
+    ),
+    "TRANSPORTATION": (
+        "SECTION C - TRANSPORTATION",
+        ["truck", "tractor", "loading", "unloading", "carriage", "haulage"],
+        ["Transport of", "Conveyance by", "Hire charges of", "Lead charges for"],
+        ["moving material by lorry", "hire of vehicle per trip", "carting of earth"],
+    ),
+    "PIPES": (
+        "PIPE SECTION",
+        ["pipe", "bend", "tee", "reducer", "collar", "valve"],
+        ["Ductile iron", "Cast iron", "Galvanised", "High density"],
+        ["conduit for water supply", "pipeline fittings", "tube for drinking water"],
+    ),
+    "EXCAVATION": (
+        "SECTION E - EXCAVATION",
+        ["excavation", "trench", "filling", "dewatering", "rock", "soil"],
+        ["Manual", "Mechanical", "Hard strata", "Soft strata"],
+        ["digging foundation pit", "earth work in trenches", "backfilling with murum"],
+    ),
+}
+
+UNITS = ["no", "mt", "kg", "lit", "cum", "sqm", "rmt"]
+
+QUERY_CLASSES = ["exact_item", "keyword", "prefix", "fuzzy", "semantic"]
+
+# Item-level paraphrases per noun, worded without the noun, its indexed synonyms or the
+# qualifiers, so only semantic retrieval can tie them to the noun's items
+PARAPHRASES = {
+    "cement": ["hydraulic binder", "binder for plastering"],
+    "steel": ["bars for slab", "rods for columns"],
+    "brick": ["burnt clay walling units"],
+    "carpenter": ["joinery tradesman", "woodwork tradesman"],
+    "plumber": ["sanitary fittings artisan"],
+    "welder": ["metal joining artisan"],
+    "truck": ["lorry for moving goods", "lorry trips"],
+    "tractor": ["farm vehicle with trailer"],
+    "valve": ["flow control fitting", "sluice for mains"],
+    "excavation": ["digging foundation pits", "digging for footings"],
+    "dewatering": ["pumping out seepage"],
+}
+
+
+def paraphrase_concepts(paraphrases: Dict[str, List[str]] = PARAPHRASES) -> Dict[str, str]:
+    """word -> noun for StubEncoder(concepts=...): each noun, plus paraphrase words unique to it"""
+    owners = {}
+    for noun, queries in paraphrases.items():
+        for word in re.findall(r"\w{4,}", " ".join(queries).lower()):
+            owners.setdefault(word, set()).add(noun)
+    concepts = {word: nouns.pop() for word, nouns in owners.items() if len(nouns) == 1}
+    concepts.update({noun: noun for noun in paraphrases})
+    return concepts
+
+
+@dataclass
+class SyntheticRow:
+    """Ground truth for one generated rate row"""
+    sr_no: str
+    description: str
+    unit: str
+    rate_2023_24: str
+    rate_2024_25: str
+    section: str
+    page_number: int
+    source: str  # 'table' or 'text'
+
+
+class StubEncoder:
+    """Deterministic offline stand-in for SentenceTransformer.
+
+    Hashes word tokens and character trigrams into a fixed-size signed
+    bag-of-features vector, so similar strings get similar embeddings.
+    With concepts (word -> concept, e.g. paraphrase_concepts()) texts that
+    mention the same concept also share a weighted concept feature, standing
+    in for the meaning a real encoder would pick up.
+    """
+
+    def __init__(self, dimension: int = 384, concepts: Optional[Dict[str, str]] = None,
+                 concept_weight: float = 2.0):
+        self.dimension = dimension
+        self.concepts = concepts or {}
+        self.concept_weight = concept_weight
+
+    def _hashed(self, features: List[str]) -> np.ndarray:
+        vec = np.zeros(self.dimension, dtype=np.float32)
+        for feature in features:
+            digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dimension
+            sign = 1.0 if digest[4] & 1 else -1.0
+            vec[bucket] += sign
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def _vector(self, text: str) -> np.ndarray:
+        text = text.lower()
+        words = re.findall(r"\w+", text)
+        vec = self._hashed(words + [text[i:i + 3] for i in range(max(len(text) - 2, 0))])
+
+        concepts = [f"concept:{self.concepts[w]}" for w in words if w in self.concepts]
+        if concepts:
+            vec = vec + self.concept_weight * self._hashed(concepts)
+            vec /= np.linalg.norm(vec)
+        return vec
+
+    def encode(self, sentences, show_progress_bar: bool = False, **kwargs):
+        if isinstance(sentences, str):
+            return self._vector(sentences)
+        if not sentences:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        return np.vstack([self._vector(s) for s in sentences])
+
+
+# ==== SYNTHETIC PDF GENERATION ====
+
+def _alpha_code(index: int) -> str:
+    """Unique letter-only code for an index (A, B, ... Z, AA, AB, ...)"""
+    code = ""
+    index += 1
+    while index:
+        index, rem = divmod(index - 1, 26)
+        code = chr(ord("A") + rem) + code
+    return code
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _text_op(x: float, y: float, text: str, size: int = FONT_SIZE) -> str:
+    return f"BT /F1 {size} Tf {x:.1f} {y:.1f} Td ({_pdf_escape(text)}) Tj ET"
+
+
+def _build_pdf(page_streams: List[str]) -> bytes:
+    """Assemble a minimal PDF (Helvetica only) from raw content streams"""
+    objects = []  # object number = index + 1
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    objects.append(None)  # pages tree, filled in below
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+
+    page_refs = []
+    for stream in page_streams:
+        data = stream.encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(data) + data + b"\nendstream")
+        content_ref = len(objects)
+        objects.append((
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] "
+            "/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>"
+            % (PAGE_WIDTH, PAGE_HEIGHT, content_ref)
+        ).encode())
+        page_refs.append(len(objects))
+
+    kids = " ".join(f"{ref} 0 R" for ref in page_refs)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_refs)} >>".encode()
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+
+    xref_offset = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset))
+    return out.getvalue()
+
+
+def generate_ssr_pdf(
+    pages: int = 20, rows_per_page: int = 25, text_lines_per_page: int = 5, seed: int = 42,
+    serial_suffix: str = ""
+) -> Tuple[bytes, List[SyntheticRow]]:
+    """Generate a synthetic SSR-style rate book and its ground-truth rows.
+
+    serial_suffix is appended to the serials printed in the tables, e.g. "."
+    for books that number rows "12.".
+    """
+    rng = random.Random(seed)
+    sections = list(SECTION_VOCABULARY.keys())
+    pages_per_section = max(1, pages // len(sections))
+
+    streams = []
+    rows: List[SyntheticRow] = []
+    serial = 0
+
+    for page_idx in range(pages):
+        section = sections[min(page_idx // pages_per_section, len(sections) - 1)]
+        header, nouns, qualifiers, _ = SECTION_VOCABULARY[section]
+        ops = [_text_op(COLUMN_X[0], PAGE_HEIGHT - 40, header, size=12)]
+
+        # Ruled rate table
+        top = PAGE_HEIGHT - 60
+        bottom = top - ROW_HEIGHT * (rows_per_page + 1)
+        ops.append("0.5 w")
+        for r in range(rows_per_page + 2):
+            y = top - r * ROW_HEIGHT
+            ops.append(f"{COLUMN_X[0]} {y} m {COLUMN_X[-1]} {y} l S")
+        for x in COLUMN_X:
+            ops.append(f"{x} {top} m {x} {bottom} l S")
+
+        table_rows = [TABLE_HEADERS]
+        for _ in range(rows_per_page):
+            serial += 1
+            noun = rng.choice(nouns)
+            description = f"{rng.choice(qualifiers)} {noun} grade {_alpha_code(serial)}"
+            rate_23 = round(rng.uniform(50, 50000), 2)
+            rate_24 = round(rate_23 * rng.uniform(1.02, 1.10), 2)
+            row = SyntheticRow(
+                sr_no=str(serial), description=description, unit=rng.choice(UNITS),
+                rate_2023_24=f"{rate_23:.2f}", rate_2024_25=f"{rate_24:.2f}",
+                section=section, page_number=page_idx + 1, source="table",
+            )
+            rows.append(row)
+            table_rows.append([row.sr_no + serial_suffix, row.description, row.unit,
+                               row.rate_2023_24, row.rate_2024_25])
+
+        for r, cells in enumerate(table_rows):
+            y = top - (r + 1) * ROW_HEIGHT + 5
+            for c, cell in enumerate(cells):
+                ops.append(_text_op(COLUMN_X[c] + 3, y, cell))
+
+        # Free-text rate lines below the table
+        y = bottom - 2 * TEXT_LINE_HEIGHT
+        for _ in range(text_lines_per_page):
+            serial += 1
+            noun = rng.choice(nouns)
+            description = f"{rng.choice(qualifiers)} {noun} type {_alpha_code(serial)}"
+            rate = str(rng.randint(50, 50000))
+            unit = rng.choice(UNITS)
+            rows.append(SyntheticRow(
+                sr_no=str(serial), description=description, unit=unit,
+                rate_2023_24="", rate_2024_25=rate,
+                section=section, page_number=page_idx + 1, source="text",
+            ))
+            ops.append(_text_op(COLUMN_X[0], y, f"{serial}) {description} {unit} {rate}"))
+            y -= TEXT_LINE_HEIGHT
+
+        streams.append("\n".join(ops))
+
+    return _build_pdf(streams), rows
+
+
+# ==== QUERY WORKLOAD ====
+
+def _typo(word: str, rng: random.Random) -> str:
+    if len(word) < 4:
+        return word
+    i = rng.randrange(1, len(word) - 2)
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+
+def build_query_workload(
+    rows: List[SyntheticRow], queries_per_class: int = 20, seed: int = 7
+) -> Dict[str, List[str]]:
+    """Build queries for each query class from the generated corpus"""
+    rng = random.Random(seed)
+    sample = [rng.choice(rows) for _ in range(queries_per_class)]
+    workload = {name: [] for name in QUERY_CLASSES}
+
+    for row in sample:
+        words = row.description.lower().split()
+        noun = SECTION_VOCABULARY[row.section][1]
+        noun = next((w for w in words if w in noun), words[-3])
+        paraphrases = SECTION_VOCABULARY[row.section][3]
+
+        workload["exact_item"].append(f"item {row.sr_no}")
+        workload["keyword"].append(noun)
+        workload["prefix"].append(noun[:max(3, len(noun) - 2)])
+        workload["fuzzy"].append(" ".join(_typo(w, rng) for w in words[:3]))
+        workload["semantic"].append(rng.choice(paraphrases))
+
+    return workload
+
+
+# ==== MEASUREMENT ====
+
+def _current_rss_mb() -> Optional[float]:
+    """Current resident set size (Linux /proc), None elsewhere"""
+    try:
+        with open("/proc/self/statm") as fh:
+            resident_pages = int(fh.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024
+
+
+def _latency_stats(samples_ms: List[float]) -> Dict[str, float]:
+    arr = np.asarray(samples_ms, dtype=np.float64)
+    if arr.size == 0:
+        return {"count": 0}
+    return {
+        "count": int(arr.size),
+        "mean_ms": float(arr.mean()),
+        "p50_ms": float(np.percentile(arr, 50)),
+        "p95_ms": float(np.percentile(arr, 95)),
+        "p99_ms": float(np.percentile(arr, 99)),
+        "max_ms": float(arr.max()),
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL, text=True,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+@contextlib.contextmanager
+def _quiet(enabled: bool):
+    """Silence the system's progress prints while timing"""
+    if not enabled:
+        yield
+        return
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+class _Phase:
+    """Time and memory for one benchmark phase"""
+
+    def __init__(self, name: str, results: Dict[str, Any], trace_memory: bool):
+        self.name = name
+        self.results = results
+        self.trace_memory = trace_memory
+
+    def __enter__(self):
+        self.rss_before = _current_rss_mb()
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        rss_after = _current_rss_mb()
+        entry = {"seconds": elapsed, "rss_after_mb": rss_after}
+        if self.rss_before is not None and rss_after is not None:
+            entry["rss_delta_mb"] = rss_after - self.rss_before
+        if self.trace_memory:
+            entry["tracemalloc_peak_mb"] = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+        self.results[self.name] = entry
+        return False
+
+
+ENCODER_CHOICES = ["stub", "none", "sentence-transformers", "quantized", "onnx"]
+
+
+def create_encoder(name: str, model_path: Optional[str] = None, concepts: Optional[Dict[str, str]] = None):
+    """Encoder for the benchmark run: 'stub' (offline) or any vec2 backend name"""
+    if name == "stub":
+        return StubEncoder(concepts=concepts)
+    from vec2 import create_encoder as create_backend_encoder
+    return create_backend_encoder(name, model_path)
+
+
+def measure_throughput(engine, queries: List[str], concurrency: int) -> Dict[str, float]:
+    """Run every query from `concurrency` client threads at once and report queries/s"""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as clients:
+        list(clients.map(engine.get_suggestions, queries))
+    seconds = time.perf_counter() - start
+    return {"queries": len(queries), "seconds": seconds, "qps": len(queries) / seconds if seconds else None}
+
+
+def run_benchmark(
+    pages: int = 20,
+    rows_per_page: int = 25,
+    text_lines_per_page: int = 5,
+    queries_per_class: int = 20,
+    repeats: int = 3,
+    seed: int = 42,
+    encoder_name: str = "stub",
+    model_path: Optional[str] = None,
+    trace_memory: bool = False,
+    engine_options: Optional[Dict[str, Any]] = None,
+    concurrency_levels: Tuple[int, ...] = (),
+    quiet: bool = True,
+) -> Dict[str, Any]:
+    """Run the full benchmark and return a JSON-serialisable result dict"""
+    if trace_memory:
+        tracemalloc.start()
+
+    phases: Dict[str, Any] = {}
+
+    with _Phase("import", phases, trace_memory):
+        with _quiet(quiet):
+            import vec2  # noqa: F401
+
+    with _Phase("generate_pdf", phases, trace_memory):
+        pdf_bytes, rows = generate_ssr_pdf(pages, rows_per_page, text_lines_per_page, seed)
+
+    encoder = create_encoder(encoder_name, model_path)
+
+    from vec2 import EnhancedPDFProcessor, IntelligentSearchEngine
+
+    processor = EnhancedPDFProcessor()
+    with _Phase("process_pdf", phases, trace_memory):
+        with _quiet(quiet):
+            items = processor.process_pdf(pdf_bytes)
+
+    with _Phase("index_build", phases, trace_memory):
+        with _quiet(quiet):
+            engine = IntelligentSearchEngine(
+                items, processor, model=encoder, encoder_backend="none", **(engine_options or {})
+            )
+
+    ingest_seconds = phases["process_pdf"]["seconds"]
+    phases["process_pdf"]["pages_per_second"] = pages / ingest_seconds if ingest_seconds else None
+    phases["process_pdf"]["items_per_second"] = len(items) / ingest_seconds if ingest_seconds else None
+
+    workload = build_query_workload(rows, queries_per_class, seed)
+    latency: Dict[str, Any] = {}
+    with _Phase("queries", phases, trace_memory):
+        with _quiet(quiet):
+            # Warm-up pass so lazy initialisation is not attributed to one class
+            for queries in workload.values():
+                engine.get_suggestions(queries[0])
+
+            for query_class, queries in workload.items():
+                samples = []
+                result_counts = []
+                for _ in range(repeats):
+                    for query in queries:
+                        start = time.perf_counter()
+                        suggestions = engine.get_suggestions(query)
+                        samples.append((time.perf_counter() - start) * 1000)
+                        result_counts.append(len(suggestions))
+                latency[query_class] = _latency_stats(samples)
+                latency[query_class]["mean_results"] = float(np.mean(result_counts))
+
+    throughput: Dict[str, Any] = {}
+    if concurrency_levels:
+        all_queries = [query for queries in workload.values() for query in queries] * repeats
+        with _quiet(quiet):
+            for concurrency in concurrency_levels:
+                throughput[str(concurrency)] = measure_throughput(engine, all_queries, concurrency)
+        if hasattr(engine.model, "stats"):
+            throughput["encode_batching"] = engine.model.stats()
+
+    if trace_memory:
+        tracemalloc.stop()
+
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git_commit": _git_commit(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "config": {
+            "pages": pages,
+            "rows_per_page": rows_per_page,
+            "text_lines_per_page": text_lines_per_page,
+            "queries_per_class": queries_per_class,
+            "repeats": repeats,
+            "seed": seed,
+            "encoder": encoder_name,
+            "model_path": model_path,
+            "engine_options": engine_options or {},
+        },
+        "corpus": {
+            "pdf_bytes": len(pdf_bytes),
+            "generated_rows": len(rows),
+            "extracted_items": len(items),
+            "keywords": len(processor.keyword_index),
+            "ngrams": len(getattr(processor, "ngram_index", {})),
+        },
+        "phases": phases,
+        "memory": {"peak_rss_mb": _peak_rss_mb()},
+        "latency": latency,
+        "throughput": throughput,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark PDF ingestion and suggestion search")
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--rows-per-page", type=int, default=25)
+    parser.add_argument("--text-lines-per-page", type=int, default=5)
+    parser.add_argument("--queries-per-class", type=int, default=20)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--encoder", choices=ENCODER_CHOICES, default="stub")
+    parser.add_argument("--model-path", help="Local model path for the sentence-transformers/quantized/onnx backends")
+    parser.add_argument("--parallel-stages", action="store_true", help="Run match stages concurrently")
+    parser.add_argument("--stage-deadline-ms", type=float, help="Per-request deadline for parallel stages")
+    parser.add_argument("--batch-window-ms", type=float, help="Micro-batch concurrent query encodes (0 = greedy)")
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--concurrency", default="", help="Comma-separated client counts for throughput, e.g. 1,4,16")
+    parser.add_argument("--trace-memory", action="store_true", help="Record tracemalloc peaks (slower)")
+    parser.add_argument("--verbose", action="store_true", help="Show the system's progress output")
+    parser.add_argument("--save-pdf", help="Also write the generated PDF to this path")
+    parser.add_argument("--output", help="Write JSON results here instead of stdout")
+    args = parser.parse_args(argv)
+
+    if args.save_pdf:
+        pdf_bytes, _ = generate_ssr_pdf(args.pages, args.rows_per_page, args.text_lines_per_page, args.seed)
+        with open(args.save_pdf, "wb") as fh:
+            fh.write(pdf_bytes)
+
+    results = run_benchmark(
+        pages=args.pages,
+        rows_per_page=args.rows_per_page,
+        text_lines_per_page=args.text_lines_per_page,
+        queries_per_class=args.queries_per_class,
+        repeats=args.repeats,
+        seed=args.seed,
+        encoder_name=args.encoder,
+        model_path=args.model_path,
+        trace_memory=args.trace_memory,
+        engine_options={
+            "parallel_stages": args.parallel_stages,
+            "stage_deadline_ms": args.stage_deadline_ms,
+            "batch_window_ms": args.batch_window_ms,
+            "max_batch_size": args.max_batch_size,
+        },
+        concurrency_levels=tuple(int(n) for n in args.concurrency.split(",") if n.strip()),
+        quiet=not args.verbose,
+    )
+
+    payload = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(payload + "\n")
+        print(f"✅ Benchmark results written to {args.output}")
+    else:
+        print(payload)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
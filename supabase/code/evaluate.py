@@ -0,0 +1,267 @@
+"""
+Relevance evaluation harness for IntelligentSearchEngine.get_suggestions
+
+Runs a labelled set of query -> expected primary_key pairs through the search
+engine and reports recall@k, MRR and per-match_type contribution alongside
+latency, so ranking speedups can be accepted only when quality holds.
+
+Labelled set format (JSON list):
+[
+  {"query": "item 12", "expected": ["<primary_key>", ...], "class": "exact_item"},
+  ...
+]
+
+Synthetic labels cover exact item numbers, full descriptions, prefixes,
+typos and paraphrases. Paraphrase queries avoid every indexed word, so they
+measure semantic retrieval; the default stub encoder is given the paraphrase
+concepts so this class works offline.
+
+Usage:
+python evaluate.py --synthetic --pages 20 --output eval.json
+python evaluate.py --pdf rates.pdf --labels labels.json
+python evaluate.py --synthetic --baseline eval_before.json --tolerance 0.005
+
+Rankings are deterministic (score ties are broken on primary_key), so two runs
+on the same inputs give identical metrics whatever PYTHONHASHSEED is.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+from benchmark import (
+    ENCODER_CHOICES,
+    PARAPHRASES,
+    SECTION_VOCABULARY,
+    create_encoder,
+    generate_ssr_pdf,
+    _git_commit,
+    _latency_stats,
+    _quiet,
+    _typo,
+    paraphrase_concepts,
+)
+
+RECALL_CUTOFFS = (1, 3, 5, 10)
+QUALITY_METRICS = ["mrr"] + [f"recall@{k}" for k in RECALL_CUTOFFS]
+
+
+def build_synthetic_labels(rows, items_database, seed: int = 11, limit: int = 200) -> List[Dict[str, Any]]:
+    """Derive a labelled query set from generated ground-truth rows.
+
+    Expected keys are resolved by description, since primary keys are only
+    known after extraction. Each paraphrase query expects every item whose
+    description names its noun.
+    """
+    keys_by_description = defaultdict(list)
+    for key, item in items_database.items():
+        keys_by_description[item.description.lower().strip()].append(key)
+
+    rng = random.Random(seed)
+    sample = rows if len(rows) <= limit else rng.sample(rows, limit)
+    labels = []
+
+    for row in sample:
+        description = row.description.lower()
+        expected = keys_by_description.get(description)
+        if not expected:
+            continue  # row was not extracted; that is an ingestion issue, not ranking
+
+        nouns = SECTION_VOCABULARY[row.section][1]
+        words = description.split()
+        noun = next((w for w in words if w in nouns), words[0])
+
+        labels.extend([
+            {"query": f"item {row.sr_no}", "expected": expected, "class": "exact_item"},
+            {"query": description, "expected": expected, "class": "description"},
+            {"query": description[:-1], "expected": expected, "class": "prefix"},
+            {"query": description.replace(noun, _typo(noun, rng), 1), "expected": expected, "class": "fuzzy"},
+        ])
+
+    keys_by_noun = defaultdict(list)
+    for key, item in items_database.items():
+        for word in set(item.description.lower().split()).intersection(PARAPHRASES):
+            keys_by_noun[word].append(key)
+    for noun, queries in PARAPHRASES.items():
+        if keys_by_noun[noun]:
+            labels.extend({"query": query, "expected": keys_by_noun[noun], "class": "paraphrase"} for query in queries)
+
+    return labels
+
+
+def evaluate(engine, labels: List[Dict[str, Any]], max_suggestions: int = 10) -> Dict[str, Any]:
+    """Run labelled queries and compute ranking quality and latency.
+
+    recall@k is the share of expected keys in the top k, out of at most k,
+    so a label with many relevant items can still reach 1.0.
+    """
+    per_class = defaultdict(lambda: {"reciprocal_ranks": [], "recall": defaultdict(list), "latency": []})
+    hit_match_types = Counter()
+    result_match_types = Counter()
+    misses = []
+
+    for label in labels:
+        query = label["query"]
+        expected = set(label["expected"])
+        bucket = per_class[label.get("class", "unlabelled")]
+
+        start = time.perf_counter()
+        suggestions = engine.get_suggestions(query, max_suggestions)
+        bucket["latency"].append((time.perf_counter() - start) * 1000)
+
+        ranked_keys = [s.item.primary_key for s in suggestions]
+        result_match_types.update(s.match_type for s in suggestions)
+
+        first_rank = None
+        for rank, suggestion in enumerate(suggestions, 1):
+            if suggestion.item.primary_key in expected:
+                first_rank = rank
+                hit_match_types[suggestion.match_type] += 1
+                break
+
+        bucket["reciprocal_ranks"].append(1.0 / first_rank if first_rank else 0.0)
+        for k in RECALL_CUTOFFS:
+            found = len(expected.intersection(ranked_keys[:k]))
+            bucket["recall"][k].append(found / min(len(expected), k))
+
+        if first_rank is None and len(misses) < 20:
+            misses.append({"query": query, "class": label.get("class"), "top": ranked_keys[:3]})
+
+    def summarise(buckets) -> Dict[str, Any]:
+        reciprocal_ranks = [rr for b in buckets for rr in b["reciprocal_ranks"]]
+        latency = [ms for b in buckets for ms in b["latency"]]
+        summary = {
+            "queries": len(reciprocal_ranks),
+            "mrr": float(np.mean(reciprocal_ranks)) if reciprocal_ranks else 0.0,
+        }
+        for k in RECALL_CUTOFFS:
+            values = [v for b in buckets for v in b["recall"][k]]
+            summary[f"recall@{k}"] = float(np.mean(values)) if values else 0.0
+        summary["latency"] = _latency_stats(latency)
+        return summary
+
+    total_hits = sum(hit_match_types.values())
+    return {
+        "overall": summarise(list(per_class.values())),
+        "by_class": {name: summarise([bucket]) for name, bucket in sorted(per_class.items())},
+        "match_type_contribution": {
+            "first_relevant_hit": {
+                mt: {"count": n, "share": n / total_hits} for mt, n in hit_match_types.most_common()
+            },
+            "all_results": dict(result_match_types.most_common()),
+        },
+        "sample_misses": misses,
+    }
+
+
+def compare_to_baseline(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """List quality metrics that regressed by more than the tolerance"""
+    regressions = []
+    for metric in QUALITY_METRICS:
+        before = baseline["overall"].get(metric)
+        after = current["overall"].get(metric)
+        if before is not None and after is not None and after < before - tolerance:
+            regressions.append(f"{metric}: {before:.4f} -> {after:.4f}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Evaluate suggestion relevance against labelled queries")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--synthetic", action="store_true", help="Use a generated rate book and derived labels")
+    source.add_argument("--pdf", help="Evaluate against a real PDF (requires --labels)")
+    parser.add_argument("--labels", help="Labelled query set (JSON list)")
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--rows-per-page", type=int, default=25)
+    parser.add_argument("--text-lines-per-page", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--max-suggestions", type=int, default=10)
+    parser.add_argument("--encoder", choices=ENCODER_CHOICES, default="stub")
+    parser.add_argument("--model-path", help="Local model path for the sentence-transformers/quantized/onnx backends")
+    parser.add_argument("--write-labels", help="Save the labelled set used for this run")
+    parser.add_argument("--baseline", help="Previous evaluation JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.005, help="Allowed drop in recall/MRR")
+    parser.add_argument("--verbose", action="store_true")
+    parser.add_argument("--output", help="Write JSON results here instead of stdout")
+    args = parser.parse_args(argv)
+
+    if args.pdf and not args.labels:
+        parser.error("--pdf requires --labels")
+
+    # vec2 prints optional-dependency notices on import; keep them out of the JSON report
+    with _quiet(not args.verbose):
+        from vec2 import EnhancedPDFProcessor, IntelligentSearchEngine
+
+    rows = None
+    if args.synthetic:
+        pdf_bytes, rows = generate_ssr_pdf(args.pages, args.rows_per_page, args.text_lines_per_page, args.seed)
+    else:
+        with open(args.pdf, "rb") as fh:
+            pdf_bytes = fh.read()
+
+    processor = EnhancedPDFProcessor()
+    with _quiet(not args.verbose):
+        items = processor.process_pdf(pdf_bytes)
+        engine = IntelligentSearchEngine(
+            items, processor, model=create_encoder(args.encoder, args.model_path, paraphrase_concepts()),
+            encoder_backend="none"
+        )
+
+    if args.labels:
+        with open(args.labels) as fh:
+            labels = json.load(fh)
+    else:
+        labels = build_synthetic_labels(rows, items)
+
+    if args.write_labels:
+        with open(args.write_labels, "w") as fh:
+            json.dump(labels, fh, indent=2)
+
+    with _quiet(not args.verbose):
+        metrics = evaluate(engine, labels, args.max_suggestions)
+
+    results = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git_commit": _git_commit(),
+        "config": {
+            "source": "synthetic" if args.synthetic else args.pdf,
+            "pages": args.pages if args.synthetic else None,
+            "seed": args.seed,
+            "encoder": args.encoder,
+            "model_path": args.model_path,
+            "max_suggestions": args.max_suggestions,
+            "labels": len(labels),
+            "python_hash_seed": os.environ.get("PYTHONHASHSEED"),
+        },
+        **metrics,
+    }
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline) as fh:
+            baseline = json.load(fh)
+        regressions = compare_to_baseline(results, baseline, args.tolerance)
+        results["regressions"] = regressions
+        if regressions:
+            print("❌ Relevance regressed: " + "; ".join(regressions), file=sys.stderr)
+            exit_code = 1
+
+    payload = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(payload + "\n")
+        print(f"✅ Evaluation results written to {args.output}")
+    else:
+        print(payload)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""BatchingEncoder: coalesced query encodes and failure handling.
+
+Run: python -m unittest test_batching   (or python -m pytest test_batching.py)
+"""
+
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from benchmark import StubEncoder, _quiet
+
+with _quiet(True):
+    from vec2 import BatchingEncoder
+
+
+class SlowEncoder:
+    """StubEncoder that holds each forward pass until released, so queries pile up"""
+
+    def __init__(self):
+        self.stub = StubEncoder(dimension=16)
+        self.release = threading.Event()
+        self.batch_sizes = []
+
+    def encode(self, sentences, **kwargs):
+        self.release.wait(5)
+        if not isinstance(sentences, str):
+            self.batch_sizes.append(len(sentences))
+        return self.stub.encode(sentences, **kwargs)
+
+
+class ShortRowsEncoder:
+    """Returns one row fewer than it was asked for"""
+
+    def encode(self, sentences, **kwargs):
+        return np.zeros((max(0, len(sentences) - 1), 4), dtype=np.float32)
+
+
+class InterruptedEncoder:
+    """Raises KeyboardInterrupt on the first forward pass, then works"""
+
+    def __init__(self):
+        self.stub = StubEncoder(dimension=8)
+        self.calls = 0
+
+    def encode(self, sentences, **kwargs):
+        self.calls += 1
+        if self.calls == 1:
+            raise KeyboardInterrupt
+        return self.stub.encode(sentences, **kwargs)
+
+
+class BatchingEncoderTest(unittest.TestCase):
+    def test_concurrent_queries_share_forward_passes(self):
+        encoder = SlowEncoder()
+        batcher = BatchingEncoder(encoder, window_ms=0.0, max_batch_size=8)
+        queries = [f"query {i}" for i in range(20)]
+
+        with ThreadPoolExecutor(max_workers=len(queries)) as pool:
+            futures = [pool.submit(batcher.encode, query) for query in queries]
+            threading.Timer(0.2, encoder.release.set).start()
+            results = [future.result(timeout=10) for future in futures]
+
+        for query, embedding in zip(queries, results):
+            np.testing.assert_allclose(embedding, encoder.stub.encode(query), atol=1e-6)
+        self.assertEqual(sum(encoder.batch_sizes), len(queries))
+        self.assertLessEqual(max(encoder.batch_sizes), 8)
+        self.assertLess(batcher.stats()["batches"], len(queries))
+
+    def test_short_batch_fails_every_caller(self):
+        batcher = BatchingEncoder(ShortRowsEncoder(), timeout=5)
+
+        with self.assertRaisesRegex(RuntimeError, "batch of 1"):
+            batcher.encode("cement")
+        # The worker survives a bad batch
+        with self.assertRaisesRegex(RuntimeError, "batch of 1"):
+            batcher.encode("sand")
+
+    def test_worker_death_fails_callers_and_restarts(self):
+        encoder = InterruptedEncoder()
+        batcher = BatchingEncoder(encoder, timeout=5)
+        original = threading.excepthook
+        threading.excepthook = lambda args: None  # the dying worker re-raises on its own thread
+        try:
+            with self.assertRaises(KeyboardInterrupt):
+                batcher.encode("cement")
+        finally:
+            threading.excepthook = original
+
+        np.testing.assert_allclose(batcher.encode("cement"), encoder.stub.encode("cement"), atol=1e-6)
+
+    def test_lists_bypass_the_queue(self):
+        batcher = BatchingEncoder(StubEncoder(dimension=8))
+
+        self.assertEqual(batcher.encode(["a", "b", "c"]).shape, (3, 8))
+        self.assertEqual(batcher.stats()["batches"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
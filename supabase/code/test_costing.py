@@ -0,0 +1,195 @@
+"""Whole-estimate costing in IntelligentSearchEngine and FrontendReadyRAGSystem.
+
+Run: python -m unittest test_costing   (or python -m pytest test_costing.py)
+"""
+
+import unittest
+
+import numpy as np
+
+from benchmark import StubEncoder, generate_ssr_pdf, _quiet
+
+with _quiet(True):
+    from vec2 import EnhancedPDFProcessor, FrontendReadyRAGSystem, IntelligentSearchEngine, RateItem
+
+
+def parse_rate(value):
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+def make_item(sr_no: str, description: str, rate: str) -> RateItem:
+    return RateItem(
+        primary_key=f"key-{sr_no}", sr_no=sr_no, description=description, unit="bag",
+        rate_2023_24=rate, rate_2024_25=rate, section="MATERIALS", page_number=1, table_index=0,
+        raw_text=description, metadata={}, embedding_text=description,
+        search_keywords=description.lower().split(), display_text=description
+    )
+
+
+def make_processor(*items: RateItem) -> EnhancedPDFProcessor:
+    processor = EnhancedPDFProcessor()
+    for item in items:
+        processor.items_database[item.primary_key] = item
+        processor._index_item_advanced(item)
+    with _quiet(True):
+        processor._build_advanced_indexes()
+    return processor
+
+
+def serve(processor: EnhancedPDFProcessor, **engine_options) -> FrontendReadyRAGSystem:
+    system = FrontendReadyRAGSystem("")
+    engine_options.setdefault("encoder_backend", "none")
+    with _quiet(True):
+        system.search_engine = IntelligentSearchEngine(processor.items_database, processor, **engine_options)
+    system.processor, system.items_database = processor, processor.items_database
+    system.is_initialized = True
+    return system
+
+
+class CostEstimateTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        pdf_bytes, _ = generate_ssr_pdf(pages=6, rows_per_page=10, text_lines_per_page=3)
+        processor = EnhancedPDFProcessor()
+        with _quiet(True):
+            processor.process_pdf(pdf_bytes)
+        cls.items = list(processor.items_database.values())
+        cls.system = serve(processor)
+
+    def test_amounts_and_subtotals_match_brute_force(self):
+        lines = [{"item_key": item.primary_key, "quantity": 1.5 + i} for i, item in enumerate(self.items)]
+
+        result = self.system.cost_estimate(lines)
+
+        total, subtotals = 0.0, {}
+        for line, costed, item in zip(lines, result["lines"], self.items):
+            rate = parse_rate(item.rate_2024_25)
+            with self.subTest(item=item.primary_key):
+                self.assertEqual(costed["status"], "ok" if rate is not None else "no_rate")
+                self.assertEqual(costed["rate"], rate)
+            if rate is not None:
+                self.assertAlmostEqual(costed["amount"], line["quantity"] * rate)
+                total += line["quantity"] * rate
+                subtotals[item.section] = subtotals.get(item.section, 0.0) + line["quantity"] * rate
+
+        self.assertAlmostEqual(result["total_amount"], total)
+        self.assertEqual(set(result["section_subtotals"]), {s for s, amount in subtotals.items() if amount})
+        for section, amount in subtotals.items():
+            self.assertAlmostEqual(result["section_subtotals"][section], amount)
+
+    def test_line_statuses(self):
+        item = next(item for item in self.items if parse_rate(item.rate_2024_25) is not None and item.unit)
+        lines = [
+            {"item_key": item.primary_key, "quantity": 2, "unit": item.unit},
+            {"item_key": item.primary_key, "quantity": 2, "unit": "not-a-unit"},
+            {"item_key": "no-such-key", "quantity": 2},
+            {"description": item.description, "quantity": 2},
+        ]
+
+        result = self.system.cost_estimate(lines)
+
+        self.assertEqual([line["status"] for line in result["lines"]], ["ok", "unit_mismatch", "unresolved", "ok"])
+        self.assertEqual(result["lines"][3]["resolved_by"], "description")
+        self.assertEqual(result["priced_lines"], 2)
+        self.assertAlmostEqual(result["total_amount"], 4 * parse_rate(item.rate_2024_25))
+
+    def test_no_lines(self):
+        result = self.system.cost_estimate([])
+
+        self.assertEqual(result["status"], "success")
+        self.assertEqual((result["lines"], result["total_amount"], result["section_subtotals"]), ([], 0.0, {}))
+
+
+class FallbackResolutionTest(unittest.TestCase):
+    def setUp(self):
+        self.system = serve(make_processor(
+            make_item("1", "Portland cement 43 grade", "400"),
+            make_item("2", "Portland cement 53 grade", "450"),
+            make_item("3", "River sand", "60"),
+        ))
+
+    def test_tied_lexical_match_is_ambiguous(self):
+        result = self.system.cost_estimate([{"description": "portland cement bags", "quantity": 10}])
+
+        line = result["lines"][0]
+        self.assertEqual((line["status"], line["resolved_by"], line["item"], line["amount"]),
+                         ("ambiguous", "ambiguous", None, None))
+        self.assertEqual((result["total_amount"], result["review_amount"]), (0.0, 0.0))
+
+    def test_unique_lexical_match_needs_review(self):
+        result = self.system.cost_estimate([
+            {"description": "coarse river sand", "quantity": 10},
+            {"description": "river sand", "quantity": 1},
+        ])
+
+        review, exact = result["lines"]
+        self.assertEqual((review["status"], review["resolved_by"], review["item"]["id"]),
+                         ("needs_review", "keyword", "key-3"))
+        self.assertEqual(review["amount"], 600.0)
+        self.assertEqual((exact["status"], exact["resolved_by"]), ("ok", "description"))
+        self.assertEqual((result["priced_lines"], result["review_lines"]), (1, 1))
+        self.assertEqual((result["total_amount"], result["review_amount"]), (60.0, 600.0))
+        self.assertEqual(result["section_subtotals"], {"MATERIALS": 60.0})
+
+
+class AlteredDescriptionTest(unittest.TestCase):
+    """Lines whose description was reworded never come back "ok" against a guessed item"""
+
+    @classmethod
+    def setUpClass(cls):
+        pdf_bytes, _ = generate_ssr_pdf(pages=6, rows_per_page=10, text_lines_per_page=3)
+        processor = EnhancedPDFProcessor()
+        with _quiet(True):
+            processor.process_pdf(pdf_bytes)
+        cls.items = list(processor.items_database.values())
+        cls.system = serve(processor, model=StubEncoder(dimension=64), encoder_backend=None)
+
+    def test_only_exact_lines_are_ok(self):
+        lines = [{"description": " ".join(item.description.split()[:-1]) + " (as directed)", "quantity": 1}
+                 for item in self.items]
+        lines += [{"description": item.description.upper(), "quantity": 1} for item in self.items]
+
+        result = self.system.cost_estimate(lines)
+
+        statuses = [line["status"] for line in result["lines"]]
+        for costed, line in zip(result["lines"], lines):
+            with self.subTest(description=line["description"]):
+                if costed["resolved_by"] in ("semantic", "keyword", "partial", "fuzzy"):
+                    self.assertEqual(costed["status"], "needs_review")
+                if costed["status"] == "ok":
+                    self.assertEqual(costed["item"]["description"].lower(), line["description"].lower())
+        self.assertEqual(statuses[len(self.items):], ["ok"] * len(self.items))
+        self.assertNotIn("ok", statuses[:len(self.items)])
+        self.assertIn("needs_review", statuses)
+        self.assertAlmostEqual(result["total_amount"], sum(line["amount"] for line in result["lines"]
+                                                           if line["status"] == "ok"))
+
+
+class EmptyIndexCostEstimateTest(unittest.TestCase):
+    def setUp(self):
+        processor = EnhancedPDFProcessor()
+        with _quiet(True):
+            processor._build_advanced_indexes()
+        self.system = serve(processor)
+
+    def test_every_line_is_unresolved(self):
+        lines = [{"item_key": "key-1", "quantity": 3, "unit": "cum"}, {"description": "cement", "quantity": 1}]
+
+        result = self.system.cost_estimate(lines)
+
+        self.assertEqual(result["status"], "success")
+        self.assertEqual([line["status"] for line in result["lines"]], ["unresolved", "unresolved"])
+        self.assertEqual((result["priced_lines"], result["total_amount"], result["section_subtotals"]), (0, 0.0, {}))
+
+    def test_engine_returns_empty_arrays(self):
+        costing = self.system.search_engine.cost_estimate([], [], [], [])
+
+        self.assertEqual(costing["total"], 0.0)
+        np.testing.assert_array_equal(costing["rows"], np.array([], dtype=np.int64))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+"""Page-hash differential re-ingestion and FrontendReadyRAGSystem.refresh.
+
+Run: python -m unittest test_differential_ingest   (or python -m pytest test_differential_ingest.py)
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from benchmark import StubEncoder, generate_ssr_pdf, _quiet
+
+with _quiet(True):
+    from vec2 import EnhancedPDFProcessor, FrontendReadyRAGSystem, PDFFetcher
+
+
+def revise(pdf_bytes: bytes, rows, page_number: int) -> bytes:
+    """Same PDF with one table row on page_number upper-cased (same length, so offsets hold)"""
+    row = next(r for r in rows if r.page_number == page_number and r.source == "table")
+    return pdf_bytes.replace(row.description.encode(), row.description.upper().encode())
+
+
+def ingest(*pdfs) -> EnhancedPDFProcessor:
+    processor = EnhancedPDFProcessor()
+    with _quiet(True):
+        for pdf_bytes in pdfs:
+            processor.process_pdf(pdf_bytes)
+    return processor
+
+
+class DifferentialIngestTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.pdf_bytes, rows = generate_ssr_pdf(pages=6, rows_per_page=10, text_lines_per_page=3)
+        cls.revised = revise(cls.pdf_bytes, rows, page_number=3)
+
+    def test_only_the_changed_page_is_reextracted(self):
+        processor = ingest(self.pdf_bytes, self.revised)
+
+        self.assertTrue(processor.last_ingest["incremental"])
+        self.assertEqual(processor.last_ingest["pages_extracted"], 1)
+        self.assertEqual(len(processor.last_ingest["added_keys"]), len(processor.last_ingest["removed_keys"]))
+
+    def test_unchanged_pdf_extracts_nothing(self):
+        processor = ingest(self.pdf_bytes, self.pdf_bytes)
+
+        self.assertEqual(processor.last_ingest["pages_extracted"], 0)
+        self.assertEqual(processor.last_ingest["added_keys"], [])
+
+    def test_incremental_matches_full_rebuild(self):
+        incremental = ingest(self.pdf_bytes, self.revised)
+        full = ingest(self.revised)
+
+        self.assertEqual(list(incremental.items_database), list(full.items_database))
+        for name in ["keyword_index", "ngram_index", "section_mapping", "item_number_index", "description_index"]:
+            with self.subTest(index=name):
+                self.assertEqual(dict(getattr(incremental, name)), dict(getattr(full, name)))
+        for column in ["rate_2023_24", "rate_2024_25"]:
+            np.testing.assert_array_equal(incremental.rate_columns.rates[column], full.rate_columns.rates[column])
+
+    def test_update_never_mutates_published_indexes(self):
+        processor = ingest(self.pdf_bytes)
+        items = dict(processor.items_database)
+        keyword_index = {term: set(keys) for term, keys in processor.keyword_index.items()}
+        published = (processor.items_database, processor.keyword_index, processor.ngram_index)
+
+        with _quiet(True):
+            processor.process_pdf(self.revised)
+
+        self.assertEqual(published[0], items)
+        self.assertEqual({term: set(keys) for term, keys in published[1].items()}, keyword_index)
+        self.assertIsNot(processor.items_database, published[0])
+
+
+class RefreshTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.pdf_path = os.path.join(self.tmp_dir, "rates.pdf")
+        self.pdf_bytes, rows = generate_ssr_pdf(pages=6, rows_per_page=10, text_lines_per_page=3)
+        self.revised = revise(self.pdf_bytes, rows, page_number=3)
+        with open(self.pdf_path, "wb") as fh:
+            fh.write(self.pdf_bytes)
+
+        self.encoder = StubEncoder(dimension=64)
+        self.system = FrontendReadyRAGSystem(self.pdf_path, fetcher=PDFFetcher(cache_dir=self.tmp_dir),
+                                             model=self.encoder)
+        with _quiet(True):
+            self.system.initialize()
+
+    def tearDown(self):
+        self.system.fetcher.session.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_refresh_swaps_in_a_new_engine(self):
+        old_engine = self.system.search_engine
+        old_keys = list(old_engine.items_database)
+        old_embeddings = old_engine._embeddings
+        with open(self.pdf_path, "wb") as fh:
+            fh.write(self.revised)
+
+        with _quiet(True):
+            result = self.system.refresh()
+
+        self.assertEqual(result["status"], "success")
+        self.assertEqual(result["changes"]["pages_extracted"], 1)
+        self.assertIsNot(self.system.search_engine, old_engine)
+        # A query that started before the refresh still sees the complete old state
+        self.assertEqual(list(old_engine.items_database), old_keys)
+        self.assertIs(old_engine._embeddings, old_embeddings)
+        self.assertIs(self.system.items_database, self.system.search_engine.items_database)
+
+    def test_refreshed_embeddings_line_up_with_keys(self):
+        with open(self.pdf_path, "wb") as fh:
+            fh.write(self.revised)
+        with _quiet(True):
+            self.system.refresh()
+
+        engine = self.system.search_engine
+        keys, matrix, _ = engine._embeddings
+        self.assertEqual(sorted(keys), sorted(engine.items_database))
+        for row, key in enumerate(keys):
+            expected = self.encoder.encode(engine.items_database[key].embedding_text)
+            np.testing.assert_allclose(matrix[row], expected, atol=1e-6)
+
+
+if __name__ == "__main__":
+    unittest.main()
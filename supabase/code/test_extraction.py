@@ -0,0 +1,62 @@
+"""Single-pass page extraction in EnhancedPDFProcessor: tables plus free-text rate lines.
+
+Run: python -m unittest test_extraction   (or python -m pytest test_extraction.py)
+"""
+
+import unittest
+from collections import Counter
+
+from benchmark import generate_ssr_pdf, _quiet
+
+with _quiet(True):
+    from vec2 import EnhancedPDFProcessor
+
+
+class ExtractPageTest(unittest.TestCase):
+    def extract(self, **options):
+        pdf_bytes, rows = generate_ssr_pdf(pages=4, rows_per_page=10, text_lines_per_page=3, **options)
+        processor = EnhancedPDFProcessor()
+        with _quiet(True):
+            items = processor.process_pdf(pdf_bytes)
+        return rows, list(items.values())
+
+    def test_dotted_serials_in_a_ruled_table_yield_one_item_per_row(self):
+        # "12." inside the table also matches the free-text serial patterns, so a table row
+        # parsed a second time as text would show up twice
+        rows, items = self.extract(serial_suffix=".")
+        counts = Counter(item.description.lower() for item in items)
+
+        for row in rows:
+            with self.subTest(sr_no=row.sr_no, source=row.source):
+                self.assertEqual(counts[row.description.lower()], 1)
+        self.assertEqual(len(items), len(rows))
+
+    def test_table_rows_keep_their_columns(self):
+        rows, items = self.extract(serial_suffix=".")
+        by_description = {item.description.lower(): item for item in items}
+
+        for row in rows:
+            if row.source != "table":
+                continue
+            item = by_description[row.description.lower()]
+            with self.subTest(sr_no=row.sr_no):
+                self.assertEqual(item.sr_no.rstrip("."), row.sr_no)
+                self.assertEqual((item.unit, item.rate_2023_24, item.rate_2024_25, item.page_number),
+                                 (row.unit, row.rate_2023_24, row.rate_2024_25, row.page_number))
+
+    def test_free_text_lines_outside_the_table_are_extracted(self):
+        for suffix in ["", "."]:
+            rows, items = self.extract(serial_suffix=suffix)
+            by_description = {item.description.lower(): item for item in items}
+            text_rows = [row for row in rows if row.source == "text"]
+
+            self.assertTrue(text_rows)
+            for row in text_rows:
+                with self.subTest(suffix=suffix, sr_no=row.sr_no):
+                    item = by_description.get(row.description.lower())
+                    self.assertIsNotNone(item)
+                    self.assertEqual((item.rate_2024_25, item.page_number), (row.rate_2024_25, row.page_number))
+
+
+if __name__ == "__main__":
+    unittest.main()
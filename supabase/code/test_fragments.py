@@ -0,0 +1,94 @@
+"""ItemFragments and the *_json endpoints against their dict counterparts.
+
+Run: python -m unittest test_fragments   (or python -m pytest test_fragments.py)
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from benchmark import generate_ssr_pdf, _quiet
+
+with _quiet(True):
+    from vec2 import ORJSON_AVAILABLE, FrontendReadyRAGSystem, ItemFragments, PDFFetcher
+
+
+class FragmentsTest(unittest.TestCase):
+    QUERIES = ["cement", "item 12", "steel bars", "pipe", "no such thing"]
+    FILTERS = [{"section": "EARTHWORK"}, {"material_type": "cement"}, {"item_no": "7"}]
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.mkdtemp()
+        pdf_path = os.path.join(cls.tmp_dir, "rates.pdf")
+        pdf_bytes, _ = generate_ssr_pdf(pages=6, rows_per_page=10, text_lines_per_page=3)
+        with open(pdf_path, "wb") as fh:
+            fh.write(pdf_bytes)
+
+        cls.systems = {}
+        for fast_json in [False, True]:
+            system = FrontendReadyRAGSystem(pdf_path, fetcher=PDFFetcher(cache_dir=cls.tmp_dir),
+                                            fast_json=fast_json, encoder_backend="none")
+            with _quiet(True):
+                system.initialize()
+            system.fetcher.session.close()
+            cls.systems[fast_json] = system
+
+        cls.db_path = os.path.join(cls.tmp_dir, "rates.db")
+        with _quiet(True):
+            cls.systems[False].build_sqlite_index(cls.db_path)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp_dir, ignore_errors=True)
+
+    def assert_endpoints_match(self, system: FrontendReadyRAGSystem):
+        for query in self.QUERIES:
+            with self.subTest(query=query):
+                self.assertEqual(json.loads(system.get_suggestions_json(query)), system.get_suggestions(query))
+        for filters in self.FILTERS:
+            with self.subTest(filters=filters):
+                self.assertEqual(json.loads(system.search_with_filters_json(**filters)),
+                                 system.search_with_filters(**filters))
+        for primary_key in list(system.items_database)[:10] + ["no-such-key"]:
+            with self.subTest(primary_key=primary_key):
+                self.assertEqual(json.loads(system.get_item_details_json(primary_key)),
+                                 system.get_item_details(primary_key))
+
+    def test_fragments_cover_the_corpus(self):
+        system = self.systems[False]
+
+        self.assertEqual(len(system.fragments), len(system.items_database))
+        self.assert_endpoints_match(system)
+
+    @unittest.skipUnless(ORJSON_AVAILABLE, "orjson not installed")
+    def test_fast_json_matches(self):
+        self.assert_endpoints_match(self.systems[True])
+
+    def test_sqlite_worker_cache_is_bounded(self):
+        with _quiet(True):
+            system = FrontendReadyRAGSystem.from_sqlite_index(self.db_path, encoder_backend="none")
+        self.assertEqual(system.fragments.max_items, ItemFragments.LAZY_MAX_ITEMS)
+        system.fragments.max_items = 5
+
+        self.assert_endpoints_match(system)
+        self.assertEqual(len(system.fragments), 5)
+
+    def test_lru_keeps_recently_used_items(self):
+        items = list(self.systems[False].items_database.values())[:4]
+        fragments = ItemFragments(max_items=2)
+
+        fragments.item(items[0])
+        fragments.item(items[1])
+        fragments.item(items[0])  # now the most recently used
+        fragments.item(items[2])
+
+        self.assertEqual(list(fragments._cache), [items[0].primary_key, items[2].primary_key])
+        self.assertEqual(json.loads(fragments.items(items)), [item.to_frontend_dict() for item in items])
+        self.assertEqual(len(fragments), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
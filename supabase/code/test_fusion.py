@@ -0,0 +1,119 @@
+"""Candidate fusion and top-k selection in IntelligentSearchEngine.
+
+Run: python -m unittest test_fusion   (or python -m pytest test_fusion.py)
+"""
+
+import unittest
+
+import numpy as np
+
+from benchmark import _quiet
+
+with _quiet(True):
+    from vec2 import EnhancedPDFProcessor, IntelligentSearchEngine, RateItem
+
+
+def make_item(sr_no: str, description: str, section: str = "MATERIALS") -> RateItem:
+    return RateItem(
+        primary_key=f"key-{sr_no}", sr_no=sr_no, description=description, unit="no",
+        rate_2023_24="100", rate_2024_25="110", section=section, page_number=1, table_index=0,
+        raw_text=description, metadata={}, embedding_text=description,
+        search_keywords=description.lower().split(), display_text=description
+    )
+
+
+def make_engine(**options) -> IntelligentSearchEngine:
+    processor = EnhancedPDFProcessor()
+    for item in [make_item("12", "Portland cement"), make_item("13", "Cement mortar"), make_item("14", "River sand")]:
+        processor.items_database[item.primary_key] = item
+        processor._index_item_advanced(item)
+    with _quiet(True):
+        processor._build_advanced_indexes()
+        return IntelligentSearchEngine(processor.items_database, processor, encoder_backend="none", **options)
+
+
+class FixedQueryEncoder:
+    """Encodes every query as the same vector"""
+
+    def __init__(self, vector: np.ndarray):
+        self.vector = vector
+
+    def encode(self, sentences, **kwargs):
+        return self.vector.copy()
+
+
+class FusionTest(unittest.TestCase):
+    STAGES = ["exact_item", "keyword", "fuzzy", "partial", "semantic"]
+
+    def test_rrf_counts_a_duplicated_key_once_per_stage(self):
+        engine = make_engine(fusion_method="rrf")
+        once = engine._fuse_candidates([("exact_item", [(1.0, "key-12", ["item 12"])])], 10)
+        twice = engine._fuse_candidates([("exact_item", [(1.0, "key-12", ["item 12"])] * 2)], 10)
+
+        self.assertEqual(len(twice), 1)
+        self.assertAlmostEqual(twice[0].relevance_score, once[0].relevance_score)
+        self.assertAlmostEqual(twice[0].relevance_score, 1.0)
+
+    def test_rrf_duplicate_keeps_its_best_rank(self):
+        engine = make_engine(fusion_method="rrf")
+        suggestions = engine._fuse_candidates([("partial", [
+            (0.8, "key-13", ["cement"]), (0.6, "key-12", ["cement"]), (0.4, "key-13", ["cement"]),
+        ])], 10)
+
+        self.assertEqual([s.item.primary_key for s in suggestions], ["key-13", "key-12"])
+        self.assertAlmostEqual(suggestions[1].relevance_score, (engine.rrf_k + 1) / (engine.rrf_k + 2))
+
+    def test_rrf_score_never_exceeds_one(self):
+        engine = make_engine(fusion_method="rrf")
+        stage_results = [(name, [(1.0, "key-12", ["12"])] * 3) for name in self.STAGES]
+
+        suggestions = engine._fuse_candidates(stage_results, 10)
+
+        self.assertEqual(len(suggestions), 1)
+        self.assertAlmostEqual(suggestions[0].relevance_score, 1.0)
+
+    def test_weighted_keeps_highest_score(self):
+        engine = make_engine()
+        suggestions = engine._fuse_candidates([
+            ("keyword", [(0.5, "key-12", ["cement"]), (0.5, "key-13", ["cement"])]),
+            ("partial", [(0.8, "key-13", ["cement"]), (0.4, "key-13", ["cement"])]),
+        ], 10)
+
+        self.assertEqual([(s.item.primary_key, s.relevance_score, s.match_type) for s in suggestions],
+                         [("key-13", 0.8, "partial"), ("key-12", 0.5, "keyword")])
+
+    def test_exact_item_stage_emits_each_item_once(self):
+        engine = make_engine(fusion_method="rrf")
+
+        for query in ["12", "item 12", "sr no 12", "12."]:
+            with self.subTest(query=query):
+                self.assertEqual(engine._get_exact_item_matches(query), [(1.0, "key-12", ["item 12"])])
+
+    def test_top_candidates_breaks_ties_on_primary_key(self):
+        candidates = [(0.6, "b", []), (0.8, "c", []), (0.6, "a", []), (0.4, "d", [])]
+
+        self.assertEqual([c[1] for c in IntelligentSearchEngine._top_candidates(candidates, 3)], ["c", "a", "b"])
+
+    def test_semantic_top_k_matches_stable_argsort(self):
+        rng = np.random.default_rng(3)
+        for trial in range(200):
+            # Few distinct angles, so many rows tie on similarity
+            angles = rng.integers(0, 8, size=rng.integers(1, 60)) * (np.pi / 16)
+            matrix = np.zeros((len(angles), 4), dtype=np.float32)
+            matrix[:, 0], matrix[:, 1] = np.cos(angles), np.sin(angles)
+            keys = [f"key-{i}" for i in range(len(angles))]
+            limit = int(rng.integers(1, 12))
+
+            engine = make_engine(model=FixedQueryEncoder(np.array([1, 0, 0, 0], dtype=np.float32)),
+                                 precomputed_embeddings=(keys, matrix))
+            similarities = matrix @ np.array([1, 0, 0, 0], dtype=np.float32)
+            hits = np.flatnonzero(similarities > 0.5)
+            expected = np.sort(hits[np.argsort(-similarities[hits], kind="stable")[:limit]])
+
+            with self.subTest(trial=trial):
+                self.assertEqual([c[1] for c in engine._get_semantic_matches("query", limit)],
+                                 [keys[i] for i in expected])
+
+
+if __name__ == "__main__":
+    unittest.main()
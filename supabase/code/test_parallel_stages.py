@@ -0,0 +1,79 @@
+"""Parallel match stages and the per-request deadline in IntelligentSearchEngine.
+
+Run: python -m unittest test_parallel_stages   (or python -m pytest test_parallel_stages.py)
+"""
+
+import time
+import unittest
+
+from benchmark import StubEncoder, generate_ssr_pdf, _quiet
+
+with _quiet(True):
+    from vec2 import EnhancedPDFProcessor, IntelligentSearchEngine
+
+
+class SlowQueryEncoder(StubEncoder):
+    """StubEncoder that takes `delay` seconds to encode a single query string"""
+
+    def __init__(self, delay: float, **kwargs):
+        super().__init__(**kwargs)
+        self.delay = delay
+
+    def encode(self, sentences, **kwargs):
+        if isinstance(sentences, str):
+            time.sleep(self.delay)
+        return super().encode(sentences, **kwargs)
+
+
+def ranking(suggestions):
+    return [(s.item.primary_key, s.relevance_score, s.match_type) for s in suggestions]
+
+
+class ParallelStagesTest(unittest.TestCase):
+    QUERIES = ["cement", "item 12", "12", "steel bars", "grade", "earth work excavation", "pipe 100 mm", "zz"]
+
+    @classmethod
+    def setUpClass(cls):
+        pdf_bytes, _ = generate_ssr_pdf(pages=6, rows_per_page=10, text_lines_per_page=3)
+        cls.processor = EnhancedPDFProcessor()
+        with _quiet(True):
+            items = cls.processor.process_pdf(pdf_bytes)
+            cls.engine = IntelligentSearchEngine(items, cls.processor, model=StubEncoder(dimension=64))
+            cls.slow_engine = IntelligentSearchEngine(
+                items, cls.processor, model=SlowQueryEncoder(0.5, dimension=64), parallel_stages=True
+            )
+
+    def test_parallel_matches_sequential(self):
+        for query in self.QUERIES:
+            for limit in [1, 5, 20]:
+                with self.subTest(query=query, limit=limit):
+                    self.assertEqual(ranking(self.engine.get_suggestions(query, limit, parallel=True)),
+                                     ranking(self.engine.get_suggestions(query, limit, parallel=False)))
+
+    def test_late_stage_is_dropped_and_counted(self):
+        timeouts = self.slow_engine.stage_timeouts["semantic"]
+
+        start = time.perf_counter()
+        suggestions = self.slow_engine.get_suggestions("cement", 10, deadline_ms=100)
+        elapsed = time.perf_counter() - start
+
+        self.assertLess(elapsed, 0.4)
+        self.assertTrue(suggestions)
+        self.assertNotIn("semantic", {s.match_type for s in suggestions})
+        self.assertEqual(self.slow_engine.stage_timeouts["semantic"], timeouts + 1)
+
+    def test_no_deadline_waits_for_every_stage(self):
+        suggestions = self.slow_engine.get_suggestions("cement", 10, deadline_ms=None)
+
+        self.assertEqual(ranking(suggestions), ranking(self.engine.get_suggestions("cement", 10)))
+
+    def test_exact_item_is_never_dropped(self):
+        primary_key = self.processor.item_number_index["12"]
+
+        suggestions = self.slow_engine.get_suggestions("item 12", 10, deadline_ms=0)
+
+        self.assertEqual((suggestions[0].item.primary_key, suggestions[0].match_type), (primary_key, "exact_item"))
+
+
+if __name__ == "__main__":
+    unittest.main()
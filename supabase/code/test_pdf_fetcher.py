@@ -0,0 +1,151 @@
+"""PDFFetcher against a local http.server: retries and conditional GET.
+
+Run: python -m unittest test_pdf_fetcher   (or python -m pytest test_pdf_fetcher.py)
+"""
+
+import hashlib
+import http.server
+import shutil
+import socket
+import tempfile
+import threading
+import unittest
+
+import requests
+
+from vec2 import PDFFetcher
+
+
+class RatePDFHandler(http.server.BaseHTTPRequestHandler):
+    """Serves server.body with an ETag; answers the first server.failures GETs with 503
+    and cuts the body of the next server.truncations responses short"""
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append({"path": self.path, "if_none_match": self.headers.get("If-None-Match")})
+
+        if server.failures > 0:
+            server.failures -= 1
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        etag = '"%s"' % hashlib.sha256(server.body).hexdigest()[:16]
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Type", "application/pdf")
+        self.send_header("Content-Length", str(len(server.body)))
+        self.end_headers()
+        if server.truncations > 0:
+            server.truncations -= 1
+            self.wfile.write(server.body[:len(server.body) // 2])
+            self.close_connection = True
+            return
+        self.wfile.write(server.body)
+
+
+class DroppingServer:
+    """Accepts TCP connections and closes them at once, counting each attempt"""
+
+    def __init__(self):
+        self.sock = socket.socket()
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen(16)
+        self.port = self.sock.getsockname()[1]
+        self.connections = 0
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            self.connections += 1
+            conn.close()
+
+    def close(self):
+        self.sock.close()
+
+
+class PDFFetcherTest(unittest.TestCase):
+    def setUp(self):
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), RatePDFHandler)
+        self.server.body = b"%PDF-1.4 rates " * 1000
+        self.server.failures = 0
+        self.server.truncations = 0
+        self.server.requests = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        self.cache_dir = tempfile.mkdtemp()
+        self.fetcher = PDFFetcher(cache_dir=self.cache_dir, backoff_factor=0.01)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/rates.pdf"
+
+    def tearDown(self):
+        self.fetcher.session.close()
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_retries_503_then_downloads(self):
+        self.server.failures = 1
+
+        data = self.fetcher.fetch(self.url + "?token=first")
+
+        self.assertEqual(data, self.server.body)
+        self.assertEqual(self.fetcher.last_fetch["status"], "downloaded")
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_truncated_body_is_downloaded_again(self):
+        self.server.truncations = 1
+
+        data = self.fetcher.fetch(self.url + "?token=first")
+
+        self.assertEqual(data, self.server.body)
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_connection_retries_do_not_stack(self):
+        dropping = DroppingServer()
+        fetcher = PDFFetcher(cache_dir=self.cache_dir, max_retries=3, backoff_factor=0.0)
+        try:
+            with self.assertRaises(requests.exceptions.ConnectionError):
+                fetcher.fetch(f"http://127.0.0.1:{dropping.port}/rates.pdf")
+        finally:
+            fetcher.session.close()
+            dropping.close()
+
+        # One first try plus max_retries adapter retries, and no outer loop on top
+        self.assertEqual(dropping.connections, 4)
+
+    def test_rotated_token_gets_304_from_cache(self):
+        first = self.fetcher.fetch(self.url + "?token=first")
+
+        second = self.fetcher.fetch(self.url + "?token=second")
+
+        self.assertEqual(second, first)
+        self.assertEqual(self.fetcher.last_fetch["status"], "not_modified")
+        self.assertIsNotNone(self.server.requests[-1]["if_none_match"])
+        self.assertTrue(self.server.requests[-1]["path"].endswith("token=second"))
+
+    def test_changed_pdf_is_downloaded_again(self):
+        self.fetcher.fetch(self.url + "?token=first")
+        self.server.body = b"%PDF-1.4 revised rates"
+
+        data = self.fetcher.fetch(self.url + "?token=second")
+
+        self.assertEqual(data, self.server.body)
+        self.assertEqual(self.fetcher.last_fetch["status"], "downloaded")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+"""RateColumns range and rate-sorted queries against a brute-force scan.
+
+Run: python -m unittest test_rate_columns   (or python -m pytest test_rate_columns.py)
+"""
+
+import random
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from benchmark import _quiet
+
+with _quiet(True):
+    from vec2 import RATE_COLUMNS, RateColumns, _normalize_unit
+
+
+RATES = [None, "", "n/a", "0", "12.5", "12.5", "100", "250.75", "999", "5000"]
+SECTIONS = ["EARTHWORK", "Concrete", "concrete works"]
+UNITS = ["cum", "m3", "Nos", "rmt", None]
+
+
+def random_fields(rng: random.Random, n: int):
+    keys = [f"key-{i}" for i in range(n)]
+    sections = [rng.choice(SECTIONS) for _ in range(n)]
+    units = [rng.choice(UNITS) for _ in range(n)]
+    rates = {name: [rng.choice(RATES) for _ in range(n)] for name in RATE_COLUMNS}
+    return keys, sections, units, rates
+
+
+def parse(value):
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+def brute_force(fields, column, low=None, high=None, section=None, unit=None, rows=None, descending=False):
+    keys, sections, units, rates = fields
+    ranged = low is not None or high is not None
+    passing = []
+    for row in range(len(keys)):
+        rate = parse(rates[column][row])
+        if ranged and (rate is None or (low is not None and rate < low) or (high is not None and rate > high)):
+            continue
+        if section and sections[row].lower() != section.lower():
+            continue
+        if unit and _normalize_unit(units[row]) != _normalize_unit(unit):
+            continue
+        if rows is not None and row not in rows:
+            continue
+        passing.append(row)
+
+    rated = [row for row in passing if parse(rates[column][row]) is not None]
+    unrated = [row for row in passing if parse(rates[column][row]) is None]
+    # Ties stay in row order ascending; descending is that order reversed
+    rated.sort(key=lambda row: parse(rates[column][row]))
+    return (rated[::-1] if descending else rated) + unrated
+
+
+class RateColumnsTest(unittest.TestCase):
+    def test_select_matches_brute_force(self):
+        rng = random.Random(7)
+        for trial in range(300):
+            fields = random_fields(rng, rng.randint(0, 40))
+            columns = RateColumns.from_fields(*fields)
+            query = {
+                "column": rng.choice(RATE_COLUMNS),
+                "low": rng.choice([None, 0.0, 12.5, 100.0, 300.0]),
+                "high": rng.choice([None, 12.5, 250.75, 1000.0, 5.0]),
+                "section": rng.choice([None, "concrete", "EARTHWORK", "missing"]),
+                "unit": rng.choice([None, "cu.m", "nos", "rmt"]),
+                "rows": rng.choice([None, set(rng.sample(range(len(fields[0])), len(fields[0]) // 2))]),
+                "descending": rng.random() < 0.5,
+            }
+            rows = None if query["rows"] is None else np.array(sorted(query["rows"]), dtype=np.int64)
+
+            selected = columns.select(query["column"], query["low"], query["high"], query["section"],
+                                      query["unit"], rows, query["descending"])
+
+            with self.subTest(trial=trial, **{k: v for k, v in query.items() if k != "rows"}):
+                self.assertEqual(selected.tolist(), brute_force(fields, **query))
+
+    def test_rows_in_range_is_inclusive(self):
+        columns = RateColumns.from_fields(*random_fields(random.Random(1), 0))
+        self.assertEqual(columns.rows_in_range().tolist(), [])
+
+        fields = (["a", "b", "c", "d"], ["S"] * 4, ["cum"] * 4,
+                  {name: ["100", None, "12.5", "100"] for name in RATE_COLUMNS})
+        columns = RateColumns.from_fields(*fields)
+
+        self.assertEqual(columns.rows_in_range("rate_2024_25", 12.5, 100).tolist(), [2, 0, 3])
+        self.assertEqual(columns.rows_in_range("rate_2024_25", 100, 12.5).tolist(), [])
+        with self.assertRaises(ValueError):
+            columns.rows_in_range("rate_2030_31")
+
+    def test_saved_columns_answer_the_same(self):
+        fields = random_fields(random.Random(3), 50)
+        columns = RateColumns.from_fields(*fields)
+        directory = tempfile.mkdtemp()
+        try:
+            columns.save(directory)
+            mapped = RateColumns.load(directory, fields[0])
+            for descending in [False, True]:
+                for section in [None, "concrete"]:
+                    with self.subTest(descending=descending, section=section):
+                        self.assertEqual(
+                            mapped.select("rate_2024_25", 10, 1000, section, descending=descending).tolist(),
+                            columns.select("rate_2024_25", 10, 1000, section, descending=descending).tolist()
+                        )
+            np.testing.assert_array_equal(mapped.escalation_pct, columns.escalation_pct)
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
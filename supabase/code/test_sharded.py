@@ -0,0 +1,133 @@
+"""ShardedSearchEngine over several schedules.
+
+Run: python -m unittest test_sharded   (or python -m pytest test_sharded.py)
+"""
+
+import unittest
+
+from benchmark import StubEncoder, generate_ssr_pdf, _quiet
+
+with _quiet(True):
+    from vec2 import BatchingEncoder, EnhancedPDFProcessor, IntelligentSearchEngine, ShardedSearchEngine, shard_item_id
+
+
+def ranking(suggestions):
+    return [(s.item.primary_key, round(s.relevance_score, 6), s.match_type) for s in suggestions]
+
+
+class ShardedSearchTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        pdf_bytes, _ = generate_ssr_pdf(pages=8, rows_per_page=10, text_lines_per_page=3)
+        cls.engine = ShardedSearchEngine(model=StubEncoder(dimension=64), batch_window_ms=1.0, max_batch_size=8)
+        with _quiet(True):
+            cls.engine.load_schedule("SSR 2023-24", pdf_bytes, split_sections=True)
+            cls.engine.load_schedule("SSR 2024-25", pdf_bytes, split_sections=False)
+
+    def test_shards_share_one_batching_encoder(self):
+        self.assertIsInstance(self.engine.model, BatchingEncoder)
+        self.assertEqual(self.engine.model.max_batch_size, 8)
+        for name, shard in self.engine.shards.items():
+            with self.subTest(shard=name):
+                self.assertIs(shard.model, self.engine.model)
+
+    def test_suggestion_ids_are_shard_qualified(self):
+        suggestions = self.engine.get_suggestions("cement", max_suggestions=5)
+
+        self.assertTrue(suggestions)
+        for suggestion in suggestions:
+            item_id = suggestion.to_dict()["item"]["id"]
+            self.assertEqual(item_id, shard_item_id(suggestion.shard, suggestion.item.primary_key))
+            self.assertIs(self.engine.get_exact_item(item_id), suggestion.item)
+
+    def test_schedule_filter_prunes_shards(self):
+        for schedule in ["SSR 2023-24", "ssr 2024-25"]:
+            with self.subTest(schedule=schedule):
+                shards = {name for name, _ in self.engine._select_shards(schedule)}
+                self.assertEqual(shards, {name for name, info in self.engine.shard_info.items()
+                                          if info["schedule"].lower() == schedule.lower()})
+                suggestions = self.engine.get_suggestions("grade", max_suggestions=50, schedule=schedule)
+                self.assertTrue(suggestions)
+                self.assertTrue(all(s.shard in shards for s in suggestions))
+
+    def test_section_filter_prunes_shards(self):
+        shards = [name for name, _ in self.engine._select_shards(section="labour")]
+
+        self.assertEqual(shards, ["SSR 2023-24/LABOUR", "SSR 2024-25"])
+
+
+class ShardSectionFilterTest(unittest.TestCase):
+    """A shard holding every section must filter before its top-k cut"""
+
+    QUERIES = ["grade", "cement", "labour for", "item 25", "steel bars", "excavation"]
+
+    @classmethod
+    def setUpClass(cls):
+        pdf_bytes, _ = generate_ssr_pdf(pages=8, rows_per_page=10, text_lines_per_page=3)
+        cls.encoder = StubEncoder(dimension=64)
+        cls.engine = ShardedSearchEngine(model=cls.encoder, parallel=False)
+        with _quiet(True):
+            cls.engine.load_schedule("SSR", pdf_bytes, split_sections=False)
+            cls.processor = EnhancedPDFProcessor()
+            cls.processor.process_pdf(pdf_bytes)
+            cls.sections = {}
+            for section, keys in cls.processor.section_mapping.items():
+                subset = cls.processor.subset(keys)
+                cls.sections[section] = IntelligentSearchEngine(subset.items_database, subset, model=cls.encoder)
+
+    def test_matches_brute_force_section_filter(self):
+        for query in self.QUERIES:
+            # Every item the unrestricted shard can match at all
+            everything = self.engine.shards["SSR"].get_suggestions(query, len(self.processor.items_database))
+            for section in self.processor.section_mapping:
+                in_section = [s for s in everything if s.item.section == section]
+
+                for limit in [3, 10]:
+                    with self.subTest(query=query, section=section, limit=limit):
+                        suggestions = self.engine.get_suggestions(query, limit, section=section.lower())
+                        self.assertTrue(all(s.item.section == section for s in suggestions))
+                        self.assertEqual(len(suggestions), min(limit, len(in_section)))
+
+    def test_matches_a_shard_of_the_section_alone(self):
+        for query in self.QUERIES:
+            for section, engine in self.sections.items():
+                with self.subTest(query=query, section=section):
+                    self.assertEqual(ranking(self.engine.get_suggestions(query, 10, section=section)),
+                                     ranking(engine.get_suggestions(query, 10)))
+
+    def test_unknown_section_matches_nothing(self):
+        self.assertEqual(self.engine.get_suggestions("grade", 10, section="NO SUCH SECTION"), [])
+        self.assertEqual(self.engine.shards["SSR"].get_suggestions("grade", 10, section="NO SUCH SECTION"), [])
+
+
+class UnloadTest(unittest.TestCase):
+    def setUp(self):
+        self.pdf_bytes, _ = generate_ssr_pdf(pages=4, rows_per_page=10, text_lines_per_page=3)
+        self.engine = ShardedSearchEngine(encoder_backend="none")
+        with _quiet(True):
+            self.engine.load_schedule("A", self.pdf_bytes, split_sections=False)
+            self.engine.load_schedule("B", self.pdf_bytes, split_sections=True)
+
+    def test_unload_schedule_drops_its_shards(self):
+        item = next(iter(self.engine.shards["A"].items_database.values()))
+        with self.assertRaises(ValueError):
+            self.engine.get_exact_item(item.primary_key)  # held by A and by one shard of B
+
+        removed = self.engine.unload_schedule("B")
+
+        self.assertTrue(removed)
+        self.assertEqual(list(self.engine.shards), ["A"])
+        self.assertIs(self.engine.get_exact_item(item.primary_key), item)
+        self.assertTrue(all(s.shard == "A" for s in self.engine.get_suggestions("grade", 20)))
+        self.assertEqual(self.engine.get_suggestions("grade", 20, schedule="B"), [])
+
+    def test_reloading_a_schedule_replaces_its_shards(self):
+        with _quiet(True):
+            self.engine.load_schedule("B", self.pdf_bytes, split_sections=False)
+
+        self.assertEqual(sorted(self.engine.shards), ["A", "B"])
+        self.assertFalse(self.engine.unload_shard("B/MATERIALS"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,179 @@
+"""SharedIndex build and worker load through FrontendReadyRAGSystem.
+
+Run: python -m unittest test_shared_index   (or python -m pytest test_shared_index.py)
+"""
+
+import json
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+
+from benchmark import StubEncoder, generate_ssr_pdf, _quiet
+
+with _quiet(True):
+    from vec2 import (EnhancedPDFProcessor, FrontendReadyRAGSystem, IntelligentSearchEngine, PDFFetcher,
+                      SentenceTransformerEncoder, SharedIndex)
+
+
+def ranking(suggestions):
+    return [(s.item.primary_key, round(s.relevance_score, 6), s.match_type) for s in suggestions]
+
+
+class SharedIndexEncoderTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.mkdtemp()
+        cls.index_dir = os.path.join(cls.tmp_dir, "index")
+        pdf_path = os.path.join(cls.tmp_dir, "rates.pdf")
+        pdf_bytes, _ = generate_ssr_pdf(pages=4, rows_per_page=10, text_lines_per_page=3)
+        with open(pdf_path, "wb") as fh:
+            fh.write(pdf_bytes)
+
+        system = FrontendReadyRAGSystem(pdf_path, fetcher=PDFFetcher(cache_dir=cls.tmp_dir),
+                                        model=StubEncoder(dimension=64))
+        with _quiet(True):
+            system.initialize()
+            cls.manifest = system.build_shared_index(cls.index_dir)["manifest"]
+        system.fetcher.session.close()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp_dir, ignore_errors=True)
+
+    def load(self, **options) -> FrontendReadyRAGSystem:
+        with _quiet(True):
+            return FrontendReadyRAGSystem.from_shared_index(self.index_dir, **options)
+
+    def test_manifest_records_the_encoder(self):
+        self.assertEqual(self.manifest["embedding_dimension"], 64)
+        self.assertIn("encoder", self.manifest)
+        self.assertIn("encoder_model", self.manifest)
+
+    def test_matching_encoder_loads(self):
+        system = self.load(model=StubEncoder(dimension=64))
+
+        self.assertTrue(system.get_suggestions("cement")["suggestions"])
+
+    def test_dimension_mismatch_raises(self):
+        with self.assertRaisesRegex(ValueError, "dimension 64"):
+            self.load(model=StubEncoder(dimension=32))
+
+    def test_different_encoder_raises(self):
+        with self.assertRaisesRegex(ValueError, "encoder"):
+            self.load(model=SentenceTransformerEncoder("all-MiniLM-L6-v2"))
+
+    def test_lexical_only_worker_skips_the_check(self):
+        system = self.load(encoder_backend="none")
+
+        self.assertFalse(system.search_engine.semantic_enabled)
+
+    def test_refresh_is_refused_without_fetching(self):
+        system = self.load(model=StubEncoder(dimension=64))
+
+        result = system.refresh()
+
+        self.assertEqual(result["status"], "error")
+        self.assertIn("read-only index", result["message"])
+        self.assertEqual(system.fetcher.last_fetch, {})
+
+    def test_older_version_is_rejected(self):
+        old_dir = os.path.join(self.tmp_dir, "old")
+        shutil.copytree(os.path.realpath(self.index_dir), old_dir)
+        with open(os.path.join(old_dir, "manifest.json"), "w") as fh:
+            json.dump(dict(self.manifest, version=1), fh)
+
+        with self.assertRaisesRegex(ValueError, "Unsupported shared index version: 1"):
+            FrontendReadyRAGSystem.from_shared_index(old_dir)
+
+    def test_version_directory_is_readable_by_other_users(self):
+        mode = stat.S_IMODE(os.stat(os.path.realpath(self.index_dir)).st_mode)
+
+        self.assertEqual(mode, 0o755)
+
+    def test_build_refuses_to_replace_a_plain_directory(self):
+        plain_dir = os.path.join(self.tmp_dir, "plain")
+        os.makedirs(plain_dir)
+        system = self.load(model=StubEncoder(dimension=64))
+
+        with _quiet(True):
+            result = system.build_shared_index(plain_dir)
+
+        self.assertEqual(result["status"], "error")
+        self.assertIn("not a shared index symlink", result["message"])
+        self.assertEqual(os.listdir(plain_dir), [])
+
+
+class SharedIndexParityTest(unittest.TestCase):
+    """A worker on the mapped index answers exactly like the in-memory engine it was built from"""
+
+    QUERIES = ["ce", "cem", "cement", "grade", "steel bars", "item 12", "12", "earth work excavation",
+               "providing and laying cement concrete of grade with all materials and labour complete", "zz"]
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.mkdtemp()
+        index_dir = os.path.join(cls.tmp_dir, "index")
+        pdf_bytes, _ = generate_ssr_pdf(pages=6, rows_per_page=10, text_lines_per_page=3)
+
+        with _quiet(True):
+            cls.processor = EnhancedPDFProcessor()
+            items = cls.processor.process_pdf(pdf_bytes)
+            cls.memory = IntelligentSearchEngine(items, cls.processor, model=StubEncoder(dimension=64))
+            SharedIndex.build(cls.processor, cls.memory, index_dir)
+            cls.system = FrontendReadyRAGSystem.from_shared_index(index_dir, model=StubEncoder(dimension=64))
+        cls.mapped = cls.system.search_engine
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp_dir, ignore_errors=True)
+
+    def test_suggestions_match_in_memory(self):
+        for query in self.QUERIES:
+            with self.subTest(query=query):
+                self.assertEqual(ranking(self.mapped.get_suggestions(query, 20)),
+                                 ranking(self.memory.get_suggestions(query, 20)))
+
+    def test_substring_stage_matches_in_memory(self):
+        max_term_length = self.mapped.processor.ngram_index.max_term_length
+        self.assertEqual(max_term_length, max(len(term) for term in self.processor.ngram_index))
+
+        # Queries longer than any stored term exercise the max_term_length cut of the prefix walk
+        long_query = " ".join(term for term in self.processor.ngram_index if len(term) == max_term_length)[:200]
+        for query in self.QUERIES + [long_query]:
+            with self.subTest(query=query):
+                self.assertEqual(self.mapped._get_ngram_matches(query, limit=1000),
+                                 self.memory._get_ngram_matches(query, limit=1000))
+
+    def test_postings_and_lookups_match(self):
+        for name in SharedIndex.POSTINGS:
+            with self.subTest(index=name):
+                self.assertEqual(dict(getattr(self.mapped.processor, name)), dict(getattr(self.processor, name)))
+        for name in SharedIndex.LOOKUPS:
+            mapped, memory = getattr(self.mapped.processor, name), getattr(self.processor, name)
+            with self.subTest(index=name):
+                self.assertEqual(dict(mapped), dict(memory))
+                self.assertNotIn("no such term", mapped)
+                with self.assertRaises(KeyError):
+                    mapped["no such term"]
+
+    def test_rate_search_matches_in_memory(self):
+        for options in [{}, {"min_rate": 100, "max_rate": 5000}, {"max_rate": 500, "descending": True},
+                        {"section": "materials"}, {"unit": "cum", "limit": 5}, {"material_type": "cement"},
+                        {"rate_column": "rate_2023_24", "min_rate": 1000, "descending": True}]:
+            with self.subTest(**options):
+                self.assertEqual(
+                    [item.primary_key for item in self.mapped.search_by_rate(**options)],
+                    [item.primary_key for item in self.memory.search_by_rate(**options)]
+                )
+
+    def test_filters_match_in_memory(self):
+        for filters in [{"section": "MATERIALS"}, {"item_no": "7"}, {"material_type": "steel"}]:
+            with self.subTest(**filters):
+                self.assertEqual([item.primary_key for item in self.mapped.search_by_filters(**filters)],
+                                 [item.primary_key for item in self.memory.search_by_filters(**filters)])
+
+
+if __name__ == "__main__":
+    unittest.main()
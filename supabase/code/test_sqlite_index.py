@@ -0,0 +1,120 @@
+"""SQLiteIndex against the in-memory engine it is built from.
+
+Run: python -m unittest test_sqlite_index   (or python -m pytest test_sqlite_index.py)
+"""
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from benchmark import StubEncoder, generate_ssr_pdf, _quiet
+
+with _quiet(True):
+    from vec2 import EnhancedPDFProcessor, FrontendReadyRAGSystem, IntelligentSearchEngine, SQLiteIndex
+
+
+class SQLiteParityTest(unittest.TestCase):
+    QUERIES = ["%%", "__", "gr_de", "ce%nt", "100%", "a\\b", "grade", "cement", "pipe"]
+    MATERIALS = ["%", "_", "gr_de", "ce%nt", "cement", "grade"]
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.mkdtemp()
+        db_path = os.path.join(cls.tmp_dir, "rates.db")
+        pdf_bytes, _ = generate_ssr_pdf(pages=6, rows_per_page=10, text_lines_per_page=3)
+
+        with _quiet(True):
+            processor = EnhancedPDFProcessor()
+            items = processor.process_pdf(pdf_bytes)
+            cls.memory = IntelligentSearchEngine(items, processor, encoder_backend="none")
+            SQLiteIndex.build(processor, None, db_path)
+            cls.sqlite = FrontendReadyRAGSystem.from_sqlite_index(db_path, encoder_backend="none").search_engine
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp_dir, ignore_errors=True)
+
+    def test_substring_stage_matches_in_memory(self):
+        for query in self.QUERIES:
+            with self.subTest(query=query):
+                self.assertEqual(
+                    self.sqlite._get_ngram_matches(query, limit=1000),
+                    self.memory._get_ngram_matches(query, limit=1000)
+                )
+
+    def test_wildcards_are_literal_in_substring_stage(self):
+        for query in ["%%", "__", "gr_de", "ce%nt"]:
+            with self.subTest(query=query):
+                self.assertEqual(self.sqlite._get_ngram_matches(query, limit=1000), [])
+
+    def test_material_filter_matches_in_memory(self):
+        for material_type in self.MATERIALS:
+            with self.subTest(material_type=material_type):
+                self.assertEqual(
+                    [item.primary_key for item in self.sqlite.search_by_filters(material_type=material_type)],
+                    [item.primary_key for item in self.memory.search_by_filters(material_type=material_type)]
+                )
+
+    def test_wildcard_material_filter_matches_nothing(self):
+        self.assertEqual(self.sqlite.search_by_filters(material_type="%"), [])
+        self.assertEqual(self.sqlite.search_by_filters(material_type="_"), [])
+
+
+class SQLiteEncoderTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.mkdtemp()
+        cls.db_path = os.path.join(cls.tmp_dir, "rates.db")
+        pdf_bytes, _ = generate_ssr_pdf(pages=2, rows_per_page=10, text_lines_per_page=3)
+
+        with _quiet(True):
+            processor = EnhancedPDFProcessor()
+            items = processor.process_pdf(pdf_bytes)
+            engine = IntelligentSearchEngine(items, processor, model=StubEncoder(dimension=64))
+            cls.manifest = SQLiteIndex.build(processor, engine, cls.db_path)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp_dir, ignore_errors=True)
+
+    def load(self, **options) -> FrontendReadyRAGSystem:
+        with _quiet(True):
+            return FrontendReadyRAGSystem.from_sqlite_index(self.db_path, **options)
+
+    def test_matching_encoder_loads(self):
+        system = self.load(model=StubEncoder(dimension=64))
+
+        self.assertEqual(self.manifest["embedding_dimension"], 64)
+        self.assertTrue(system.search_engine.semantic_enabled)
+
+    def test_dimension_mismatch_raises(self):
+        with self.assertRaisesRegex(ValueError, "dimension 64"):
+            self.load(model=StubEncoder(dimension=32))
+
+    def test_refresh_is_refused_without_fetching(self):
+        system = self.load(model=StubEncoder(dimension=64))
+        engine = system.search_engine
+
+        result = system.refresh()
+
+        self.assertEqual(result["status"], "error")
+        self.assertIn("read-only index", result["message"])
+        self.assertEqual(system.fetcher.last_fetch, {})
+        self.assertIs(system.search_engine, engine)
+
+    def test_older_version_is_rejected(self):
+        old_path = os.path.join(self.tmp_dir, "old.db")
+        shutil.copy(self.db_path, old_path)
+        conn = sqlite3.connect(old_path)
+        conn.execute("UPDATE meta SET value = '1' WHERE key = 'version'")
+        conn.commit()
+        conn.close()
+
+        with self.assertRaisesRegex(ValueError, "Unsupported SQLite index version: 1"):
+            FrontendReadyRAGSystem.from_sqlite_index(old_path)
+
+
+if __name__ == "__main__":
+    unittest.main()
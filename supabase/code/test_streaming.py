@@ -0,0 +1,112 @@
+"""Two-phase streaming suggestions and their Server-Sent Events framing.
+
+Run: python -m unittest test_streaming   (or python -m pytest test_streaming.py)
+"""
+
+import json
+import time
+import unittest
+
+from benchmark import StubEncoder, generate_ssr_pdf, _quiet
+
+with _quiet(True):
+    from vec2 import EnhancedPDFProcessor, FrontendReadyRAGSystem, IntelligentSearchEngine
+
+
+class SlowQueryEncoder(StubEncoder):
+    """StubEncoder that takes `delay` seconds to encode a single query string"""
+
+    def __init__(self, delay: float, **kwargs):
+        super().__init__(**kwargs)
+        self.delay = delay
+
+    def encode(self, sentences, **kwargs):
+        if isinstance(sentences, str):
+            time.sleep(self.delay)
+        return super().encode(sentences, **kwargs)
+
+
+def ranking(suggestions):
+    return [(s.item.primary_key, s.relevance_score, s.match_type) for s in suggestions]
+
+
+class StreamSuggestionsTest(unittest.TestCase):
+    QUERIES = ["cement", "item 12", "steel bars", "grade", "earth work excavation", "zz"]
+
+    @classmethod
+    def setUpClass(cls):
+        pdf_bytes, _ = generate_ssr_pdf(pages=6, rows_per_page=10, text_lines_per_page=3)
+        processor = EnhancedPDFProcessor()
+        with _quiet(True):
+            items = processor.process_pdf(pdf_bytes)
+            cls.engine = IntelligentSearchEngine(items, processor, model=StubEncoder(dimension=64))
+            cls.slow_engine = IntelligentSearchEngine(items, processor, model=SlowQueryEncoder(0.5, dimension=64))
+
+        cls.system = FrontendReadyRAGSystem("")
+        cls.system.search_engine, cls.system.processor, cls.system.items_database = cls.engine, processor, items
+        cls.system.is_initialized = True
+
+    def test_final_phase_matches_get_suggestions(self):
+        for query in self.QUERIES:
+            with self.subTest(query=query):
+                phases = list(self.engine.stream_suggestions(query, 10))
+                self.assertEqual([phase for phase, _ in phases], ["fast", "final"])
+                self.assertEqual(ranking(phases[-1][1]), ranking(self.engine.get_suggestions(query, 10)))
+
+    def test_fast_phase_does_not_wait_for_slow_stages(self):
+        start = time.perf_counter()
+        stream = self.slow_engine.stream_suggestions("cement", 10)
+
+        phase, fast = next(stream)
+        fast_elapsed = time.perf_counter() - start
+        phase_final, final = next(stream)
+        final_elapsed = time.perf_counter() - start
+
+        self.assertEqual((phase, phase_final), ("fast", "final"))
+        self.assertLess(fast_elapsed, 0.3)
+        self.assertGreaterEqual(final_elapsed, 0.45)
+        self.assertTrue(fast)
+        self.assertFalse({"fuzzy", "semantic"} & {s.match_type for s in fast})
+        self.assertEqual(ranking(final), ranking(self.engine.get_suggestions("cement", 10)))
+
+    def test_final_phase_drops_stages_past_the_deadline(self):
+        timeouts = self.slow_engine.stage_timeouts["semantic"]
+
+        start = time.perf_counter()
+        phases = dict(self.slow_engine.stream_suggestions("cement", 10, deadline_ms=100))
+
+        self.assertLess(time.perf_counter() - start, 0.4)
+        self.assertNotIn("semantic", {s.match_type for s in phases["final"]})
+        self.assertEqual(self.slow_engine.stage_timeouts["semantic"], timeouts + 1)
+
+    def test_short_query_yields_one_empty_final(self):
+        self.assertEqual(list(self.engine.stream_suggestions(" a ", 10)), [("final", [])])
+
+    def test_api_updates(self):
+        updates = list(self.system.stream_suggestions("cement", 10))
+
+        self.assertEqual([(u["phase"], u["final"]) for u in updates], [("fast", False), ("final", True)])
+        final = {key: value for key, value in updates[-1].items() if key not in ("phase", "final")}
+        self.assertEqual(final, self.system.get_suggestions("cement", 10))
+
+    def test_sse_framing(self):
+        events = list(self.system.stream_suggestions_sse("cement", 10))
+
+        self.assertEqual(len(events), 2)
+        for event, update in zip(events, self.system.stream_suggestions("cement", 10)):
+            self.assertTrue(event.endswith("\n\n"))
+            head, data = event[:-2].split("\n")
+            self.assertEqual(head, f"event: {update['phase']}")
+            self.assertTrue(data.startswith("data: "))
+            self.assertEqual(json.loads(data[len("data: "):]), update)
+
+    def test_uninitialized_system_streams_one_error_event(self):
+        events = list(FrontendReadyRAGSystem("").stream_suggestions_sse("cement"))
+
+        self.assertEqual(len(events), 1)
+        self.assertTrue(events[0].startswith("event: error\ndata: "))
+        self.assertTrue(json.loads(events[0].split("data: ", 1)[1])["final"])
+
+
+if __name__ == "__main__":
+    unittest.main()
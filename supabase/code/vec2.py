@@ -3,35 +3,54 @@ Advanced PDF Rate Q&A System with Intelligent Suggestions
 Frontend-Ready RAG System with Autocomplete and Exact Matching
 
 Required packages:
-pip install pdfplumber sentence-transformers numpy pandas scikit-learn openai fuzzywuzzy python-levenshtein
+pip install pdfplumber numpy fuzzywuzzy python-levenshtein
+
+Embedding backends (pick one, or run lexical-only with encoder_backend="none"):
+pip install sentence-transformers          # "sentence-transformers" / "quantized"
+pip install onnxruntime tokenizers         # "onnx" (no torch needed)
 """
 
 import os
 import re
+import copy
 import json
 import hashlib
+import heapq
+import importlib.util
 import requests
 import io
+import mmap
+import queue
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
 import pdfplumber
 import numpy as np
-import pandas as pd
-from typing import List, Dict, Any, Optional, Tuple
+from abc import ABC, abstractmethod
+from typing import List, Dict, Any, Iterator, Optional, Set, Tuple
 from dataclasses import dataclass, asdict
 from datetime import datetime
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
+from collections.abc import Mapping
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+
+# Optional OpenAI (only probed here; imported by whoever needs it)
+OPENAI_AVAILABLE = importlib.util.find_spec("openai") is not None
+if not OPENAI_AVAILABLE:
+    print("ℹ️ OpenAI not installed. Using fallback query processing.")
 
-# Optional OpenAI
+# Optional fast JSON encoder for pre-serialized responses
 try:
-    from openai import OpenAI
-    OPENAI_AVAILABLE = True
+    import orjson
+    ORJSON_AVAILABLE = True
 except ImportError:
-    OPENAI_AVAILABLE = False
-    print("ℹ️ OpenAI not installed. Using fallback query processing.")
+    ORJSON_AVAILABLE = False
 
-# Embeddings and similarity
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.feature_extraction.text import TfidfVectorizer
+# Embedding backend defaults (overridable per engine)
+DEFAULT_ENCODER_BACKEND = os.environ.get("VEC2_ENCODER_BACKEND", "sentence-transformers")
+DEFAULT_ENCODER_MODEL = os.environ.get("VEC2_ENCODER_MODEL", "all-MiniLM-L6-v2")
 
 # Fuzzy matching
 try:
@@ -79,6 +98,11 @@ class RateItem:
         }
 
 
+def shard_item_id(shard: str, primary_key: str) -> str:
+    """Id of an item that is unique across the shards of a ShardedSearchEngine"""
+    return f"{shard}:{primary_key}"
+
+
 @dataclass
 class SearchSuggestion:
     """Data class for search suggestions"""
@@ -86,14 +110,147 @@ class SearchSuggestion:
     relevance_score: float
     match_type: str  # 'exact', 'partial', 'fuzzy', 'semantic'
     matched_keywords: List[str]
+    shard: Optional[str] = None  # set by ShardedSearchEngine
     
     def to_dict(self) -> Dict:
-        return {
-            "item": self.item.to_frontend_dict(),
+        item = self.item.to_frontend_dict()
+        if self.shard is not None:
+            # The same primary key can exist in several shards
+            item["id"] = shard_item_id(self.shard, self.item.primary_key)
+        result = {
+            "item": item,
             "relevance_score": self.relevance_score,
             "match_type": self.match_type,
             "matched_keywords": self.matched_keywords
         }
+        if self.shard is not None:
+            result["shard"] = self.shard
+        return result
+
+
+class PDFFetcher:
+    """Fetch the rate PDF with connection reuse, timeouts, retries and a conditional disk cache.
+
+    Remote PDFs are streamed into cache_dir with their ETag / Last-Modified;
+    the next fetch sends If-None-Match / If-Modified-Since, so an unchanged PDF
+    costs one 304 round trip. Cache entries are keyed on scheme, host and path
+    only, because signed storage URLs rotate their token query string.
+    Local paths and file:// URLs are read directly.
+    """
+
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    def __init__(self, cache_dir: Optional[str] = None, timeout: Tuple[float, float] = (5.0, 60.0),
+                 max_retries: int = 3, backoff_factor: float = 0.5, chunk_size: int = 1 << 16,
+                 session: Optional[requests.Session] = None):
+        self.cache_dir = cache_dir or os.environ.get(
+            "VEC2_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "estimate-rag")
+        )
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.chunk_size = chunk_size
+        self.session = session or self._create_session()
+        self.last_fetch: Dict[str, Any] = {}
+
+    def _create_session(self) -> requests.Session:
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        retry = Retry(
+            total=self.max_retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=self.RETRY_STATUSES,
+            allowed_methods=frozenset(["GET", "HEAD"]),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        session = requests.Session()
+        adapter = HTTPAdapter(max_retries=retry, pool_connections=4, pool_maxsize=8)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def _cache_paths(self, url: str) -> Tuple[str, str]:
+        from urllib.parse import urlsplit
+
+        parts = urlsplit(url)
+        cache_key = hashlib.sha256(f"{parts.scheme}://{parts.netloc}{parts.path}".encode()).hexdigest()
+        base = os.path.join(self.cache_dir, cache_key)
+        return base + ".pdf", base + ".json"
+
+    def fetch(self, source: str) -> bytes:
+        """Return PDF bytes for a URL, file:// URL or local path"""
+        if source.startswith("file://"):
+            from urllib.parse import urlsplit, unquote
+            source = unquote(urlsplit(source).path)
+        if not re.match(r"^https?://", source, re.IGNORECASE):
+            with open(source, "rb") as fh:
+                data = fh.read()
+            self.last_fetch = {"status": "local", "path": source, "bytes": len(data)}
+            return data
+
+        pdf_path, meta_path = self._cache_paths(source)
+        meta = {}
+        if os.path.exists(pdf_path) and os.path.exists(meta_path):
+            with open(meta_path) as fh:
+                meta = json.load(fh)
+
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self._download(source, headers, pdf_path, meta_path)
+            except requests.exceptions.ChunkedEncodingError as e:
+                # Adapter retries cover connect errors, timeouts and retryable statuses, and raise once
+                # they run out; only a body cut off mid-stream is retried here
+                if attempt == self.max_retries:
+                    raise
+                delay = self.backoff_factor * (2 ** attempt)
+                print(f"  ⚠️ Download interrupted ({e}); retrying in {delay:.1f}s...")
+                time.sleep(delay)
+
+    def _download(self, url: str, headers: Dict[str, str], pdf_path: str, meta_path: str) -> bytes:
+        with self.session.get(url, headers=headers, timeout=self.timeout, stream=True) as response:
+            if response.status_code == 304:
+                with open(pdf_path, "rb") as fh:
+                    data = fh.read()
+                self.last_fetch = {"status": "not_modified", "path": pdf_path, "bytes": len(data)}
+                print("✅ PDF unchanged (304), using cached copy")
+                return data
+
+            response.raise_for_status()
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".part")
+            digest = hashlib.sha256()
+            try:
+                with os.fdopen(fd, "wb") as fh:
+                    for chunk in response.iter_content(chunk_size=self.chunk_size):
+                        fh.write(chunk)
+                        digest.update(chunk)
+                os.replace(tmp_path, pdf_path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+            meta = {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "sha256": digest.hexdigest(),
+                "fetched_at": datetime.now().isoformat(),
+            }
+            with open(meta_path, "w") as fh:
+                json.dump(meta, fh)
+
+        with open(pdf_path, "rb") as fh:
+            data = fh.read()
+        self.last_fetch = {"status": "downloaded", "path": pdf_path, "bytes": len(data), "sha256": meta["sha256"]}
+        return data
 
 
 class EnhancedPDFProcessor:
@@ -105,43 +262,253 @@ class EnhancedPDFProcessor:
         self.section_mapping = {}  # section -> list of primary_keys
         self.item_number_index = {}  # item_number -> primary_key
         self.description_index = {}  # normalized_description -> primary_key
+        self.page_cache = {}  # page_number -> {fingerprint, section_in, section_out, item_keys}
+        self.last_ingest = {}  # stats and added/removed keys of the latest process_pdf call
+        self.rate_columns = None  # RateColumns, rebuilt after every ingest
         
     def process_pdf(self, pdf_bytes: bytes) -> Dict[str, RateItem]:
-        """Process PDF with enhanced extraction techniques"""
+        """Process PDF with enhanced extraction techniques.
+
+        On a processor that has already ingested a PDF, only pages whose
+        content-stream fingerprint (or incoming section) changed are
+        re-extracted, and their items are spliced into the existing indexes.
+        """
         print("🔍 Enhanced PDF Processing Started...")
         
+        incremental = bool(self.page_cache)
+        page_cache = {}
+        added_items = []
+        removed_keys = set()
+        pages_extracted = 0
+        
         with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
             current_section = "GENERAL"
             
             for page_num, page in enumerate(pdf.pages, 1):
-                print(f"  📄 Processing page {page_num}/{len(pdf.pages)}...")
+                fingerprint = self._page_fingerprint(page)
+                cached = self.page_cache.get(page_num)
                 
-                page_text = page.extract_text() or ""
+                # Unchanged page with the same incoming section: keep its items as they are
+                if cached and cached["fingerprint"] == fingerprint and cached["section_in"] == current_section:
+                    page_cache[page_num] = cached
+                    current_section = cached["section_out"]
+                    continue
                 
-                # Enhanced section detection
-                detected_section = self._detect_section(page_text)
-                if detected_section:
-                    current_section = detected_section
-                    print(f"    📂 Section: {current_section}")
-                
-                # Extract tables with enhanced parsing
-                tables = page.extract_tables()
-                for table_idx, table in enumerate(tables):
-                    if self._is_valid_table(table):
-                        items = self._extract_items_from_table(
-                            table, current_section, page_num, table_idx
-                        )
-                        for item in items:
-                            self.items_database[item.primary_key] = item
-                            self._index_item_advanced(item)
+                print(f"  📄 Processing page {page_num}/{len(pdf.pages)}...")
+                pages_extracted += 1
+                section_in = current_section
+                page_items, current_section = self._extract_page(page, page_num, current_section)
                 
-                # Extract text-based rates
-                text_items = self._extract_text_rates(page_text, current_section, page_num)
-                for item in text_items:
-                    self.items_database[item.primary_key] = item
-                    self._index_item_advanced(item)
+                if cached:
+                    removed_keys.update(cached["item_keys"])
+                added_items.extend(page_items)
+                page_cache[page_num] = {
+                    "fingerprint": fingerprint,
+                    "section_in": section_in,
+                    "section_out": current_section,
+                    "item_keys": [item.primary_key for item in page_items]
+                }
+        
+        # Pages dropped from a shorter revision
+        for page_num, cached in self.page_cache.items():
+            if page_num not in page_cache:
+                removed_keys.update(cached["item_keys"])
+        
+        self.page_cache = page_cache
+        self.last_ingest = {
+            "incremental": incremental,
+            "pages_total": len(page_cache),
+            "pages_extracted": pages_extracted,
+            "added_keys": [item.primary_key for item in added_items],
+            "removed_keys": sorted(removed_keys)
+        }
+        
+        if incremental:
+            self._apply_page_changes(added_items, removed_keys)
+        else:
+            for item in added_items:
+                self.items_database[item.primary_key] = item
+                self._index_item_advanced(item)
+            print(f"✅ Extracted {len(self.items_database)} rate items")
+            self._build_advanced_indexes()
+        
+        return self.items_database
+    
+    def _extract_page(self, page, page_num: int, current_section: str) -> Tuple[List[RateItem], str]:
+        """Extract all rate items from one page in a single layout pass.
+
+        The page's char objects are parsed once and shared by section
+        detection, table finding and text extraction. Pages with valid rate
+        tables only run the text-rate regexes over characters outside the
+        table regions, so table rows are never parsed (and keyed) twice.
+        Returns (items, section after the page).
+        """
+        from pdfplumber.utils import extract_text
+        
+        items = []
+        chars = page.chars
+        page_text = extract_text(chars) if chars else ""
+        
+        # Enhanced section detection
+        detected_section = self._detect_section(page_text)
+        if detected_section:
+            current_section = detected_section
+            print(f"    📂 Section: {current_section}")
+        
+        # Extract tables with enhanced parsing
+        table_regions = []
+        for table_idx, table in enumerate(page.find_tables() if chars else []):
+            rows = table.extract()
+            if self._is_valid_table(rows):
+                table_regions.append(table.bbox)
+                items.extend(self._extract_items_from_table(
+                    rows, current_section, page_num, table_idx
+                ))
+        
+        # Free text: the whole page, or only what lies outside the rate tables
+        if table_regions:
+            free_chars = [c for c in chars if not self._in_regions(c, table_regions)]
+            free_text = extract_text(free_chars) if free_chars else ""
+        else:
+            free_text = page_text
+        
+        if free_text:
+            seen = {(item.sr_no, item.description.lower()) for item in items}
+            for item in self._extract_text_rates(free_text, current_section, page_num):
+                if (item.sr_no, item.description.lower()) not in seen:
+                    items.append(item)
+        
+        return items, current_section
+    
+    def _in_regions(self, obj: Dict[str, Any], regions: List[Tuple[float, float, float, float]]) -> bool:
+        """Whether a pdfplumber object's centre falls inside any (x0, top, x1, bottom) box"""
+        x = (obj["x0"] + obj["x1"]) / 2
+        y = (obj["top"] + obj["bottom"]) / 2
+        return any(x0 <= x <= x1 and top <= y <= bottom for x0, top, x1, bottom in regions)
+    
+    def _page_fingerprint(self, page) -> str:
+        """Hash of the page's raw content streams, the XObjects they draw, and geometry"""
+        from pdfminer.pdftypes import resolve1
+        
+        digest = hashlib.sha1(repr((page.mediabox, page.rotation)).encode())
+        try:
+            for stream in page.page_obj.contents:
+                digest.update(resolve1(stream).get_data())
+            # Text and tables can sit in form XObjects that the content stream only names
+            self._hash_xobjects(page.page_obj.resources, digest, set())
+        except Exception:
+            # Unusual stream encodings: fall back to the rendered characters
+            digest.update("".join(c["text"] for c in page.chars).encode())
+        return digest.hexdigest()
+    
+    def _hash_xobjects(self, resources, digest, seen: set):
+        """Feed the data of every XObject under resources (and nested forms) into digest"""
+        from pdfminer.pdftypes import resolve1
+        
+        xobjects = resolve1((resolve1(resources) or {}).get("XObject")) or {}
+        for name in sorted(xobjects):
+            ref = xobjects[name]
+            digest.update(str(name).encode())
+            objid = getattr(ref, "objid", None)
+            if objid is not None:
+                if objid in seen:  # shared or self-referencing forms
+                    continue
+                seen.add(objid)
+            stream = resolve1(ref)
+            digest.update(stream.get_data() or b"")  # rawdata is dropped once pdfminer decodes a stream
+            self._hash_xobjects(stream.attrs.get("Resources"), digest, seen)
+    
+    def _apply_page_changes(self, added_items: List[RateItem], removed_keys: set):
+        """Splice re-extracted page items into new copies of the indexes.
+
+        Containers that may already be in use are never mutated: touched
+        postings are rebuilt as new sets and every index is replaced at the
+        end, so a copy of this processor can be updated while queries keep
+        reading the original.
+        """
+        print(f"🔁 Re-ingesting {len(self.last_ingest['added_keys'])} items, dropping {len(removed_keys)}")
+        
+        removed_items = [self.items_database[key] for key in removed_keys if key in self.items_database]
+        current = {key: item for key, item in self.items_database.items() if key not in removed_keys}
+        for item in added_items:
+            current[item.primary_key] = item
+        
+        keyword_index = self._replace_postings(
+            self.keyword_index,
+            ((keyword.lower(), item.primary_key) for item in removed_items for keyword in item.search_keywords),
+            ((keyword.lower(), item.primary_key) for item in added_items for keyword in item.search_keywords)
+        )
+        ngram_index = self._replace_postings(
+            self.ngram_index,
+            ((ngram, item.primary_key) for item in removed_items for ngram in self._item_ngrams(item)),
+            ((ngram, item.primary_key) for item in added_items for ngram in self._item_ngrams(item))
+        )
+        
+        # Restore page order and rebuild the cheap last-wins lookups in that order,
+        # so the result matches a full rebuild
+        items_database = {}
+        section_mapping = {}
+        item_number_index = {}
+        description_index = {}
+        for page_num in sorted(self.page_cache):
+            for key in self.page_cache[page_num]["item_keys"]:
+                item = current.get(key)
+                if item is None:
+                    continue
+                items_database[key] = item
+                section_mapping.setdefault(item.section, []).append(key)
+                if item.sr_no:
+                    item_number_index[item.sr_no] = key
+                description_index[item.description.lower().strip()] = key
+        
+        (self.items_database, self.keyword_index, self.ngram_index, self.section_mapping,
+         self.item_number_index, self.description_index, self.rate_columns) = (
+            items_database, keyword_index, ngram_index, section_mapping,
+            item_number_index, description_index, RateColumns.from_items(items_database)
+        )
         
-        print(f"✅ Extracted {len(self.items_database)} rate items")
+        print(f"✅ {len(self.items_database)} rate items after differential update")
+    
+    @staticmethod
+    def _replace_postings(index, removals, additions) -> defaultdict:
+        """Copy of a term -> keys index with (term, key) pairs removed and added.
+
+        Untouched postings are shared with the original; touched ones are new sets.
+        """
+        changes = defaultdict(lambda: (set(), set()))
+        for term, primary_key in removals:
+            changes[term][0].add(primary_key)
+        for term, primary_key in additions:
+            changes[term][1].add(primary_key)
+        
+        updated = defaultdict(set, index)
+        for term, (removed, added) in changes.items():
+            postings = (updated.get(term, set()) - removed) | added
+            if postings:
+                updated[term] = postings
+            else:
+                updated.pop(term, None)
+        return updated
+    
+    def save_page_cache(self, path: str):
+        """Persist the page cache and its items so a restart can ingest differentially"""
+        payload = {
+            "page_cache": {str(k): v for k, v in self.page_cache.items()},
+            "items": [item.to_dict() for item in self.items_database.values()]
+        }
+        with open(path, "w") as fh:
+            json.dump(payload, fh)
+    
+    def load_page_cache(self, path: str) -> Dict[str, RateItem]:
+        """Restore a saved page cache and rebuild indexes from its items"""
+        with open(path) as fh:
+            payload = json.load(fh)
+        
+        self.page_cache = {int(k): v for k, v in payload["page_cache"].items()}
+        for record in payload["items"]:
+            item = RateItem(**record)
+            self.items_database[item.primary_key] = item
+            self._index_item_advanced(item)
         self._build_advanced_indexes()
         return self.items_database
     
@@ -493,35 +860,570 @@ class EnhancedPDFProcessor:
         self.ngram_index = defaultdict(set)
         
         for item in self.items_database.values():
-            text = (item.description + " " + " ".join(item.search_keywords)).lower()
-            
-            # Generate 2-grams and 3-grams
-            words = text.split()
-            for i in range(len(words)):
-                for j in range(i+1, min(i+4, len(words)+1)):
-                    ngram = " ".join(words[i:j])
-                    if len(ngram) >= 3:  # Minimum 3 characters
-                        self.ngram_index[ngram].add(item.primary_key)
+            for ngram in self._item_ngrams(item):
+                self.ngram_index[ngram].add(item.primary_key)
+        
+        # Typed rate columns with sorted orders for range/sort queries
+        self.rate_columns = RateColumns.from_items(self.items_database)
         
         print(f"✅ Built indexes with {len(self.keyword_index)} keywords and {len(self.ngram_index)} n-grams")
+    
+    def subset(self, primary_keys: List[str]) -> "EnhancedPDFProcessor":
+        """New processor indexing only the given items (shared RateItem objects)"""
+        processor = EnhancedPDFProcessor()
+        for primary_key in primary_keys:
+            item = self.items_database[primary_key]
+            processor.items_database[primary_key] = item
+            processor._index_item_advanced(item)
+        processor._build_advanced_indexes()
+        return processor
+    
+    def _item_ngrams(self, item: RateItem):
+        """1- to 3-word n-grams of an item's description and keywords"""
+        text = (item.description + " " + " ".join(item.search_keywords)).lower()
+        
+        # Generate 2-grams and 3-grams
+        words = text.split()
+        for i in range(len(words)):
+            for j in range(i+1, min(i+4, len(words)+1)):
+                ngram = " ".join(words[i:j])
+                if len(ngram) >= 3:  # Minimum 3 characters
+                    yield ngram
+
+
+# ==== NUMERIC RATE COLUMNS ====
+RATE_COLUMNS = ("rate_2023_24", "rate_2024_25")
+
+
+def _parse_rate(value: Optional[str]) -> float:
+    """Cleaned rate string -> float; NaN when missing or unparseable"""
+    try:
+        return float(value) if value else np.nan
+    except ValueError:
+        return np.nan
+
+
+# Spellings seen in estimates and measurement books -> the schedule's unit
+UNIT_ALIASES = {
+    "m3": "cum", "cu.m": "cum", "cu m": "cum", "cubic meter": "cum", "cubic metre": "cum",
+    "m2": "sqm", "sq.m": "sqm", "sq m": "sqm", "square meter": "sqm", "square metre": "sqm",
+    "m": "rmt", "rm": "rmt", "r.m": "rmt", "running meter": "rmt", "running metre": "rmt",
+    "nos": "no", "no.": "no", "number": "no", "each": "no",
+    "kgs": "kg", "kilogram": "kg", "tonne": "mt", "ton": "mt",
+    "l": "lit", "ltr": "lit", "litre": "lit", "liter": "lit",
+}
+
+
+def _normalize_unit(unit: Optional[str]) -> str:
+    unit = (unit or "").lower().strip().rstrip(".")
+    return UNIT_ALIASES.get(unit, unit)
+
+
+class RateColumns:
+    """Rates parsed once into float64 columns, one row per item in items order.
+
+    Missing rates are NaN. Each column keeps an argsort order (NaN last) and
+    the rates in that order, so a range filter is two binary searches and
+    rate-sorted results need no sort over Python objects. Section and unit
+    are stored as integer codes for vectorized masks.
+    """
+
+    def __init__(self, keys, rates: Dict[str, np.ndarray], orders: Dict[str, np.ndarray],
+                 sections: List[str], section_codes: np.ndarray, units: List[str], unit_codes: np.ndarray):
+        self.keys = keys  # list, or the MappedStringTable of a SharedIndex
+        self.rates = rates
+        self.orders = orders
+        self.sorted_rates = {name: rates[name][order] for name, order in orders.items()}
+        self.valid_counts = {name: int(np.count_nonzero(~np.isnan(r))) for name, r in rates.items()}
+        self.sections = sections
+        self.section_codes = section_codes
+        self.units = units
+        self.unit_codes = unit_codes
+        
+        # Year-over-year escalation in percent; NaN where either rate is missing or the base is 0
+        base, target = rates["rate_2023_24"], rates["rate_2024_25"]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.escalation_pct = np.where(base > 0, (target - base) / base * 100.0, np.nan)
+        self._rows = None
+
+    @classmethod
+    def from_items(cls, items_database: Dict[str, RateItem]) -> "RateColumns":
+        items = list(items_database.values())
+        return cls.from_fields(
+            list(items_database.keys()),
+            [item.section for item in items],
+            [item.unit for item in items],
+            {name: [getattr(item, name) for item in items] for name in RATE_COLUMNS},
+        )
+
+    @classmethod
+    def from_fields(cls, keys, sections: List[str], units: List[Optional[str]],
+                    rates: Dict[str, List[Optional[str]]]) -> "RateColumns":
+        """Build from per-row fields (rates as cleaned strings), e.g. straight from SQL columns"""
+        rates = {
+            name: np.array([_parse_rate(value) for value in rates[name]], dtype=np.float64)
+            for name in RATE_COLUMNS
+        }
+        orders = {name: np.argsort(r, kind="stable").astype(np.int32) for name, r in rates.items()}
+
+        units = [_normalize_unit(unit) for unit in units]
+        section_names = sorted(set(sections))
+        section_ids = {section: code for code, section in enumerate(section_names)}
+        unit_names = sorted(set(units))
+        unit_ids = {unit: code for code, unit in enumerate(unit_names)}
+
+        return cls(
+            keys, rates, orders,
+            section_names, np.array([section_ids[section] for section in sections], dtype=np.int32),
+            unit_names, np.array([unit_ids[unit] for unit in units], dtype=np.int32),
+        )
+
+    def save(self, directory: str):
+        """Write the columns as .npy files (for SharedIndex)"""
+        for name in RATE_COLUMNS:
+            np.save(os.path.join(directory, f"{name}.npy"), self.rates[name])
+            np.save(os.path.join(directory, f"{name}_order.npy"), self.orders[name])
+        np.save(os.path.join(directory, "section_codes.npy"), self.section_codes)
+        np.save(os.path.join(directory, "unit_codes.npy"), self.unit_codes)
+        with open(os.path.join(directory, "rate_columns.json"), "w") as fh:
+            json.dump({"sections": self.sections, "units": self.units}, fh)
+
+    @classmethod
+    def load(cls, directory: str, keys) -> "RateColumns":
+        """Map columns written by save() read-only"""
+        def array(name):
+            return np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+
+        with open(os.path.join(directory, "rate_columns.json")) as fh:
+            names = json.load(fh)
+        return cls(
+            keys,
+            {name: array(name) for name in RATE_COLUMNS},
+            {name: array(f"{name}_order") for name in RATE_COLUMNS},
+            names["sections"], array("section_codes"), names["units"], array("unit_codes"),
+        )
+
+    def __len__(self) -> int:
+        return len(self.section_codes)
+
+    def rows_in_range(self, column: str = "rate_2024_25", low: Optional[float] = None,
+                      high: Optional[float] = None) -> np.ndarray:
+        """Row ids with low <= rate <= high, in ascending rate order (missing rates excluded)"""
+        if column not in self.rates:
+            raise ValueError(f"Unknown rate column: {column}")
+
+        valid = self.sorted_rates[column][:self.valid_counts[column]]
+        start = 0 if low is None else int(np.searchsorted(valid, low, side="left"))
+        end = len(valid) if high is None else int(np.searchsorted(valid, high, side="right"))
+        return self.orders[column][start:max(start, end)]
+
+    def row_ids(self, primary_keys) -> np.ndarray:
+        """Row ids for primary keys (unknown keys are skipped)"""
+        if self._rows is None:
+            self._rows = {key: row for row, key in enumerate(self.keys)}
+        return np.array([self._rows[k] for k in primary_keys if k in self._rows], dtype=np.int64)
+
+    def select(self, column: str = "rate_2024_25", low: Optional[float] = None, high: Optional[float] = None,
+               section: Optional[str] = None, unit: Optional[str] = None, rows: Optional[np.ndarray] = None,
+               descending: bool = False) -> np.ndarray:
+        """Row ids passing every filter, sorted by rate; items without a rate come last"""
+        if low is not None or high is not None:
+            ordered = self.rows_in_range(column, low, high)
+        else:
+            ordered = self.rows_in_range(column)
+            ordered = np.concatenate([ordered, self.orders[column][len(ordered):]])
+
+        mask = np.ones(len(self), dtype=bool)
+        if section:
+            codes = [c for c, name in enumerate(self.sections) if name.lower() == section.lower()]
+            mask &= np.isin(self.section_codes, codes)
+        if unit:
+            codes = [c for c, name in enumerate(self.units) if name == _normalize_unit(unit)]
+            mask &= np.isin(self.unit_codes, codes)
+        if rows is not None:
+            allowed = np.zeros(len(self), dtype=bool)
+            allowed[rows] = True
+            mask &= allowed
+
+        ordered = ordered[mask[ordered]]
+        if descending:
+            rated = ~np.isnan(self.rates[column][ordered])
+            ordered = np.concatenate([ordered[rated][::-1], ordered[~rated]])
+        return ordered
+
+    def rows_for(self, primary_keys: List[Optional[str]]) -> np.ndarray:
+        """Row id per key, -1 where the key is missing or unknown"""
+        if self._rows is None:
+            self._rows = {key: row for row, key in enumerate(self.keys)}
+        return np.array([self._rows.get(k, -1) if k else -1 for k in primary_keys], dtype=np.int64)
+    
+    def keys_at(self, rows: np.ndarray) -> List[str]:
+        return [self.keys[int(row)] for row in rows]
+
+    def value(self, column: str, row: int) -> Optional[float]:
+        """A single rate (or "escalation_pct") as a float, None when missing"""
+        values = self.escalation_pct if column == "escalation_pct" else self.rates[column]
+        value = float(values[row])
+        return None if np.isnan(value) else value
+
+
+# ==== EMBEDDING BACKENDS ====
+class BaseEncoder(ABC):
+    """Encoder interface: SentenceTransformer-style encode() returning L2-normalized float32"""
+
+    name = "base"
+    model_id: Optional[str] = None  # model name or path, recorded in index manifests
+
+    def encode(self, sentences, show_progress_bar: bool = False, batch_size: int = 32, **kwargs):
+        """Encode a string (-> 1-D array) or a list of strings (-> 2-D array)"""
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        batches = [self._encode_batch(texts[i:i + batch_size]) for i in range(0, len(texts), batch_size)]
+        embeddings = np.vstack(batches).astype(np.float32, copy=False)
+        return embeddings[0] if single else embeddings
+
+    @abstractmethod
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        """Encode one batch of strings into a 2-D array"""
+
+
+class SentenceTransformerEncoder(BaseEncoder):
+    """sentence-transformers model, imported and loaded on first use.
+
+    With quantize=True the model's Linear layers are dynamically quantized to
+    int8 for faster CPU inference.
+    """
+
+    name = "sentence-transformers"
+
+    def __init__(self, model_name_or_path: str = DEFAULT_ENCODER_MODEL, quantize: bool = False,
+                 device: str = "cpu"):
+        self.model_name_or_path = model_name_or_path
+        self.quantize = quantize
+        self.device = device
+        self._model = None
+
+    def _load(self):
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+
+            print(f"  Loading encoder {self.model_name_or_path} ({'int8' if self.quantize else 'fp32'})...")
+            model = SentenceTransformer(self.model_name_or_path, device=self.device)
+            if self.quantize:
+                import torch
+
+                quantization = getattr(torch, "ao", torch).quantization
+                model = quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            self._model = model
+        return self._model
+
+    @property
+    def model_id(self) -> str:
+        return self.model_name_or_path
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        return self._load().encode(
+            texts, batch_size=len(texts), convert_to_numpy=True,
+            normalize_embeddings=True, show_progress_bar=False
+        )
+
+
+class ONNXEncoder(BaseEncoder):
+    """ONNX Runtime encoder for an exported transformer (no torch import).
+
+    model_dir must contain the ONNX graph (e.g. model.onnx or an int8
+    model_quantized.onnx) and a HuggingFace tokenizer.json. Token embeddings are
+    mean-pooled over the attention mask, as all-MiniLM-L6-v2 does.
+    """
+
+    name = "onnx"
+
+    def __init__(self, model_dir: str, model_file: str = "model.onnx", max_length: int = 128,
+                 num_threads: Optional[int] = None):
+        self.model_dir = model_dir
+        self.model_file = model_file
+        self.max_length = max_length
+        self.num_threads = num_threads
+        self._session = None
+        self._tokenizer = None
+
+    def _load(self):
+        if self._session is None:
+            import onnxruntime as ort
+            from tokenizers import Tokenizer
+
+            print(f"  Loading ONNX encoder {os.path.join(self.model_dir, self.model_file)}...")
+            options = ort.SessionOptions()
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            if self.num_threads:
+                options.intra_op_num_threads = self.num_threads
+
+            tokenizer = Tokenizer.from_file(os.path.join(self.model_dir, "tokenizer.json"))
+            tokenizer.enable_truncation(max_length=self.max_length)
+            tokenizer.enable_padding()
+
+            self._session = ort.InferenceSession(
+                os.path.join(self.model_dir, self.model_file), options, providers=["CPUExecutionProvider"]
+            )
+            self._tokenizer = tokenizer
+        return self._session, self._tokenizer
+
+    @property
+    def model_id(self) -> str:
+        return os.path.join(self.model_dir, self.model_file)
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        session, tokenizer = self._load()
+        encoded = tokenizer.encode_batch(texts)
+
+        input_ids = np.array([e.ids for e in encoded], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encoded], dtype=np.int64)
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        input_names = {i.name for i in session.get_inputs()}
+        if "token_type_ids" in input_names:
+            feeds["token_type_ids"] = np.array([e.type_ids for e in encoded], dtype=np.int64)
+
+        token_embeddings = session.run(None, {k: v for k, v in feeds.items() if k in input_names})[0]
+
+        # Mean pooling over real tokens, then L2 normalize
+        mask = attention_mask[..., None].astype(np.float32)
+        pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return pooled / np.clip(norms, 1e-12, None)
+
+
+class BatchingEncoder(BaseEncoder):
+    """Coalesces concurrent single-query encodes into one batched encode() call.
+
+    A background thread drains the queue: each pass takes whatever queries are
+    waiting (plus any arriving within window_ms) up to max_batch_size, runs one
+    forward pass and hands every caller its own row. With window_ms=0 a lone
+    query pays no extra latency; batches form from requests that queue up while
+    the previous pass is running. List inputs go straight to the wrapped encoder.
+    """
+
+    def __init__(self, encoder: Any, window_ms: float = 0.0, max_batch_size: int = 32,
+                 timeout: Optional[float] = None):
+        self.encoder = encoder
+        self.window_ms = window_ms
+        self.max_batch_size = max(1, max_batch_size)
+        self.timeout = timeout  # seconds a caller waits for its row; None waits for the worker
+        self.batches = 0
+        self.batched_queries = 0
+        self._queue = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+
+    @property
+    def name(self) -> Optional[str]:
+        """Name of the wrapped encoder, so index manifests record the real model"""
+        return getattr(self.encoder, "name", None)
+
+    @property
+    def model_id(self) -> Optional[str]:
+        return getattr(self.encoder, "model_id", None)
+
+    def encode(self, sentences, show_progress_bar: bool = False, batch_size: int = 32, **kwargs):
+        if not isinstance(sentences, str):
+            return self.encoder.encode(sentences, show_progress_bar=show_progress_bar,
+                                       batch_size=batch_size, **kwargs)
+
+        future = Future()
+        # Enqueue under the lock: a dying worker drains the queue under it too, so no
+        # request can land in a queue nobody reads
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="vec2-encode-batcher", daemon=True)
+                self._worker.start()
+            self._queue.put((sentences, future))
+        return future.result(timeout=self.timeout)
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        return np.asarray(self.encoder.encode(texts, batch_size=len(texts)), dtype=np.float32)
+
+    def _collect(self) -> List[Tuple[str, Future]]:
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.window_ms / 1000.0
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    @staticmethod
+    def _fail(batch: List[Tuple[str, Future]], error: BaseException):
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(error)
+
+    def _run(self):
+        batch = []
+        try:
+            while True:
+                batch = self._collect()
+                texts = [text for text, _ in batch]
+                try:
+                    embeddings = self._encode_batch(texts)
+                    if embeddings.ndim != 2 or len(embeddings) != len(batch):
+                        raise RuntimeError(
+                            f"Encoder returned shape {embeddings.shape} for a batch of {len(batch)} queries"
+                        )
+                except Exception as e:
+                    self._fail(batch, e)
+                    continue
+
+                self.batches += 1
+                self.batched_queries += len(batch)
+                for (_, future), embedding in zip(batch, embeddings):
+                    future.set_result(embedding)
+                batch = []
+        except BaseException as e:
+            # The worker is going away: fail its batch and everything queued behind it;
+            # the next encode() starts a fresh worker
+            with self._lock:
+                self._worker = None
+                while True:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+            self._fail(batch, e)
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "queries": self.batched_queries,
+            "mean_batch_size": self.batched_queries / self.batches if self.batches else 0.0,
+        }
+
+
+def create_encoder(backend: Optional[str] = None, model_path: Optional[str] = None,
+                   **kwargs) -> Optional[BaseEncoder]:
+    """Build an encoder by backend name; returns None for lexical-only ("none")"""
+    backend = (backend or DEFAULT_ENCODER_BACKEND).lower()
+
+    if backend in ("none", "off", "disabled"):
+        return None
+    if backend == "sentence-transformers":
+        return SentenceTransformerEncoder(model_path or DEFAULT_ENCODER_MODEL, **kwargs)
+    if backend == "quantized":
+        return SentenceTransformerEncoder(model_path or DEFAULT_ENCODER_MODEL, quantize=True, **kwargs)
+    if backend == "onnx":
+        if not model_path:
+            raise ValueError("ONNX encoder needs model_path pointing at an exported model directory")
+        return ONNXEncoder(model_path, **kwargs)
+
+    raise ValueError(f"Unknown encoder backend: {backend}")
+
+
+# (relevance_score, primary_key, matched_keywords) emitted by a match stage
+Candidate = Tuple[float, str, List[str]]
+
+# Stages cheap enough to answer a streaming request before fuzzy/semantic finish
+FAST_STAGES = ("exact_item", "keyword", "partial")
+
+_STAGE_EXECUTOR = None
+_SHARD_EXECUTOR = None
+_STAGE_EXECUTOR_LOCK = threading.Lock()
+
+
+def _get_stage_executor() -> ThreadPoolExecutor:
+    """Process-wide thread pool shared by every engine's parallel match stages"""
+    global _STAGE_EXECUTOR
+    with _STAGE_EXECUTOR_LOCK:
+        if _STAGE_EXECUTOR is None:
+            workers = int(os.environ.get("VEC2_STAGE_WORKERS", min(8, (os.cpu_count() or 1) + 2)))
+            _STAGE_EXECUTOR = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="vec2-stage")
+        return _STAGE_EXECUTOR
+
+
+def _get_shard_executor() -> ThreadPoolExecutor:
+    """Separate pool for shard fan-out, so shard tasks never wait on their own stage tasks"""
+    global _SHARD_EXECUTOR
+    with _STAGE_EXECUTOR_LOCK:
+        if _SHARD_EXECUTOR is None:
+            workers = int(os.environ.get("VEC2_SHARD_WORKERS", min(8, (os.cpu_count() or 1) + 2)))
+            _SHARD_EXECUTOR = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="vec2-shard")
+        return _SHARD_EXECUTOR
 
 
 class IntelligentSearchEngine:
     """Intelligent search engine with suggestions and exact matching"""
     
-    def __init__(self, items_database: Dict[str, RateItem], processor: EnhancedPDFProcessor):
+    def __init__(self, items_database: Dict[str, RateItem], processor: EnhancedPDFProcessor,
+                 model: Any = None, encoder_backend: Optional[str] = None,
+                 encoder_path: Optional[str] = None,
+                 precomputed_embeddings: Optional[Tuple[Any, np.ndarray]] = None,
+                 parallel_stages: bool = False, stage_deadline_ms: Optional[float] = None,
+                 fusion_method: str = "weighted", stage_weights: Optional[Dict[str, float]] = None,
+                 rrf_k: int = 60, batch_window_ms: Optional[float] = None, max_batch_size: int = 32):
         self.items_database = items_database
         self.processor = processor
         print("🔄 Initializing intelligent search engine...")
         
-        # Initialize semantic search model
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')
-        self.embeddings_cache = {}
-        
-        # Initialize TF-IDF for text matching
-        self.tfidf_vectorizer = TfidfVectorizer(max_features=1000, ngram_range=(1, 3))
-        
-        self._compute_embeddings()
+        # Run match stages concurrently on the shared pool; stages that miss the deadline are dropped
+        self.parallel_stages = parallel_stages
+        self.stage_deadline_ms = stage_deadline_ms
+        self.stage_timeouts = defaultdict(int)  # stage name -> results dropped for missing the deadline
+        
+        # How per-stage candidate streams are merged ("weighted" or "rrf")
+        if fusion_method not in ("weighted", "rrf"):
+            raise ValueError(f"Unknown fusion method: {fusion_method}")
+        self.fusion_method = fusion_method
+        self.stage_weights = dict(stage_weights or {})  # match_type -> weight, default 1.0
+        self.rrf_k = rrf_k
+        
+        # Semantic model: an explicit encoder wins, otherwise build one from the backend name.
+        # Backend "none" gives a lexical-only engine that never imports an ML stack.
+        self.model = model if model is not None else create_encoder(encoder_backend, encoder_path)
+        self.semantic_enabled = self.model is not None
+        
+        # Micro-batch query encodes from concurrent requests into shared forward passes
+        if self.semantic_enabled and batch_window_ms is not None and not isinstance(self.model, BatchingEncoder):
+            self.model = BatchingEncoder(self.model, window_ms=batch_window_ms, max_batch_size=max_batch_size)
+        # (keys, matrix, cache) with matrix (n_items, dim) float32, rows L2-normalized. Replaced
+        # as one tuple, so a query never pairs a row of one matrix with the keys of another
+        self._embeddings: Tuple[Any, Optional[np.ndarray], Dict[str, np.ndarray]] = ([], None, {})
+        
+        if self.semantic_enabled and precomputed_embeddings is not None:
+            # (keys, matrix) already L2-normalized, e.g. a read-only memory map from SharedIndex
+            keys, matrix = precomputed_embeddings
+            self._embeddings = (keys, matrix, {})
+            print(f"  ✅ Using {len(keys)} precomputed embeddings")
+        elif self.semantic_enabled:
+            self._compute_embeddings()
+        else:
+            print("  ℹ️ Semantic search disabled (lexical-only)")
+    
+    @property
+    def embedding_keys(self):
+        return self._embeddings[0]
+    
+    @property
+    def embedding_matrix(self) -> Optional[np.ndarray]:
+        return self._embeddings[1]
+    
+    @property
+    def embeddings_cache(self) -> Dict[str, np.ndarray]:
+        return self._embeddings[2]
+    
+    def with_processor(self, processor: EnhancedPDFProcessor) -> "IntelligentSearchEngine":
+        """Shallow copy of this engine over another processor, e.g. a re-ingested copy.
+
+        The encoder and current embeddings are shared until apply_changes()
+        replaces the copy's embeddings.
+        """
+        engine = copy.copy(self)
+        engine.processor = processor
+        engine.items_database = processor.items_database
+        return engine
     
     def _compute_embeddings(self):
         """Compute embeddings for semantic search"""
@@ -535,55 +1437,237 @@ class IntelligentSearchEngine:
             keys.append(key)
         
         if texts:
-            embeddings = self.model.encode(texts, show_progress_bar=True)
-            
-            for key, embedding in zip(keys, embeddings):
-                self.embeddings_cache[key] = embedding
+            embeddings = np.asarray(self.model.encode(texts, show_progress_bar=True), dtype=np.float32)
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            matrix = embeddings / np.clip(norms, 1e-12, None)
+            self._embeddings = (keys, matrix, dict(zip(keys, matrix)))
             
-            # Fit TF-IDF
-            self.tfidf_vectorizer.fit(texts)
-            
-            print(f"  ✅ Computed {len(self.embeddings_cache)} embeddings")
+            print(f"  ✅ Computed {len(keys)} embeddings")
+    
+    def apply_changes(self, added_keys: List[str], removed_keys: List[str]):
+        """Re-embed only the items a differential ingest added or replaced"""
+        if not self.semantic_enabled:
+            return
+        
+        old_keys, old_matrix, _ = self._embeddings
+        changed = set(added_keys) | set(removed_keys)
+        kept_rows = [i for i, key in enumerate(old_keys) if key not in changed]
+        new_keys = [key for key in dict.fromkeys(added_keys) if key in self.items_database]
+        
+        kept_keys = [old_keys[i] for i in kept_rows]
+        blocks = []
+        if old_matrix is not None and kept_rows:
+            blocks.append(np.asarray(old_matrix)[kept_rows])
+        if new_keys:
+            print(f"  Computing {len(new_keys)} changed embeddings...")
+            embeddings = np.asarray(
+                self.model.encode([self.items_database[k].embedding_text for k in new_keys]), dtype=np.float32
+            )
+            blocks.append(embeddings / np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None))
+        
+        keys = kept_keys + new_keys
+        matrix = np.vstack(blocks) if blocks else None
+        self._embeddings = (keys, matrix, {} if matrix is None else dict(zip(keys, matrix)))
     
-    def get_suggestions(self, query: str, max_suggestions: int = 10) -> List[SearchSuggestion]:
-        """Get intelligent suggestions for a query"""
+    def get_suggestions(self, query: str, max_suggestions: int = 10, parallel: Optional[bool] = None,
+                        deadline_ms: Optional[float] = None,
+                        section: Optional[str] = None) -> List[SearchSuggestion]:
+        """Get intelligent suggestions for a query.
+
+        With parallel=True the lexical stages and the semantic stage run at the
+        same time; deadline_ms bounds the whole request and late stages are dropped.
+        section (case-insensitive) restricts every stage to that section's items
+        before the stage cuts its candidates to max_suggestions.
+        """
         query = query.strip().lower()
         
         if len(query) < 2:
             return []
         
-        suggestions = []
+        if parallel is None:
+            parallel = self.parallel_stages
+        if deadline_ms is None:
+            deadline_ms = self.stage_deadline_ms
         
-        # 1. Exact item number match
-        exact_item_suggestions = self._get_exact_item_matches(query)
-        suggestions.extend(exact_item_suggestions)
+        allowed = self._section_keys(section) if section else None
+        if allowed is not None and not allowed:
+            return []
         
-        # 2. Keyword exact matches
-        keyword_suggestions = self._get_keyword_matches(query)
-        suggestions.extend(keyword_suggestions)
+        stages = self._match_stages()
         
-        # 3. Fuzzy matches
-        if FUZZY_AVAILABLE:
-            fuzzy_suggestions = self._get_fuzzy_matches(query)
-            suggestions.extend(fuzzy_suggestions)
+        # Each stage emits at most max_suggestions candidates
+        if parallel:
+            stage_results = self._run_stages_parallel(stages, query, max_suggestions, deadline_ms, allowed)
+        else:
+            stage_results = [stage(query, max_suggestions, allowed) for _, stage in stages]
         
-        # 4. N-gram partial matches
-        ngram_suggestions = self._get_ngram_matches(query)
-        suggestions.extend(ngram_suggestions)
+        # Merge stage streams and build SearchSuggestions for the winners only
+        return self._fuse_candidates(
+            [(name, results) for (name, _), results in zip(stages, stage_results)], max_suggestions
+        )
+    
+    def stream_suggestions(self, query: str, max_suggestions: int = 10,
+                           deadline_ms: Optional[float] = None) -> Iterator[Tuple[str, List[SearchSuggestion]]]:
+        """Yield ("fast", suggestions) then ("final", suggestions) for a query.
+
+        The fuzzy and semantic stages start on the shared pool first; the cheap
+        lexical stages (exact item, keyword, partial) run inline and are yielded
+        straight away. The final update re-ranks everything together and matches
+        get_suggestions(); stages that miss deadline_ms are left out of it.
+        """
+        query = query.strip().lower()
+        
+        if len(query) < 2:
+            yield "final", []
+            return
+        
+        if deadline_ms is None:
+            deadline_ms = self.stage_deadline_ms
         
-        # 5. Semantic matches
-        semantic_suggestions = self._get_semantic_matches(query)
-        suggestions.extend(semantic_suggestions)
+        start = time.perf_counter()
+        stages = self._match_stages()
+        executor = _get_stage_executor()
+        futures = {
+            name: executor.submit(stage, query, max_suggestions)
+            for name, stage in stages if name not in FAST_STAGES
+        }
+        
+        results = {
+            name: stage(query, max_suggestions)
+            for name, stage in stages if name in FAST_STAGES
+        }
+        yield "fast", self._fuse_candidates(
+            [(name, results[name]) for name, _ in stages if name in results], max_suggestions
+        )
         
-        # Remove duplicates and sort by relevance
-        unique_suggestions = self._deduplicate_suggestions(suggestions)
-        sorted_suggestions = sorted(unique_suggestions, key=lambda x: x.relevance_score, reverse=True)
+        timeout = None
+        if deadline_ms is not None:
+            timeout = max(deadline_ms / 1000.0 - (time.perf_counter() - start), 0.0)
+        wait(list(futures.values()), timeout=timeout)
+        
+        for name, future in futures.items():
+            if future.done():
+                results[name] = future.result()
+            else:
+                future.cancel()
+                self.stage_timeouts[name] += 1
+                results[name] = []
+        
+        yield "final", self._fuse_candidates([(name, results[name]) for name, _ in stages], max_suggestions)
+    
+    def _section_keys(self, section: str) -> Set[str]:
+        """Keys of the items in a section (case-insensitive), for restricting match stages"""
+        keys = set()
+        for name in self.processor.section_mapping:
+            if name.lower() == section.lower():
+                keys.update(self.processor.section_mapping[name])
+        return keys
+    
+    def _match_stages(self) -> List[Tuple[str, Any]]:
+        """Enabled match stages in ranking order (ties go to the earlier stage)"""
+        stages = [
+            ("exact_item", self._get_exact_item_matches),  # 1. Exact item number match
+            ("keyword", self._get_keyword_matches),        # 2. Keyword exact matches
+        ]
+        if FUZZY_AVAILABLE:
+            stages.append(("fuzzy", self._get_fuzzy_matches))  # 3. Fuzzy matches
+        stages.append(("partial", self._get_ngram_matches))    # 4. N-gram partial matches
+        if self.semantic_enabled:
+            stages.append(("semantic", self._get_semantic_matches))  # 5. Semantic matches
+        return stages
+    
+    def _run_stages_parallel(self, stages: List[Tuple[str, Any]], query: str, limit: int,
+                             deadline_ms: Optional[float],
+                             allowed: Optional[Set[str]] = None) -> List[List[Candidate]]:
+        """Run match stages on the shared pool, keeping stage order; late stages yield []"""
+        start = time.perf_counter()
+        executor = _get_stage_executor()
+        
+        # The exact item lookup is a couple of dict probes: run it inline so it is never dropped
+        _, first_stage = stages[0]
+        futures = [(name, executor.submit(stage, query, limit, allowed)) for name, stage in stages[1:]]
+        results = [first_stage(query, limit, allowed)]
+        
+        timeout = None
+        if deadline_ms is not None:
+            timeout = max(deadline_ms / 1000.0 - (time.perf_counter() - start), 0.0)
+        wait([future for _, future in futures], timeout=timeout)
+        
+        for name, future in futures:
+            if future.done():
+                results.append(future.result())
+            else:
+                future.cancel()  # stops it only if it has not started yet
+                self.stage_timeouts[name] += 1
+                results.append([])
         
-        return sorted_suggestions[:max_suggestions]
+        return results
+    
+    @staticmethod
+    def _top_candidates(candidates: List[Candidate], limit: int) -> List[Candidate]:
+        """Best `limit` candidates by score via a heap, ties broken on primary_key.
+
+        Stages collect matches from sets, whose order changes with the hash
+        seed; ordering by (score, primary_key) keeps rankings reproducible.
+        """
+        return heapq.nsmallest(limit, candidates, key=lambda c: (-c[0], c[1]))
     
-    def _get_exact_item_matches(self, query: str) -> List[SearchSuggestion]:
-        """Get exact item number matches"""
-        suggestions = []
+    def _fuse_candidates(self, stage_results: List[Tuple[str, List[Candidate]]],
+                         limit: int) -> List[SearchSuggestion]:
+        """Merge per-stage top-k streams into the final top-k.
+
+        "weighted": each item keeps its best weight * score over all stages
+        (with unit weights this is the classic keep-highest dedupe).
+        "rrf": reciprocal rank fusion, sum of weight / (rrf_k + rank) per stage,
+        scaled to 0..1.
+        """
+        fused = {}  # primary_key -> [score, first_seen, match_type, matched_keywords, best_part]
+        seq = 0
+        rrf = self.fusion_method == "rrf"
+        
+        for match_type, candidates in stage_results:
+            weight = self.stage_weights.get(match_type, 1.0)
+            
+            # A key counts once per stage, at its best rank (stable sort keeps emission order on ties)
+            best = {}
+            for candidate in sorted(candidates, key=lambda c: -c[0]):
+                best.setdefault(candidate[1], candidate)
+            
+            for rank, (score, primary_key, matched_keywords) in enumerate(best.values(), 1):
+                part = weight / (self.rrf_k + rank) if rrf else weight * score
+                entry = fused.get(primary_key)
+                if entry is None:
+                    fused[primary_key] = [part, seq, match_type, matched_keywords, part]
+                    seq += 1
+                elif rrf:
+                    entry[0] += part
+                    if part > entry[4]:
+                        entry[2:5] = [match_type, matched_keywords, part]
+                elif part > entry[0]:
+                    entry[0] = part
+                    entry[2:4] = [match_type, matched_keywords]
+        
+        winners = heapq.nlargest(limit, fused.items(), key=lambda kv: (kv[1][0], -kv[1][1]))
+        
+        scale = 1.0
+        if rrf:
+            best_possible = sum(self.stage_weights.get(name, 1.0) for name, _ in stage_results) / (self.rrf_k + 1)
+            scale = 1.0 / best_possible if best_possible else 1.0
+        
+        return [
+            SearchSuggestion(
+                item=self.items_database[primary_key],
+                relevance_score=score * scale,
+                match_type=match_type,
+                matched_keywords=matched_keywords
+            )
+            for primary_key, (score, _, match_type, matched_keywords, _) in winners
+        ]
+    
+    def _get_exact_item_matches(self, query: str, limit: int = 10,
+                                allowed: Optional[Set[str]] = None) -> List[Candidate]:
+        """Get exact item number matches (only keys in allowed, when given)"""
+        candidates = []
         
         # Try to extract item number from query
         item_patterns = [
@@ -598,164 +1682,163 @@ class IntelligentSearchEngine:
                 item_no = match.group(1)
                 if item_no in self.processor.item_number_index:
                     primary_key = self.processor.item_number_index[item_no]
-                    item = self.items_database[primary_key]
-                    
-                    suggestion = SearchSuggestion(
-                        item=item,
-                        relevance_score=1.0,
-                        match_type="exact_item",
-                        matched_keywords=[f"item {item_no}"]
-                    )
-                    suggestions.append(suggestion)
+                    if allowed is not None and primary_key not in allowed:
+                        continue
+                    # Several patterns usually find the same number
+                    if all(key != primary_key for _, key, _ in candidates):
+                        candidates.append((1.0, primary_key, [f"item {item_no}"]))
         
-        return suggestions
+        return candidates[:limit]
     
-    def _get_keyword_matches(self, query: str) -> List[SearchSuggestion]:
-        """Get keyword-based matches"""
-        suggestions = []
+    def _get_keyword_matches(self, query: str, limit: int = 10,
+                             allowed: Optional[Set[str]] = None) -> List[Candidate]:
+        """Get keyword-based matches (only keys in allowed, when given)"""
+        candidates = []
         query_words = query.split()
         
         # Find items that match keywords
-        matching_items = set()
         matched_keywords = []
         
         for word in query_words:
             if word in self.processor.keyword_index:
-                matching_items.update(self.processor.keyword_index[word])
                 matched_keywords.append(word)
         
         # Score based on number of matched keywords
-        for primary_key in matching_items:
-            item = self.items_database[primary_key]
-            
-            # Calculate relevance based on keyword overlap
-            item_keywords = set(kw.lower() for kw in item.search_keywords)
-            query_keywords = set(query_words)
-            
-            overlap = len(item_keywords.intersection(query_keywords))
-            total_query_words = len(query_keywords)
-            
+        query_keywords = set(query_words)
+        total_query_words = len(query_keywords)
+        
+        # Keyword overlap counted from the postings (an item is in keyword_index[word]
+        # exactly when word is one of its keywords), so no item has to be loaded
+        overlaps = defaultdict(int)
+        for word in query_keywords.intersection(matched_keywords):
+            for primary_key in self.processor.keyword_index[word]:
+                overlaps[primary_key] += 1
+        
+        for primary_key, overlap in overlaps.items():
+            if allowed is not None and primary_key not in allowed:
+                continue
             if total_query_words > 0:
                 relevance_score = min(overlap / total_query_words, 1.0)
                 
                 if relevance_score > 0.3:  # Minimum threshold
-                    suggestion = SearchSuggestion(
-                        item=item,
-                        relevance_score=relevance_score,
-                        match_type="keyword",
-                        matched_keywords=matched_keywords
-                    )
-                    suggestions.append(suggestion)
+                    candidates.append((relevance_score, primary_key, matched_keywords))
         
-        return suggestions
+        return self._top_candidates(candidates, limit)
     
-    def _get_fuzzy_matches(self, query: str) -> List[SearchSuggestion]:
-        """Get fuzzy string matches"""
-        suggestions = []
+    def _get_fuzzy_matches(self, query: str, limit: int = 10,
+                           allowed: Optional[Set[str]] = None) -> List[Candidate]:
+        """Get fuzzy string matches (only keys in allowed, when given)"""
+        candidates = []
         
         if not FUZZY_AVAILABLE:
-            return suggestions
-        
-        # Get all descriptions for fuzzy matching
-        descriptions = []
-        for item in self.items_database.values():
-            descriptions.append((item.description.lower(), item.primary_key))
+            return candidates
+        
+        description_index = self.processor.description_index
+        if allowed is not None:
+            # Match against the allowed items only, so they are not crowded out of the top 5
+            keys = [primary_key for primary_key in self.items_database if primary_key in allowed]
+            descriptions = [self.items_database[primary_key].description.lower() for primary_key in keys]
+            description_index = {text.strip(): primary_key for text, primary_key in zip(descriptions, keys)}
+        else:
+            # Get all descriptions for fuzzy matching (a mapped SharedIndex keeps them as a string table)
+            descriptions = getattr(self.items_database, "descriptions", None)
+            if descriptions is None:
+                descriptions = [item.description.lower() for item in self.items_database.values()]
         
         # Fuzzy match against descriptions
-        fuzzy_matches = process.extract(query, [desc[0] for desc in descriptions], limit=5)
+        fuzzy_matches = process.extract(query, descriptions, limit=min(5, limit))
         
         for match_text, score in fuzzy_matches:
             if score > 60:  # Minimum fuzzy score threshold
                 # Find the item with this description
-                for desc, primary_key in descriptions:
-                    if desc == match_text:
-                        item = self.items_database[primary_key]
-                        
-                        suggestion = SearchSuggestion(
-                            item=item,
-                            relevance_score=score / 100.0,
-                            match_type="fuzzy",
-                            matched_keywords=[query]
-                        )
-                        suggestions.append(suggestion)
-                        break
+                primary_key = description_index.get(match_text.strip())
+                if primary_key is not None:
+                    candidates.append((score / 100.0, primary_key, [query]))
         
-        return suggestions
+        return candidates
     
-    def _get_ngram_matches(self, query: str) -> List[SearchSuggestion]:
-        """Get n-gram partial matches"""
-        suggestions = []
+    def _get_ngram_matches(self, query: str, limit: int = 10,
+                           allowed: Optional[Set[str]] = None) -> List[Candidate]:
+        """Get n-gram partial matches (only keys in allowed, when given)"""
+        candidates = []
         
         # Find items with n-gram matches
         matching_items = set()
+        ngram_index = self.processor.ngram_index
         
-        for ngram, item_keys in self.processor.ngram_index.items():
-            if query in ngram or ngram in query:
-                matching_items.update(item_keys)
+        if hasattr(ngram_index, "substring_matches"):  # MappedPostings / SQLitePostings
+            matching_items = ngram_index.substring_matches(query)
+        else:
+            for ngram, item_keys in ngram_index.items():
+                if query in ngram or ngram in query:
+                    matching_items.update(item_keys)
+        if allowed is not None:
+            matching_items = matching_items & allowed
         
         # Score based on n-gram overlap
+        query_words = query.split()
+        matched_keywords = [query]
+        
+        # Mapped stores read the description straight from their string table
+        description_of = getattr(self.items_database, "description_of", None)
+        
         for primary_key in matching_items:
-            item = self.items_database[primary_key]
-            
             # Calculate relevance based on text similarity
-            item_text = item.description.lower()
+            if description_of is not None:
+                item_text = description_of(primary_key)
+            else:
+                item_text = self.items_database[primary_key].description.lower()
             
             # Simple containment scoring
             if query in item_text:
                 relevance_score = 0.8
-            elif any(word in item_text for word in query.split()):
+            elif any(word in item_text for word in query_words):
                 relevance_score = 0.6
             else:
                 relevance_score = 0.4
             
-            suggestion = SearchSuggestion(
-                item=item,
-                relevance_score=relevance_score,
-                match_type="partial",
-                matched_keywords=[query]
-            )
-            suggestions.append(suggestion)
+            candidates.append((relevance_score, primary_key, matched_keywords))
         
-        return suggestions
+        return self._top_candidates(candidates, limit)
     
-    def _get_semantic_matches(self, query: str) -> List[SearchSuggestion]:
-        """Get semantic similarity matches"""
-        suggestions = []
+    def _get_semantic_matches(self, query: str, limit: int = 10,
+                              allowed: Optional[Set[str]] = None) -> List[Candidate]:
+        """Get semantic similarity matches (only keys in allowed, when given)"""
+        candidates = []
+        embedding_keys, embedding_matrix, _ = self._embeddings
+        
+        if not self.semantic_enabled or embedding_matrix is None:
+            return candidates
         
         try:
-            query_embedding = self.model.encode(query)
+            query_embedding = np.asarray(self.model.encode(query), dtype=np.float32)
+            query_embedding /= max(float(np.linalg.norm(query_embedding)), 1e-12)
             
-            # Calculate semantic similarity with all items
-            for primary_key, item_embedding in self.embeddings_cache.items():
-                similarity = float(cosine_similarity([query_embedding], [item_embedding])[0][0])
-                
-                if similarity > 0.5:  # Minimum semantic similarity threshold
-                    item = self.items_database[primary_key]
-                    
-                    suggestion = SearchSuggestion(
-                        item=item,
-                        relevance_score=similarity,
-                        match_type="semantic",
-                        matched_keywords=[query]
-                    )
-                    suggestions.append(suggestion)
+            # Cosine similarity against all items in one matrix-vector product
+            similarities = embedding_matrix @ query_embedding
+            
+            eligible = similarities > 0.5  # Minimum semantic similarity threshold
+            if allowed is not None:
+                eligible &= np.fromiter((key in allowed for key in embedding_keys), dtype=bool,
+                                        count=len(embedding_keys))
+            hits = np.flatnonzero(eligible)
+            if len(hits) > limit:
+                # Partial selection of the top `limit` instead of a full sort; argpartition picks
+                # arbitrarily among ties at the cut, so those are taken in index order
+                scores = similarities[hits]
+                cut = scores[np.argpartition(-scores, limit - 1)[limit - 1]]
+                above = np.flatnonzero(scores > cut)
+                tied = np.flatnonzero(scores == cut)[:limit - len(above)]
+                hits = np.sort(hits[np.concatenate([above, tied])])
+            
+            matched_keywords = [query]
+            for idx in hits:
+                candidates.append((float(similarities[idx]), embedding_keys[idx], matched_keywords))
         
         except Exception as e:
             print(f"Semantic search error: {e}")
         
-        return suggestions
-    
-    def _deduplicate_suggestions(self, suggestions: List[SearchSuggestion]) -> List[SearchSuggestion]:
-        """Remove duplicate suggestions, keeping the highest scored one"""
-        seen_items = {}
-        
-        for suggestion in suggestions:
-            primary_key = suggestion.item.primary_key
-            
-            if primary_key not in seen_items or suggestion.relevance_score > seen_items[primary_key].relevance_score:
-                seen_items[primary_key] = suggestion
-        
-        return list(seen_items.values())
+        return candidates
     
     def get_exact_item(self, primary_key: str) -> Optional[RateItem]:
         """Get exact item by primary key"""
@@ -764,6 +1847,9 @@ class IntelligentSearchEngine:
     def search_by_filters(self, section: str = None, item_no: str = None, 
                          material_type: str = None) -> List[RateItem]:
         """Search by specific filters"""
+        if hasattr(self.items_database, "filter"):  # disk-backed store answers filters itself
+            return self.items_database.filter(section, item_no, material_type)
+        
         results = []
         
         for item in self.items_database.values():
@@ -782,16 +1868,1179 @@ class IntelligentSearchEngine:
                 results.append(item)
         
         return results
+    
+    def _description_matches(self, material_type: str) -> List[str]:
+        """Keys of items whose description contains material_type, the test search_by_filters applies"""
+        if hasattr(self.items_database, "filter"):  # disk-backed store answers filters itself
+            return [item.primary_key for item in self.items_database.filter(material_type=material_type)]
+        
+        term = material_type.lower()
+        if hasattr(self.items_database, "description_contains"):  # mapped SharedIndex
+            return self.items_database.description_contains(term)
+        
+        return [
+            primary_key for primary_key, item in self.items_database.items()
+            if term in item.description.lower()
+        ]
+    
+    def search_by_rate(self, min_rate: Optional[float] = None, max_rate: Optional[float] = None,
+                       section: str = None, unit: str = None, material_type: str = None,
+                       rate_column: str = "rate_2024_25", descending: bool = False,
+                       limit: Optional[int] = None) -> List[RateItem]:
+        """Range/sort search on the numeric rate columns, e.g. pipes under 5000 per rmt"""
+        columns = self.processor.rate_columns
+        if columns is None:
+            return []
+        
+        rows = None
+        if material_type:
+            rows = columns.row_ids(self._description_matches(material_type))
+        
+        selected = columns.select(rate_column, min_rate, max_rate, section, unit, rows, descending)
+        if limit is not None:
+            selected = selected[:limit]
+        return [self.items_database[key] for key in columns.keys_at(selected)]
+    
+    def resolve_items(self, keys: List[Optional[str]], descriptions: List[Optional[str]],
+                      min_score: float = 0.5) -> Tuple[np.ndarray, List[Optional[str]], np.ndarray]:
+        """Resolve estimate lines to rate-column rows in batches.
+
+        Lines are tried by primary key, then exact description, then one
+        batched semantic pass, then keyword/partial matches that share enough
+        keywords with the line. A lexical match tied with another item is not
+        picked: the line stays at row -1 and resolves as "ambiguous".
+        Returns rows (-1 = unresolved), how each line resolved and scores.
+        """
+        columns = self.processor.rate_columns
+        rows = columns.rows_for(keys)
+        resolved_by = ["key" if row >= 0 else None for row in rows]
+        scores = np.where(rows >= 0, 1.0, 0.0)
+        
+        pending = []
+        for i, row in enumerate(rows):
+            if row >= 0 or not descriptions[i]:
+                continue
+            primary_key = self.processor.description_index.get(descriptions[i].lower().strip())
+            if primary_key is not None:
+                rows[i] = columns.rows_for([primary_key])[0]
+                resolved_by[i], scores[i] = "description", 1.0
+            else:
+                pending.append(i)
+        
+        embedding_keys, embedding_matrix, _ = self._embeddings
+        if pending and self.semantic_enabled and embedding_matrix is not None and len(embedding_matrix):
+            queries = np.asarray(self.model.encode([descriptions[i] for i in pending]), dtype=np.float32)
+            queries /= np.clip(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12, None)
+            
+            for start in range(0, len(pending), 256):  # bound the (lines x items) similarity block
+                similarities = queries[start:start + 256] @ embedding_matrix.T
+                best = similarities.argmax(axis=1)
+                best_scores = similarities[np.arange(len(best)), best]
+                matched = columns.rows_for([embedding_keys[b] for b in best])
+                for offset, i in enumerate(pending[start:start + 256]):
+                    if best_scores[offset] >= min_score:
+                        rows[i], resolved_by[i], scores[i] = matched[offset], "semantic", best_scores[offset]
+        
+        # Whatever is left goes through the keyword and partial stages. Numbers in free text
+        # are quantities or sizes, not item numbers, so exact_item is not used here, and a
+        # candidate is only accepted on real keyword overlap with the line.
+        lexical_stages = [("keyword", self._get_keyword_matches), ("partial", self._get_ngram_matches)]
+        for i in pending:
+            if rows[i] >= 0:
+                continue
+            query = descriptions[i].strip().lower()
+            query_words = set(query.split())
+            candidates = self._fuse_candidates([(name, stage(query, 5)) for name, stage in lexical_stages], 5)
+            
+            best, best_overlap, tied = None, 0.0, False
+            for suggestion in candidates:
+                item_keywords = set(kw.lower() for kw in suggestion.item.search_keywords)
+                overlap = len(item_keywords & query_words) / len(query_words) if query_words else 0.0
+                if overlap > best_overlap:
+                    best, best_overlap, tied = suggestion, overlap, False
+                elif overlap == best_overlap and best is not None:
+                    tied = True
+            
+            if best is not None and best_overlap >= min_score:
+                if tied:
+                    # Several items fit the line equally well; pricing one of them would be a guess
+                    resolved_by[i], scores[i] = "ambiguous", best_overlap
+                else:
+                    rows[i] = columns.rows_for([best.item.primary_key])[0]
+                    resolved_by[i], scores[i] = best.match_type, best_overlap
+        
+        return rows, resolved_by, scores
+    
+    def cost_estimate(self, keys: List[Optional[str]], descriptions: List[Optional[str]],
+                      quantities: List[float], units: List[Optional[str]],
+                      rate_column: str = "rate_2024_25", min_score: float = 0.5) -> Dict[str, Any]:
+        """Cost a whole estimate: resolve lines, check units, amounts and section subtotals.
+
+        Only lines matched by key or exact description are "ok" and count in the
+        total and subtotals. Lines matched by the semantic or lexical fallback
+        get an amount but status "needs_review", and are summed in review_total.
+        """
+        columns = self.processor.rate_columns
+        if rate_column not in RATE_COLUMNS:
+            raise ValueError(f"Unknown rate column: {rate_column}")
+        
+        rows, resolved_by, scores = self.resolve_items(keys, descriptions, min_score)
+        quantities = np.asarray(quantities, dtype=np.float64)
+        resolved = rows >= 0
+        
+        # Gather only resolved rows, so an empty index (no rows to point at) costs to zero
+        rates = np.full(len(rows), np.nan)
+        rates[resolved] = columns.rates[rate_column][rows[resolved]]
+        line_units = np.array([_normalize_unit(u) for u in units], dtype=object)
+        item_units = np.full(len(rows), "", dtype=object)
+        item_units[resolved] = np.array(columns.units, dtype=object)[columns.unit_codes[rows[resolved]]]
+        unit_ok = (line_units == "") | (line_units == item_units)
+        
+        priced = resolved & ~np.isnan(rates) & unit_ok
+        amounts = np.where(priced, quantities * np.nan_to_num(rates), np.nan)
+        exact = np.array([how in ("key", "description") for how in resolved_by], dtype=bool)
+        ambiguous = np.array([how == "ambiguous" for how in resolved_by], dtype=bool)
+        
+        status = np.where(ambiguous, "ambiguous",
+                          np.where(~resolved, "unresolved",
+                                   np.where(np.isnan(rates), "no_rate",
+                                            np.where(~unit_ok, "unit_mismatch",
+                                                     np.where(exact, "ok", "needs_review")))))
+        
+        confirmed = priced & exact
+        subtotals = np.bincount(columns.section_codes[rows[confirmed]], weights=amounts[confirmed],
+                                minlength=len(columns.sections))
+        
+        return {
+            "rows": rows,
+            "resolved_by": resolved_by,
+            "scores": scores,
+            "rates": rates,
+            "amounts": amounts,
+            "status": status,
+            "section_subtotals": {
+                columns.sections[code]: float(total) for code, total in enumerate(subtotals) if total
+            },
+            "total": float(amounts[confirmed].sum()),
+            "review_total": float(amounts[priced & ~exact].sum()),
+        }
+
+
+# ==== SHARDED MULTI-SCHEDULE ENGINE ====
+class ShardedSearchEngine:
+    """Searches several rate books at once, one IntelligentSearchEngine per shard.
+
+    A shard is a schedule (e.g. "MJP SSR 2024-25") or one section of it, with
+    its own indexes and embeddings, so it can be loaded, rebuilt or unloaded
+    without touching the others. Queries fan out in parallel to the shards left
+    after schedule/section pruning and the per-shard top-k lists are merged into
+    one global top-k. All shards share a single encoder; with batch_window_ms
+    set, one BatchingEncoder coalesces query encodes across every shard.
+
+    Schedules reuse item numbers and descriptions, so one primary key can live
+    in several shards; items leaving this engine are identified by the
+    shard-qualified id "{shard}:{primary_key}".
+    """
+    
+    def __init__(self, model: Any = None, encoder_backend: Optional[str] = None,
+                 encoder_path: Optional[str] = None, parallel: bool = True, **engine_options):
+        self.model = model if model is not None else create_encoder(encoder_backend, encoder_path)
+        batch_window_ms = engine_options.pop("batch_window_ms", None)
+        max_batch_size = engine_options.pop("max_batch_size", 32)
+        if self.model is not None and batch_window_ms is not None and not isinstance(self.model, BatchingEncoder):
+            self.model = BatchingEncoder(self.model, window_ms=batch_window_ms, max_batch_size=max_batch_size)
+        self.parallel = parallel
+        self.engine_options = engine_options  # passed to every shard's IntelligentSearchEngine
+        self.shards: Dict[str, IntelligentSearchEngine] = {}
+        self.shard_info: Dict[str, Dict[str, Any]] = {}  # name -> schedule, sections, items
+        self._lock = threading.Lock()
+    
+    def add_shard(self, name: str, processor: EnhancedPDFProcessor, schedule: Optional[str] = None,
+                  engine: Optional[IntelligentSearchEngine] = None) -> IntelligentSearchEngine:
+        """Register (or replace) a shard built from a processed schedule or section"""
+        if engine is None:
+            engine = IntelligentSearchEngine(
+                processor.items_database, processor, model=self.model, encoder_backend="none",
+                **self.engine_options
+            )
+        info = {
+            "schedule": schedule or name,
+            "sections": sorted(processor.section_mapping),
+            "items": len(processor.items_database),
+        }
+        with self._lock:
+            self.shards[name] = engine
+            self.shard_info[name] = info
+        print(f"  ✅ Shard {name}: {info['items']} items")
+        return engine
+    
+    def load_schedule(self, schedule: str, pdf_bytes: bytes, split_sections: bool = True) -> List[str]:
+        """Ingest one rate book as a shard, or as one shard per section.
+
+        Loading a schedule again replaces its shards.
+        """
+        print(f"📚 Loading schedule {schedule}...")
+        processor = EnhancedPDFProcessor()
+        processor.process_pdf(pdf_bytes)
+        
+        if split_sections:
+            parts = {
+                f"{schedule}/{section}": processor.subset(keys)
+                for section, keys in processor.section_mapping.items()
+            }
+        else:
+            parts = {schedule: processor}
+        
+        self.unload_schedule(schedule)
+        for name, part in parts.items():
+            self.add_shard(name, part, schedule=schedule)
+        return list(parts)
+    
+    def unload_shard(self, name: str) -> bool:
+        """Drop a shard; queries already running on it finish normally"""
+        with self._lock:
+            self.shard_info.pop(name, None)
+            return self.shards.pop(name, None) is not None
+    
+    def unload_schedule(self, schedule: str) -> List[str]:
+        """Drop every shard of a schedule"""
+        names = [name for name, info in list(self.shard_info.items()) if info["schedule"] == schedule]
+        for name in names:
+            self.unload_shard(name)
+        return names
+    
+    def _split_item_id(self, item_id: str) -> Tuple[Optional[str], str]:
+        """(shard, primary_key) from a shard-qualified id; shard is None for a bare key"""
+        shard, sep, primary_key = item_id.rpartition(":")
+        if sep and shard in self.shards:
+            return shard, primary_key
+        return None, item_id
+    
+    def _select_shards(self, schedule: Optional[str] = None,
+                       section: Optional[str] = None) -> List[Tuple[str, IntelligentSearchEngine]]:
+        """Shards that can hold matches for the given filters, in load order"""
+        with self._lock:
+            shards = list(self.shards.items())
+            info = dict(self.shard_info)
+        
+        selected = []
+        for name, engine in shards:
+            if schedule and info[name]["schedule"].lower() != schedule.lower():
+                continue
+            if section and section.lower() not in (s.lower() for s in info[name]["sections"]):
+                continue
+            selected.append((name, engine))
+        return selected
+    
+    def _fan_out(self, shards: List[Tuple[str, IntelligentSearchEngine]], call, deadline_ms: Optional[float] = None):
+        """Run call(engine) on every shard; shards that miss the deadline contribute nothing"""
+        if not self.parallel or len(shards) <= 1:
+            return [(name, call(engine)) for name, engine in shards]
+        
+        executor = _get_shard_executor()
+        futures = [(name, executor.submit(call, engine)) for name, engine in shards]
+        wait([future for _, future in futures], timeout=deadline_ms / 1000.0 if deadline_ms else None)
+        
+        results = []
+        for name, future in futures:
+            if future.done():
+                results.append((name, future.result()))
+            else:
+                future.cancel()
+                results.append((name, []))
+        return results
+    
+    def get_suggestions(self, query: str, max_suggestions: int = 10, schedule: Optional[str] = None,
+                        section: Optional[str] = None,
+                        deadline_ms: Optional[float] = None) -> List[SearchSuggestion]:
+        """Global top-k across the shards matching the filters.
+
+        The section filter is applied inside each shard before its top-k cut, so
+        a shard holding several sections still returns max_suggestions matches.
+        """
+        shards = self._select_shards(schedule, section)
+        per_shard = self._fan_out(
+            shards, lambda engine: engine.get_suggestions(query, max_suggestions, section=section), deadline_ms
+        )
+        
+        merged = []
+        for name, suggestions in per_shard:
+            for suggestion in suggestions:
+                suggestion.shard = name
+                merged.append(suggestion)
+        
+        # Stable on ties: earlier shards, then each shard's own ranking
+        best = heapq.nlargest(
+            max_suggestions, range(len(merged)), key=lambda i: (merged[i].relevance_score, -i)
+        )
+        return [merged[i] for i in best]
+    
+    def get_exact_item(self, item_id: str, shard: Optional[str] = None) -> Optional[RateItem]:
+        """Get an item by shard-qualified id, or by primary key plus shard.
+
+        A bare primary key is accepted without `shard` only while a single
+        shard holds it; otherwise the lookup is ambiguous and raises ValueError.
+        """
+        if shard is None:
+            shard, primary_key = self._split_item_id(item_id)
+        else:
+            primary_key = item_id
+        
+        with self._lock:
+            names = [shard] if shard else list(self.shards)
+            engines = [(name, self.shards.get(name)) for name in names]
+        found = []
+        for name, engine in engines:
+            item = engine.get_exact_item(primary_key) if engine else None
+            if item is not None:
+                found.append((name, item))
+        
+        if len(found) > 1:
+            raise ValueError(
+                f"Item {primary_key} is in shards {', '.join(name for name, _ in found)}; "
+                f"pass shard or a shard-qualified id"
+            )
+        return found[0][1] if found else None
+    
+    def search_by_filters(self, schedule: Optional[str] = None, section: str = None, item_no: str = None,
+                          material_type: str = None) -> List[Tuple[str, RateItem]]:
+        """Filter search over the shards matching the schedule/section, as (shard, item) pairs"""
+        shards = self._select_shards(schedule, section)
+        per_shard = self._fan_out(
+            shards, lambda engine: engine.search_by_filters(section, item_no, material_type)
+        )
+        return [(name, item) for name, items in per_shard for item in items]
+    
+    def to_frontend_dict(self, shard: str, item: RateItem) -> Dict:
+        """RateItem.to_frontend_dict() with the shard-qualified id"""
+        result = item.to_frontend_dict()
+        result["id"] = shard_item_id(shard, item.primary_key)
+        result["shard"] = shard
+        return result
+    
+    def get_shards(self) -> Dict[str, Dict[str, Any]]:
+        """Loaded shards and what they cover"""
+        with self._lock:
+            return {name: dict(info) for name, info in self.shard_info.items()}
+
+
+# ==== SHARED MEMORY-MAPPED INDEX ====
+def _encoder_manifest(model: Any) -> Dict[str, Any]:
+    """Manifest fields naming the encoder that produced an index's embeddings"""
+    return {"encoder": getattr(model, "name", None), "encoder_model": getattr(model, "model_id", None)}
+
+
+def _check_index_encoder(manifest: Dict[str, Any], engine: IntelligentSearchEngine, index_kind: str):
+    """Raise ValueError unless the engine's query encoder is the one the index embeddings came from"""
+    dimension = manifest.get("embedding_dimension")
+    if not engine.semantic_enabled or not dimension:
+        return
+    
+    for field, value in _encoder_manifest(engine.model).items():
+        if value != manifest.get(field):
+            raise ValueError(
+                f"{index_kind} was built with {field} {manifest.get(field)!r}, "
+                f"but the query encoder has {value!r}"
+            )
+    
+    # Encoding one string also loads a lazy model, which workers would do on their first query anyway
+    query_dimension = int(np.asarray(engine.model.encode("dimension probe")).shape[-1])
+    if query_dimension != dimension:
+        raise ValueError(
+            f"{index_kind} embeddings have dimension {dimension}, but the query encoder produces {query_dimension}"
+        )
+
+
+def _map_bytes(path: str):
+    """Read-only shared mapping of a file (empty files cannot be mmapped)"""
+    if os.path.getsize(path) == 0:
+        return b""
+    with open(path, "rb") as fh:
+        return mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _write_string_table(directory: str, name: str, strings: List[str]) -> None:
+    """Write strings as one UTF-8 blob plus an int64 offsets array"""
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    with open(os.path.join(directory, f"{name}.bin"), "wb") as fh:
+        fh.write(b"".join(encoded))
+    np.save(os.path.join(directory, f"{name}_offsets.npy"), offsets)
+
+
+def _write_postings(directory: str, name: str, postings: Dict[str, Any], key_ids: Dict[str, int]) -> None:
+    """Write term -> item ids as a sorted term table plus CSR-style int32 postings"""
+    terms = sorted(postings, key=lambda t: t.encode("utf-8"))
+    _write_string_table(directory, f"{name}_terms", terms)
+
+    offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+    ids = []
+    for i, term in enumerate(terms):
+        term_ids = sorted(key_ids[k] for k in postings[term] if k in key_ids)
+        ids.extend(term_ids)
+        offsets[i + 1] = len(ids)
+    np.save(os.path.join(directory, f"{name}_postings.npy"), np.asarray(ids, dtype=np.int32))
+    np.save(os.path.join(directory, f"{name}_postings_offsets.npy"), offsets)
+
+
+class MappedStringTable:
+    """Read-only string table over a memory-mapped blob, with binary-search lookup"""
+
+    def __init__(self, directory: str, name: str):
+        self._blob = _map_bytes(os.path.join(directory, f"{name}.bin"))
+        self._offsets = np.load(os.path.join(directory, f"{name}_offsets.npy"), mmap_mode="r")
+        order_path = os.path.join(directory, f"{name}_order.npy")
+        # Tables not stored in sorted order carry a permutation for lookups
+        self._order = np.load(order_path, mmap_mode="r") if os.path.exists(order_path) else None
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def _raw(self, idx: int) -> bytes:
+        return self._blob[int(self._offsets[idx]):int(self._offsets[idx + 1])]
+
+    def __getitem__(self, idx: int) -> str:
+        if idx < 0 or idx >= len(self):
+            raise IndexError(idx)
+        return self._raw(idx).decode("utf-8")
+
+    def __iter__(self):
+        for idx in range(len(self)):
+            yield self._raw(idx).decode("utf-8")
+
+    def _sorted_raw(self, pos: int) -> bytes:
+        return self._raw(int(self._order[pos]) if self._order is not None else pos)
+
+    def _lower_bound(self, target: bytes, lo: int, hi: int) -> int:
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._sorted_raw(mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def find(self, value: str) -> int:
+        """Index of value, or -1"""
+        target = value.encode("utf-8")
+        pos = self._lower_bound(target, 0, len(self))
+        if pos < len(self) and self._sorted_raw(pos) == target:
+            return int(self._order[pos]) if self._order is not None else pos
+        return -1
+
+    def prefixes_of(self, value: str, min_length: int = 1) -> set:
+        """Indices of entries that are prefixes of value (at least min_length bytes).
+
+        The sorted range of entries sharing a growing prefix of value is narrowed
+        step by step, so the walk stops as soon as no entry can match.
+        """
+        target = value.encode("utf-8")
+        hits = set()
+        lo, hi = 0, len(self)
+        for end in range(1, len(target) + 1):
+            prefix = target[:end]
+            lo = self._lower_bound(prefix, lo, hi)
+            hi = self._lower_bound(prefix + b"\xff", lo, hi)  # 0xff never occurs in UTF-8
+            if lo >= hi:
+                break
+            if end >= min_length and self._sorted_raw(lo) == prefix:
+                hits.add(int(self._order[lo]) if self._order is not None else lo)
+        return hits
+
+    def indices_containing(self, value: str) -> set:
+        """Indices of strings that contain value, found by scanning the mapped blob in C"""
+        target = value.encode("utf-8")
+        hits = set()
+        if not target:
+            return hits
+        pos = self._blob.find(target)
+        while pos != -1:
+            idx = int(np.searchsorted(self._offsets, pos, side="right")) - 1
+            if pos + len(target) <= self._offsets[idx + 1]:  # must not straddle two strings
+                hits.add(idx)
+            pos = self._blob.find(target, pos + 1)
+        return hits
+
+
+class MappedPostings(Mapping):
+    """Read-only term -> collection of primary keys, backed by mmapped CSR arrays"""
+
+    def __init__(self, directory: str, name: str, keys: MappedStringTable, max_term_length: int, container=set):
+        self._terms = MappedStringTable(directory, f"{name}_terms")
+        self.max_term_length = max_term_length  # longest stored term, from the manifest
+        self._postings = np.load(os.path.join(directory, f"{name}_postings.npy"), mmap_mode="r")
+        self._offsets = np.load(os.path.join(directory, f"{name}_postings_offsets.npy"), mmap_mode="r")
+        self._keys = keys
+        self._container = container
+
+    def _values_at(self, idx: int):
+        start, end = int(self._offsets[idx]), int(self._offsets[idx + 1])
+        return self._container(self._keys[int(i)] for i in self._postings[start:end])
+
+    def __getitem__(self, term: str):
+        idx = self._terms.find(term)
+        if idx < 0:
+            raise KeyError(term)
+        return self._values_at(idx)
+
+    def __contains__(self, term) -> bool:
+        return isinstance(term, str) and self._terms.find(term) >= 0
+
+    def __iter__(self):
+        return iter(self._terms)
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def items(self):
+        for idx, term in enumerate(self._terms):
+            yield term, self._values_at(idx)
+
+    def substring_matches(self, query: str, min_length: int = 3) -> set:
+        """Keys of terms that contain the query or are contained in it, without a Python scan"""
+        term_ids = self._terms.indices_containing(query)
+        # Terms contained in the query are prefixes of one of its suffixes; no stored term
+        # is longer than max_term_length, so each suffix is cut there
+        for start in range(len(query) - min_length + 1):
+            term_ids.update(self._terms.prefixes_of(query[start:start + self.max_term_length], min_length))
+
+        matches = set()
+        for idx in term_ids:
+            matches.update(self._values_at(idx))
+        return matches
+
+
+class MappedLookup(Mapping):
+    """Read-only term -> single primary key (item numbers, descriptions)"""
+
+    def __init__(self, directory: str, name: str, keys: MappedStringTable):
+        self._terms = MappedStringTable(directory, f"{name}_terms")
+        self._values = np.load(os.path.join(directory, f"{name}_values.npy"), mmap_mode="r")
+        self._keys = keys
+
+    def __getitem__(self, term: str) -> str:
+        idx = self._terms.find(term)
+        if idx < 0:
+            raise KeyError(term)
+        return self._keys[int(self._values[idx])]
+
+    def __contains__(self, term) -> bool:
+        return isinstance(term, str) and self._terms.find(term) >= 0
+
+    def __iter__(self):
+        return iter(self._terms)
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+
+class MappedItems(Mapping):
+    """Read-only primary_key -> RateItem, decoded on access from a mmapped JSON table"""
+
+    def __init__(self, directory: str, keys: MappedStringTable):
+        self._keys = keys
+        self._records = MappedStringTable(directory, "items")
+        self.descriptions = MappedStringTable(directory, "descriptions")  # lowercased, aligned with keys
+
+    def _item_at(self, idx: int) -> RateItem:
+        return RateItem(**json.loads(self._records[idx]))
+
+    def description_of(self, primary_key: str) -> str:
+        """Lowercased description without decoding the item record"""
+        idx = self._keys.find(primary_key)
+        if idx < 0:
+            raise KeyError(primary_key)
+        return self.descriptions[idx]
+
+    def description_contains(self, term: str) -> List[str]:
+        """Keys whose lowercased description contains term, found by scanning the mapped table"""
+        return [self._keys[idx] for idx in sorted(self.descriptions.indices_containing(term))]
+
+    def __getitem__(self, primary_key: str) -> RateItem:
+        idx = self._keys.find(primary_key)
+        if idx < 0:
+            raise KeyError(primary_key)
+        return self._item_at(idx)
+
+    def __contains__(self, primary_key) -> bool:
+        return isinstance(primary_key, str) and self._keys.find(primary_key) >= 0
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def values(self):
+        for idx in range(len(self._keys)):
+            yield self._item_at(idx)
+
+    def items(self):
+        for idx, key in enumerate(self._keys):
+            yield key, self._item_at(idx)
+
+
+class SharedIndex:
+    """Immutable, memory-mapped index files shared read-only by worker processes.
+
+    One build step writes the items, every processor index and the embedding
+    matrix as flat arrays; each worker maps the same files, so the OS page
+    cache holds a single copy no matter how many workers run.
+    """
+
+    VERSION = 2
+    POSTINGS = {"keyword_index": set, "ngram_index": set, "section_mapping": list}
+    LOOKUPS = ["item_number_index", "description_index"]
+
+    def __init__(self, index_dir: str):
+        self.index_dir = index_dir
+        # index_dir is a symlink to the current version; resolve it once so a rebuild
+        # that switches the link while we open files cannot mix two versions
+        index_dir = self.path = os.path.realpath(index_dir)
+        with open(os.path.join(index_dir, "manifest.json")) as fh:
+            self.manifest = json.load(fh)
+        if self.manifest.get("version") != self.VERSION:
+            raise ValueError(f"Unsupported shared index version: {self.manifest.get('version')}")
+
+        self.keys = MappedStringTable(index_dir, "keys")
+        self.items_database = MappedItems(index_dir, self.keys)
+
+        self.processor = EnhancedPDFProcessor()
+        self.processor.items_database = self.items_database
+        for name, container in self.POSTINGS.items():
+            setattr(self.processor, name, MappedPostings(
+                index_dir, name, self.keys, self.manifest["max_term_length"][name], container
+            ))
+        for name in self.LOOKUPS:
+            setattr(self.processor, name, MappedLookup(index_dir, name, self.keys))
+        self.processor.rate_columns = RateColumns.load(index_dir, self.keys)
+
+        embeddings_path = os.path.join(index_dir, "embeddings.npy")
+        self.embedding_matrix = np.load(embeddings_path, mmap_mode="r") if os.path.exists(embeddings_path) else None
+
+    @property
+    def precomputed_embeddings(self) -> Optional[Tuple[MappedStringTable, np.ndarray]]:
+        if self.embedding_matrix is None:
+            return None
+        return self.keys, self.embedding_matrix
+
+    @classmethod
+    def build(cls, processor: EnhancedPDFProcessor, engine: Optional[IntelligentSearchEngine],
+              index_dir: str, source: Optional[str] = None) -> Dict[str, Any]:
+        """Write a new index version next to index_dir, then switch the index_dir symlink to it.
+
+        The symlink is replaced with a single rename, so index_dir always points
+        at a complete version. The version just replaced is kept for workers
+        still opening it; older versions are removed.
+        """
+        print(f"📦 Building shared index in {index_dir}...")
+        index_dir = os.path.abspath(index_dir)
+        if os.path.lexists(index_dir) and not os.path.islink(index_dir):
+            raise ValueError(f"{index_dir} is not a shared index symlink; remove it and rebuild")
+        parent, base = os.path.split(index_dir)
+        os.makedirs(parent, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=f".{base}.", dir=parent)  # the new version directory
+        # mkdtemp creates it 0700; workers may run as another user that only needs to read it
+        os.chmod(staging, 0o755)
+        link = f"{staging}.link"
+
+        try:
+            keys = list(processor.items_database.keys())
+            key_ids = {key: idx for idx, key in enumerate(keys)}
+
+            _write_string_table(staging, "keys", keys)
+            order = sorted(range(len(keys)), key=lambda i: keys[i].encode("utf-8"))
+            np.save(os.path.join(staging, "keys_order.npy"), np.asarray(order, dtype=np.int32))
+            _write_string_table(
+                staging, "items", [json.dumps(processor.items_database[k].to_dict()) for k in keys]
+            )
+            _write_string_table(
+                staging, "descriptions", [processor.items_database[k].description.lower() for k in keys]
+            )
+
+            for name in cls.POSTINGS:
+                _write_postings(staging, name, getattr(processor, name, {}), key_ids)
+
+            for name in cls.LOOKUPS:
+                lookup = getattr(processor, name)
+                terms = sorted(lookup, key=lambda t: t.encode("utf-8"))
+                _write_string_table(staging, f"{name}_terms", terms)
+                values = np.asarray([key_ids[lookup[t]] for t in terms], dtype=np.int32)
+                np.save(os.path.join(staging, f"{name}_values.npy"), values)
+
+            columns = processor.rate_columns or RateColumns.from_items(processor.items_database)
+            if list(columns.keys) != keys:
+                columns = RateColumns.from_items(processor.items_database)
+            columns.save(staging)
+
+            dimension = None
+            embedding_keys, embedding_matrix, _ = engine._embeddings if engine is not None else ([], None, {})
+            if embedding_matrix is not None:
+                rows = {key: idx for idx, key in enumerate(embedding_keys)}
+                matrix = np.asarray(embedding_matrix, dtype=np.float32)[[rows[k] for k in keys]]
+                np.save(os.path.join(staging, "embeddings.npy"), np.ascontiguousarray(matrix))
+                dimension = int(matrix.shape[1])
+
+            manifest = {
+                "version": cls.VERSION,
+                "source": source,
+                "built_at": datetime.now().isoformat(),
+                "items": len(keys),
+                "embedding_dimension": dimension,
+                **_encoder_manifest(getattr(engine, "model", None)),
+                "max_term_length": {
+                    postings: max((len(term) for term in getattr(processor, postings, {})), default=0)
+                    for postings in cls.POSTINGS
+                },
+            }
+            with open(os.path.join(staging, "manifest.json"), "w") as fh:
+                json.dump(manifest, fh, indent=2)
+
+            previous = os.path.realpath(index_dir) if os.path.islink(index_dir) else None
+            os.symlink(os.path.basename(staging), link)
+            os.replace(link, index_dir)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            if os.path.lexists(link):
+                os.remove(link)
+            raise
+
+        # Workers that already mapped an old version keep their pages until they reload
+        for entry in os.listdir(parent):
+            path = os.path.join(parent, entry)
+            if (entry.startswith(f".{base}.") and path not in (staging, previous)
+                    and os.path.isdir(path) and not os.path.islink(path)):
+                shutil.rmtree(path, ignore_errors=True)
+
+        print(f"✅ Shared index written ({len(keys)} items)")
+        return manifest
+
+
+# ==== SQLITE PERSISTENT INDEX ====
+def _like_contains(column: str, value: str) -> Tuple[str, str]:
+    """`column LIKE ?` clause and parameter matching value as a literal substring"""
+    if "%" in value or "_" in value:
+        escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        return f"{column} LIKE ? ESCAPE '\\'", f"%{escaped}%"
+    # An ESCAPE clause stops FTS5 from using its trigram index, so plain terms go without one
+    return f"{column} LIKE ?", f"%{value}%"
+
+
+class _SQLiteReader:
+    """Per-thread read-only connections to one index database"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._local = threading.local()
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{os.path.abspath(self.db_path)}?mode=ro", uri=True)
+            self._local.conn = conn
+        return conn
+
+    def execute(self, sql: str, params=()):
+        return self.connection().execute(sql, params)
+
+
+class SQLiteItems(Mapping):
+    """primary_key -> RateItem read from the items table on access"""
+
+    def __init__(self, db: _SQLiteReader):
+        self._db = db
+        self._descriptions = None
+
+    @property
+    def descriptions(self) -> List[str]:
+        """Lowercased descriptions for fuzzy matching, loaded once"""
+        if self._descriptions is None:
+            self._descriptions = [row[0] for row in self._db.execute("SELECT lower(description) FROM items ORDER BY id")]
+        return self._descriptions
+
+    def __getitem__(self, primary_key: str) -> RateItem:
+        row = self._db.execute("SELECT data FROM items WHERE primary_key = ?", (primary_key,)).fetchone()
+        if row is None:
+            raise KeyError(primary_key)
+        return RateItem(**json.loads(row[0]))
+
+    def __contains__(self, primary_key) -> bool:
+        return self._db.execute("SELECT 1 FROM items WHERE primary_key = ?", (primary_key,)).fetchone() is not None
+
+    def __iter__(self):
+        return (row[0] for row in self._db.execute("SELECT primary_key FROM items ORDER BY id"))
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT count(*) FROM items").fetchone()[0]
+
+    def values(self):
+        return (RateItem(**json.loads(row[0])) for row in self._db.execute("SELECT data FROM items ORDER BY id"))
+
+    def items(self):
+        return (
+            (row[0], RateItem(**json.loads(row[1])))
+            for row in self._db.execute("SELECT primary_key, data FROM items ORDER BY id")
+        )
+
+    def filter(self, section: str = None, item_no: str = None, material_type: str = None) -> List[RateItem]:
+        """search_by_filters in SQL; material_type goes through the FTS5 description index"""
+        sql = "SELECT data FROM items WHERE 1 = 1"
+        params = []
+        if section:
+            sql += " AND section = ? COLLATE NOCASE"
+            params.append(section)
+        if item_no:
+            sql += " AND sr_no = ?"
+            params.append(item_no)
+        if material_type:
+            clause, pattern = _like_contains("description", material_type)
+            sql += f" AND id IN (SELECT rowid FROM items_fts WHERE {clause})"
+            params.append(pattern)
+        sql += " ORDER BY id"
+        return [RateItem(**json.loads(row[0])) for row in self._db.execute(sql, params)]
+
+
+class SQLitePostings(Mapping):
+    """term -> collection of primary keys for one postings kind"""
+
+    MAX_PARAMS = 900  # stay well under SQLITE_MAX_VARIABLE_NUMBER on older builds
+
+    def __init__(self, db: _SQLiteReader, kind: str, max_term_length: int, container=set):
+        self._db = db
+        self._kind = kind
+        self._container = container
+        self.max_term_length = max_term_length  # longest stored term, from the manifest
+
+    def __getitem__(self, term: str):
+        keys = self._container(
+            row[0] for row in self._db.execute(
+                "SELECT items.primary_key FROM postings JOIN items ON items.id = postings.item_id "
+                "WHERE postings.kind = ? AND postings.term = ? ORDER BY items.id", (self._kind, term)
+            )
+        )
+        if not keys:
+            raise KeyError(term)
+        return keys
+
+    def __contains__(self, term) -> bool:
+        return self._db.execute(
+            "SELECT 1 FROM postings WHERE kind = ? AND term = ? LIMIT 1", (self._kind, term)
+        ).fetchone() is not None
+
+    def __iter__(self):
+        return (row[0] for row in self._db.execute(
+            "SELECT DISTINCT term FROM postings WHERE kind = ? ORDER BY term", (self._kind,)
+        ))
+
+    def __len__(self) -> int:
+        return self._db.execute(
+            "SELECT count(DISTINCT term) FROM postings WHERE kind = ?", (self._kind,)
+        ).fetchone()[0]
+
+    def substring_matches(self, query: str, min_length: int = 3) -> set:
+        """Keys of terms containing the query (FTS5 trigram index) or contained in it"""
+        select = (
+            "SELECT DISTINCT items.primary_key FROM postings JOIN items ON items.id = postings.item_id "
+            "WHERE postings.kind = ? AND postings.term IN "
+        )
+        clause, pattern = _like_contains("term", query)
+        matches = {
+            row[0] for row in self._db.execute(
+                select + f"(SELECT term FROM terms_fts WHERE {clause})", (self._kind, pattern)
+            )
+        }
+        
+        # Terms contained in the query: no stored term is longer than max_term_length
+        longest = min(len(query), self.max_term_length)
+        substrings = sorted({
+            query[start:end]
+            for start in range(len(query))
+            for end in range(start + min_length, min(start + longest, len(query)) + 1)
+        })
+        for chunk in range(0, len(substrings), self.MAX_PARAMS):
+            batch = substrings[chunk:chunk + self.MAX_PARAMS]
+            sql = select + f"({','.join('?' * len(batch))})"
+            matches.update(row[0] for row in self._db.execute(sql, [self._kind] + batch))
+        return matches
+
+
+class SQLiteLookup(Mapping):
+    """term -> single primary key (item numbers, descriptions)"""
+
+    def __init__(self, db: _SQLiteReader, kind: str):
+        self._db = db
+        self._kind = kind
+
+    def __getitem__(self, term: str) -> str:
+        row = self._db.execute(
+            "SELECT items.primary_key FROM lookups JOIN items ON items.id = lookups.item_id "
+            "WHERE lookups.kind = ? AND lookups.term = ?", (self._kind, term)
+        ).fetchone()
+        if row is None:
+            raise KeyError(term)
+        return row[0]
+
+    def __contains__(self, term) -> bool:
+        return self._db.execute(
+            "SELECT 1 FROM lookups WHERE kind = ? AND term = ?", (self._kind, term)
+        ).fetchone() is not None
+
+    def __iter__(self):
+        return (row[0] for row in self._db.execute(
+            "SELECT term FROM lookups WHERE kind = ? ORDER BY term", (self._kind,)
+        ))
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT count(*) FROM lookups WHERE kind = ?", (self._kind,)).fetchone()[0]
+
+
+class SQLiteIndex:
+    """Persistent single-file index: items, postings, FTS5 tables and embedding BLOBs.
+
+    Exact-item, filter and keyword queries are answered from disk with a small
+    working set, so a restart does not need the PDF pipeline or the whole
+    corpus in RAM. Only the rate columns, and the embedding matrix when
+    semantic search is on, are loaded into memory.
+    """
+
+    VERSION = 2
+    SCHEMA = """
+        CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+        CREATE TABLE items (
+            id INTEGER PRIMARY KEY, primary_key TEXT UNIQUE NOT NULL, sr_no TEXT, description TEXT,
+            section TEXT, unit TEXT, rate_2023_24 TEXT, rate_2024_25 TEXT, data TEXT NOT NULL
+        );
+        CREATE INDEX items_section ON items (section COLLATE NOCASE);
+        CREATE INDEX items_sr_no ON items (sr_no);
+        CREATE TABLE postings (kind TEXT NOT NULL, term TEXT NOT NULL, item_id INTEGER NOT NULL);
+        CREATE INDEX postings_term ON postings (kind, term);
+        CREATE TABLE lookups (kind TEXT NOT NULL, term TEXT NOT NULL, item_id INTEGER NOT NULL,
+                              PRIMARY KEY (kind, term));
+        CREATE TABLE embeddings (item_id INTEGER PRIMARY KEY, vector BLOB NOT NULL);
+        CREATE VIRTUAL TABLE items_fts USING fts5(description, tokenize='trigram');
+        CREATE VIRTUAL TABLE terms_fts USING fts5(term, tokenize='trigram');
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.db = _SQLiteReader(db_path)
+        self.manifest = {key: json.loads(value) for key, value in self.db.execute("SELECT key, value FROM meta")}
+        if self.manifest.get("version") != self.VERSION:
+            raise ValueError(f"Unsupported SQLite index version: {self.manifest.get('version')}")
+
+        self.items_database = SQLiteItems(self.db)
+
+        self.processor = EnhancedPDFProcessor()
+        self.processor.items_database = self.items_database
+        for name, container in SharedIndex.POSTINGS.items():
+            setattr(self.processor, name, SQLitePostings(
+                self.db, name, self.manifest["max_term_length"][name], container
+            ))
+        for name in SharedIndex.LOOKUPS:
+            setattr(self.processor, name, SQLiteLookup(self.db, name))
+
+        rows = self.db.execute(
+            "SELECT primary_key, section, unit, rate_2023_24, rate_2024_25 FROM items ORDER BY id"
+        ).fetchall()
+        self.processor.rate_columns = RateColumns.from_fields(
+            [r[0] for r in rows], [r[1] for r in rows], [r[2] for r in rows],
+            {"rate_2023_24": [r[3] for r in rows], "rate_2024_25": [r[4] for r in rows]}
+        )
+
+    @property
+    def precomputed_embeddings(self) -> Optional[Tuple[List[str], np.ndarray]]:
+        """(keys, matrix) read from the embedding BLOBs, or None if the index has none"""
+        dimension = self.manifest.get("embedding_dimension")
+        if not dimension:
+            return None
+        rows = self.db.execute(
+            "SELECT items.primary_key, embeddings.vector FROM embeddings "
+            "JOIN items ON items.id = embeddings.item_id ORDER BY embeddings.item_id"
+        ).fetchall()
+        matrix = np.frombuffer(b"".join(r[1] for r in rows), dtype=np.float32).reshape(len(rows), dimension)
+        return [r[0] for r in rows], matrix
+
+    @classmethod
+    def build(cls, processor: EnhancedPDFProcessor, engine: Optional[IntelligentSearchEngine],
+              db_path: str, source: Optional[str] = None) -> Dict[str, Any]:
+        """Write the database to a temp file next to db_path, then rename it into place"""
+        print(f"🗄️ Building SQLite index {db_path}...")
+        parent = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(parent, exist_ok=True)
+        fd, staging = tempfile.mkstemp(prefix=".sqlite-index-", suffix=".db", dir=parent)
+        os.close(fd)
+
+        try:
+            conn = sqlite3.connect(staging)
+            conn.executescript(cls.SCHEMA)
+
+            keys = list(processor.items_database.keys())
+            key_ids = {key: idx for idx, key in enumerate(keys, 1)}
+            items = [processor.items_database[key] for key in keys]
+            conn.executemany(
+                "INSERT INTO items VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (key_ids[item.primary_key], item.primary_key, item.sr_no, item.description, item.section,
+                     item.unit, item.rate_2023_24, item.rate_2024_25, json.dumps(item.to_dict()))
+                    for item in items
+                ]
+            )
+            conn.execute("INSERT INTO items_fts (rowid, description) SELECT id, description FROM items")
+
+            for name in SharedIndex.POSTINGS:
+                postings = getattr(processor, name, {})
+                conn.executemany(
+                    "INSERT INTO postings VALUES (?, ?, ?)",
+                    ((name, term, key_ids[k]) for term, term_keys in postings.items() for k in term_keys if k in key_ids)
+                )
+            conn.executemany("INSERT INTO terms_fts (term) VALUES (?)", ((t,) for t in processor.ngram_index))
+
+            for name in SharedIndex.LOOKUPS:
+                conn.executemany(
+                    "INSERT INTO lookups VALUES (?, ?, ?)",
+                    ((name, term, key_ids[k]) for term, k in getattr(processor, name).items() if k in key_ids)
+                )
+
+            dimension = None
+            embedding_keys, embedding_matrix, _ = engine._embeddings if engine is not None else ([], None, {})
+            if embedding_matrix is not None:
+                matrix = np.asarray(embedding_matrix, dtype=np.float32)
+                conn.executemany(
+                    "INSERT INTO embeddings VALUES (?, ?)",
+                    (
+                        (key_ids[key], np.ascontiguousarray(matrix[row]).tobytes())
+                        for row, key in enumerate(embedding_keys) if key in key_ids
+                    )
+                )
+                dimension = int(matrix.shape[1])
+
+            manifest = {
+                "version": cls.VERSION,
+                "source": source,
+                "built_at": datetime.now().isoformat(),
+                "items": len(keys),
+                "embedding_dimension": dimension,
+                **_encoder_manifest(getattr(engine, "model", None)),
+                "max_term_length": {
+                    name: max((len(term) for term in getattr(processor, name, {})), default=0)
+                    for name in SharedIndex.POSTINGS
+                },
+            }
+            conn.executemany("INSERT INTO meta VALUES (?, ?)", [(k, json.dumps(v)) for k, v in manifest.items()])
+            conn.commit()
+            conn.execute("VACUUM")
+            conn.close()
+
+            os.replace(staging, db_path)
+        except Exception:
+            if os.path.exists(staging):
+                os.remove(staging)
+            raise
+
+        print(f"✅ SQLite index written ({len(keys)} items)")
+        return manifest
+
+
+# ==== PRE-SERIALIZED RESPONSE FRAGMENTS ====
+def _dumps(obj: Any, fast: bool = False) -> bytes:
+    """Compact UTF-8 JSON; orjson when asked for and installed"""
+    if fast and ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _splice_json(envelope: Dict[str, Any], field: str, fragment: bytes, fast: bool = False) -> bytes:
+    """Encode envelope and append an already-encoded value as its last field"""
+    head = _dumps(envelope, fast)[:-1]
+    separator = b"," if len(head) > 1 else b""
+    return head + separator + _dumps(field, fast) + b":" + fragment + b"}"
+
+
+class ItemFragments:
+    """Each item's to_frontend_dict() JSON, encoded once and spliced into responses.
+
+    Filled for the whole corpus at index time; a refresh invalidates only the
+    keys it added or removed. Mapped/SQLite stores are filled lazily and keep
+    at most max_items fragments, evicting the least recently used.
+    """
+
+    LAZY_MAX_ITEMS = 4096  # default bound for workers serving a SharedIndex or SQLiteIndex
+
+    def __init__(self, fast_json: bool = False, max_items: Optional[int] = None):
+        self.fast_json = fast_json
+        self.max_items = max_items  # None keeps every fragment
+        self._cache: "OrderedDict[str, bytes]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def build(self, items) -> None:
+        for item in items:
+            self._store(item)
+
+    def _store(self, item: RateItem) -> bytes:
+        fragment = self._cache[item.primary_key] = _dumps(item.to_frontend_dict(), self.fast_json)
+        if self.max_items is not None:
+            while len(self._cache) > self.max_items:
+                try:
+                    self._cache.popitem(last=False)
+                except KeyError:  # emptied by another request thread
+                    break
+        return fragment
+
+    def invalidate(self, primary_keys) -> None:
+        for primary_key in primary_keys:
+            self._cache.pop(primary_key, None)
+
+    def item(self, item: RateItem) -> bytes:
+        fragment = self._cache.get(item.primary_key)
+        if fragment is None:
+            return self._store(item)
+        if self.max_items is not None:
+            try:
+                self._cache.move_to_end(item.primary_key)
+            except KeyError:  # evicted by another request thread since the lookup
+                pass
+        return fragment
+
+    def items(self, items: List[RateItem]) -> bytes:
+        return b"[" + b",".join(self.item(item) for item in items) + b"]"
+
+    def suggestions(self, suggestions: List[SearchSuggestion]) -> bytes:
+        """SearchSuggestion.to_dict() list, with the item part taken from the cache"""
+        parts = []
+        for suggestion in suggestions:
+            if suggestion.shard is not None:
+                # Shard-qualified ids are not in the per-item cache
+                parts.append(_dumps(suggestion.to_dict(), self.fast_json))
+                continue
+            rest = {
+                "relevance_score": suggestion.relevance_score,
+                "match_type": suggestion.match_type,
+                "matched_keywords": suggestion.matched_keywords
+            }
+            parts.append(b'{"item":' + self.item(suggestion.item) + b"," + _dumps(rest, self.fast_json)[1:])
+        return b"[" + b",".join(parts) + b"]"
 
 
 class FrontendReadyRAGSystem:
     """Frontend-ready RAG system with API-like interface"""
     
-    def __init__(self, pdf_url: str):
-        self.pdf_url = pdf_url
+    def __init__(self, pdf_url: str, encoder_backend: Optional[str] = None,
+                 encoder_path: Optional[str] = None, fetcher: Optional[PDFFetcher] = None,
+                 fast_json: bool = False, **engine_options):
+        self.pdf_url = pdf_url  # http(s) URL, file:// URL or local path
+        self.fetcher = fetcher or PDFFetcher()
+        self.engine_options = engine_options  # e.g. parallel_stages=True, stage_deadline_ms=50
+        self.encoder_backend = encoder_backend
+        self.encoder_path = encoder_path
         self.processor = EnhancedPDFProcessor()
         self.search_engine = None
         self.items_database = {}
+        self.fragments = ItemFragments(fast_json)  # cached item JSON for the *_json endpoints
+        self.shared_index = None  # set by from_shared_index / from_sqlite_index; both are read-only
+        self.sqlite_index = None
         self.is_initialized = False
     
     def initialize(self) -> Dict[str, Any]:
@@ -801,12 +3050,10 @@ class FrontendReadyRAGSystem:
             print("🚀 FRONTEND-READY RAG SYSTEM")
             print("="*60)
             
-            # Download PDF
-            print("\n📥 Downloading PDF...")
-            response = requests.get(self.pdf_url)
-            response.raise_for_status()
-            pdf_bytes = response.content
-            print(f"✅ Downloaded {len(pdf_bytes):,} bytes")
+            # Download PDF (conditional against the local cache)
+            print("\n📥 Fetching PDF...")
+            pdf_bytes = self.fetcher.fetch(self.pdf_url)
+            print(f"✅ Loaded {len(pdf_bytes):,} bytes ({self.fetcher.last_fetch.get('status')})")
             
             # Process PDF
             print("\n📊 Processing PDF...")
@@ -814,7 +3061,14 @@ class FrontendReadyRAGSystem:
             
             # Initialize search engine
             print("\n🔍 Initializing search engine...")
-            self.search_engine = IntelligentSearchEngine(self.items_database, self.processor)
+            self.search_engine = IntelligentSearchEngine(
+                self.items_database, self.processor,
+                encoder_backend=self.encoder_backend, encoder_path=self.encoder_path,
+                **self.engine_options
+            )
+            
+            # Encode every item's frontend JSON once for the *_json endpoints
+            self.fragments.build(self.items_database.values())
             
             self.is_initialized = True
             
@@ -825,7 +3079,8 @@ class FrontendReadyRAGSystem:
             return {
                 "status": "success",
                 "message": "System initialized successfully",
-                "summary": summary
+                "summary": summary,
+                "fetch": self.fetcher.last_fetch
             }
         
         except Exception as e:
@@ -835,7 +3090,127 @@ class FrontendReadyRAGSystem:
                 "message": f"Initialization failed: {str(e)}",
                 "summary": None
             }
+
+    def refresh(self) -> Dict[str, Any]:
+        """Re-fetch the PDF and re-ingest only the pages that changed.
+
+        The update is applied to copies of the processor and engine, which
+        replace the live engine in one assignment; queries already running
+        finish on the structures they started with. Systems loaded from a
+        SharedIndex or SQLiteIndex are read-only: rebuild the index instead.
+        """
+        if self.shared_index is not None or self.sqlite_index is not None:
+            return {
+                "status": "error",
+                "message": "Refresh failed: system serves a read-only index; rebuild the index and reload workers",
+                "changes": None
+            }
+        if not self.is_initialized:
+            return self.initialize()
+        
+        try:
+            pdf_bytes = self.fetcher.fetch(self.pdf_url)
+            if self.fetcher.last_fetch.get("status") == "not_modified":
+                return {"status": "success", "message": "PDF unchanged", "changes": None}
+            
+            processor = copy.copy(self.processor)
+            processor.process_pdf(pdf_bytes)
+            changes = processor.last_ingest
+            engine = self.search_engine.with_processor(processor)
+            engine.apply_changes(changes["added_keys"], changes["removed_keys"])
+            
+            self.search_engine = engine
+            self.processor, self.items_database = processor, processor.items_database
+            self.fragments.invalidate(changes["added_keys"] + changes["removed_keys"])
+            
+            return {
+                "status": "success",
+                "message": "System refreshed",
+                "changes": {
+                    "pages_total": changes["pages_total"],
+                    "pages_extracted": changes["pages_extracted"],
+                    "items_added": len(changes["added_keys"]),
+                    "items_removed": len(changes["removed_keys"])
+                }
+            }
+        
+        except Exception as e:
+            return {"status": "error", "message": f"Refresh failed: {str(e)}", "changes": None}
     
+    def build_shared_index(self, index_dir: str) -> Dict[str, Any]:
+        """Write the initialized system to memory-mapped files for multi-worker serving"""
+        if not self.is_initialized:
+            return {"status": "error", "message": "System not initialized", "manifest": None}
+
+        try:
+            manifest = SharedIndex.build(self.processor, self.search_engine, index_dir, source=self.pdf_url)
+            return {"status": "success", "message": "Shared index built", "manifest": manifest}
+        except Exception as e:
+            return {"status": "error", "message": f"Shared index build failed: {str(e)}", "manifest": None}
+
+    @classmethod
+    def from_shared_index(cls, index_dir: str, encoder_backend: Optional[str] = None,
+                          encoder_path: Optional[str] = None, **engine_options) -> "FrontendReadyRAGSystem":
+        """Create a ready-to-serve worker that maps a prebuilt SharedIndex read-only.
+
+        Only the query encoder is private to each worker; fork after this call
+        to share the encoder's memory as well. Raises ValueError when the query
+        encoder is not the backend, model and dimension the index was built with.
+        """
+        shared = SharedIndex(index_dir)
+        system = cls(shared.manifest.get("source") or "", encoder_backend, encoder_path, **engine_options)
+        system.processor = shared.processor
+        system.items_database = shared.items_database
+        system.search_engine = IntelligentSearchEngine(
+            shared.items_database, shared.processor,
+            encoder_backend=encoder_backend if shared.embedding_matrix is not None else "none",
+            encoder_path=encoder_path,
+            precomputed_embeddings=shared.precomputed_embeddings,
+            **system.engine_options
+        )
+        _check_index_encoder(shared.manifest, system.search_engine, "Shared index")
+        system.fragments = ItemFragments(system.fragments.fast_json, max_items=ItemFragments.LAZY_MAX_ITEMS)
+        system.shared_index = shared
+        system.is_initialized = True
+        return system
+
+    def build_sqlite_index(self, db_path: str) -> Dict[str, Any]:
+        """Persist the initialized system to a local SQLite database"""
+        if not self.is_initialized:
+            return {"status": "error", "message": "System not initialized", "manifest": None}
+
+        try:
+            manifest = SQLiteIndex.build(self.processor, self.search_engine, db_path, source=self.pdf_url)
+            return {"status": "success", "message": "SQLite index built", "manifest": manifest}
+        except Exception as e:
+            return {"status": "error", "message": f"SQLite index build failed: {str(e)}", "manifest": None}
+
+    @classmethod
+    def from_sqlite_index(cls, db_path: str, encoder_backend: Optional[str] = None,
+                          encoder_path: Optional[str] = None, **engine_options) -> "FrontendReadyRAGSystem":
+        """Cold-start from a SQLite index without re-running the PDF pipeline.
+
+        Raises ValueError when the query encoder is not the backend, model and
+        dimension the stored embeddings were built with.
+        """
+        index = SQLiteIndex(db_path)
+        embeddings = index.precomputed_embeddings if encoder_backend != "none" else None
+        system = cls(index.manifest.get("source") or "", encoder_backend, encoder_path, **engine_options)
+        system.processor = index.processor
+        system.items_database = index.items_database
+        system.search_engine = IntelligentSearchEngine(
+            index.items_database, index.processor,
+            encoder_backend=encoder_backend if embeddings is not None else "none",
+            encoder_path=encoder_path,
+            precomputed_embeddings=embeddings,
+            **system.engine_options
+        )
+        _check_index_encoder(index.manifest, system.search_engine, "SQLite index")
+        system.fragments = ItemFragments(system.fragments.fast_json, max_items=ItemFragments.LAZY_MAX_ITEMS)
+        system.sqlite_index = index
+        system.is_initialized = True
+        return system
+
     def _get_system_summary(self) -> Dict[str, Any]:
         """Get system summary for frontend"""
         section_counts = {}
@@ -883,6 +3258,56 @@ class FrontendReadyRAGSystem:
                 "suggestions": []
             }
     
+    def stream_suggestions(self, query: str, max_results: int = 10) -> Iterator[Dict[str, Any]]:
+        """Streaming API endpoint: a quick lexical response, then the re-ranked final one"""
+        if not self.is_initialized:
+            yield {
+                "status": "error",
+                "message": "System not initialized",
+                "suggestions": [],
+                "final": True
+            }
+            return
+        
+        try:
+            for phase, suggestions in self.search_engine.stream_suggestions(query, max_results):
+                yield {
+                    "status": "success",
+                    "query": query,
+                    "phase": phase,
+                    "final": phase == "final",
+                    "total_found": len(suggestions),
+                    "suggestions": [s.to_dict() for s in suggestions]
+                }
+        
+        except Exception as e:
+            yield {
+                "status": "error",
+                "message": f"Search failed: {str(e)}",
+                "suggestions": [],
+                "final": True
+            }
+    
+    def stream_suggestions_sse(self, query: str, max_results: int = 10) -> Iterator[str]:
+        """stream_suggestions() framed as Server-Sent Events, ready for a chunked HTTP response"""
+        for update in self.stream_suggestions(query, max_results):
+            event = update.get("phase", "error")
+            yield f"event: {event}\ndata: {json.dumps(update)}\n\n"
+    
+    def get_suggestions_json(self, query: str, max_results: int = 10) -> bytes:
+        """get_suggestions() as JSON bytes, spliced from cached item fragments"""
+        if not self.is_initialized:
+            return _dumps(self.get_suggestions(query, max_results))
+        
+        try:
+            suggestions = self.search_engine.get_suggestions(query, max_results)
+            envelope = {"status": "success", "query": query, "total_found": len(suggestions)}
+            return _splice_json(envelope, "suggestions", self.fragments.suggestions(suggestions),
+                                self.fragments.fast_json)
+        
+        except Exception as e:
+            return _dumps({"status": "error", "message": f"Search failed: {str(e)}", "suggestions": []})
+    
     def get_item_details(self, primary_key: str) -> Dict[str, Any]:
         """API endpoint for getting exact item details"""
         if not self.is_initialized:
@@ -906,6 +3331,13 @@ class FrontendReadyRAGSystem:
                 "item": None
             }
     
+    def get_item_details_json(self, primary_key: str) -> bytes:
+        """get_item_details() as JSON bytes, using the cached item fragment"""
+        item = self.search_engine.get_exact_item(primary_key) if self.is_initialized else None
+        if item is None:
+            return _dumps(self.get_item_details(primary_key))
+        return _splice_json({"status": "success"}, "item", self.fragments.item(item), self.fragments.fast_json)
+    
     def search_with_filters(self, section: str = None, item_no: str = None, 
                            material_type: str = None) -> Dict[str, Any]:
         """API endpoint for filtered search"""
@@ -937,6 +3369,160 @@ class FrontendReadyRAGSystem:
                 "results": []
             }
     
+    def search_with_filters_json(self, section: str = None, item_no: str = None,
+                                 material_type: str = None) -> bytes:
+        """search_with_filters() as JSON bytes; whole sections are spliced, not re-encoded"""
+        if not self.is_initialized:
+            return _dumps(self.search_with_filters(section, item_no, material_type))
+        
+        try:
+            results = self.search_engine.search_by_filters(section, item_no, material_type)
+            envelope = {
+                "status": "success",
+                "filters": {
+                    "section": section,
+                    "item_no": item_no,
+                    "material_type": material_type
+                },
+                "total_found": len(results)
+            }
+            return _splice_json(envelope, "results", self.fragments.items(results), self.fragments.fast_json)
+        
+        except Exception as e:
+            return _dumps({"status": "error", "message": f"Filtered search failed: {str(e)}", "results": []})
+    
+    def search_by_rate(self, min_rate: float = None, max_rate: float = None, section: str = None,
+                       unit: str = None, material_type: str = None, rate_column: str = "rate_2024_25",
+                       sort: str = "asc", limit: int = 50) -> Dict[str, Any]:
+        """API endpoint for rate range / rate-sorted search"""
+        if not self.is_initialized:
+            return {
+                "status": "error",
+                "message": "System not initialized",
+                "results": []
+            }
+        
+        try:
+            engine = self.search_engine
+            results = engine.search_by_rate(
+                min_rate, max_rate, section, unit, material_type, rate_column, sort == "desc", limit
+            )
+            columns = engine.processor.rate_columns
+            rows = columns.row_ids([item.primary_key for item in results])
+            
+            return {
+                "status": "success",
+                "filters": {
+                    "min_rate": min_rate,
+                    "max_rate": max_rate,
+                    "section": section,
+                    "unit": unit,
+                    "material_type": material_type,
+                    "rate_column": rate_column,
+                    "sort": sort
+                },
+                "total_found": len(results),
+                "results": [
+                    {**item.to_frontend_dict(), "rate": columns.value(rate_column, row),
+                     "escalation_pct": columns.value("escalation_pct", row)}
+                    for item, row in zip(results, rows)
+                ]
+            }
+        
+        except Exception as e:
+            return {
+                "status": "error",
+                "message": f"Rate search failed: {str(e)}",
+                "results": []
+            }
+    
+    def get_rate_escalation(self, section: str = None, top: int = 10) -> Dict[str, Any]:
+        """API endpoint for 2023-24 -> 2024-25 escalation statistics"""
+        if not self.is_initialized:
+            return {
+                "status": "error",
+                "message": "System not initialized",
+                "items": []
+            }
+        
+        engine = self.search_engine
+        columns = engine.processor.rate_columns
+        rows = columns.select("rate_2024_25", section=section)
+        escalation = columns.escalation_pct[rows]
+        known = ~np.isnan(escalation)
+        rows, escalation = rows[known], escalation[known]
+        highest = np.argsort(-escalation, kind="stable")[:top]
+        
+        return {
+            "status": "success",
+            "section": section,
+            "items_compared": int(len(rows)),
+            "mean_pct": float(escalation.mean()) if len(rows) else None,
+            "median_pct": float(np.median(escalation)) if len(rows) else None,
+            "items": [
+                {**engine.items_database[key].to_frontend_dict(), "escalation_pct": float(pct)}
+                for key, pct in zip(columns.keys_at(rows[highest]), escalation[highest])
+            ]
+        }
+    
+    def cost_estimate(self, lines: List[Dict[str, Any]], rate_column: str = "rate_2024_25") -> Dict[str, Any]:
+        """API endpoint for costing a whole estimate in one call.
+
+        Each line is {"item_key" or "description", "quantity", "unit"}.
+        """
+        if not self.is_initialized:
+            return {
+                "status": "error",
+                "message": "System not initialized",
+                "lines": []
+            }
+        
+        try:
+            engine = self.search_engine
+            costing = engine.cost_estimate(
+                [line.get("item_key") or line.get("id") for line in lines],
+                [line.get("description") for line in lines],
+                [line.get("quantity") or 0 for line in lines],
+                [line.get("unit") for line in lines],
+                rate_column
+            )
+            keys = engine.processor.rate_columns.keys
+            
+            results = []
+            for i, line in enumerate(lines):
+                row = int(costing["rows"][i])
+                item = engine.items_database[keys[row]] if row >= 0 else None
+                results.append({
+                    "line": i,
+                    "status": str(costing["status"][i]),
+                    "quantity": line.get("quantity") or 0,
+                    "unit": line.get("unit"),
+                    "item": item.to_frontend_dict() if item else None,
+                    "resolved_by": costing["resolved_by"][i],
+                    "match_score": float(costing["scores"][i]),
+                    "rate": None if np.isnan(costing["rates"][i]) else float(costing["rates"][i]),
+                    "amount": None if np.isnan(costing["amounts"][i]) else float(costing["amounts"][i])
+                })
+            
+            return {
+                "status": "success",
+                "rate_column": rate_column,
+                "total_lines": len(lines),
+                "priced_lines": int(np.count_nonzero(costing["status"] == "ok")),
+                "review_lines": int(np.count_nonzero(costing["status"] == "needs_review")),
+                "total_amount": costing["total"],
+                "review_amount": costing["review_total"],
+                "section_subtotals": costing["section_subtotals"],
+                "lines": results
+            }
+        
+        except Exception as e:
+            return {
+                "status": "error",
+                "message": f"Estimate costing failed: {str(e)}",
+                "lines": []
+            }
+    
     def get_all_sections(self) -> Dict[str, Any]:
         """API endpoint for getting all sections"""
         if not self.is_initialized:
@@ -1023,4 +3609,28 @@ if __name__ == "__main__":
     
     # 5. Get all available sections for dropdowns
     sections = rag_system.get_all_sections()
+    
+    # 6. Pick up a revised PDF: only changed pages are re-extracted and re-embedded
+    refresh_result = rag_system.refresh()
+    
+    # 7. Multi-worker serving: build once, then every worker maps the same files read-only
+    rag_system.build_shared_index("/var/lib/estimate/ssr-index")
+    worker_system = FrontendReadyRAGSystem.from_shared_index("/var/lib/estimate/ssr-index")
+    
+    # 8. Persist to SQLite and cold-start from disk after a restart
+    rag_system.build_sqlite_index("/var/lib/estimate/ssr.db")
+    restored_system = FrontendReadyRAGSystem.from_sqlite_index("/var/lib/estimate/ssr.db")
+    
+    # 9. Several rate books at once: one shard per schedule section, queried in parallel
+    sharded = ShardedSearchEngine(encoder_backend="onnx", encoder_path="./minilm-onnx")
+    sharded.load_schedule("MJP SSR 2023-24", PDFFetcher().fetch(PDF_URL))
+    sharded.get_suggestions("cement", schedule="MJP SSR 2023-24", section="MATERIALS")
+    sharded.unload_schedule("MJP SSR 2023-24")
+    
+    # 10. Autocomplete over SSE: lexical hits first, then the re-ranked fuzzy/semantic update
+    for chunk in rag_system.stream_suggestions_sse("acety"):
+        response.write(chunk)
+    
+    # 11. Ready-to-send JSON bytes built from per-item fragments encoded at index time
+    body = rag_system.search_with_filters_json(section="PIPES")
     """
\ No newline at end of file